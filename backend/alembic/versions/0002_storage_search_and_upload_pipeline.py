@@ -0,0 +1,206 @@
+"""Storage, search and upload pipeline
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+Content-addressed blobs, extracted text in ``document_contents``, chunks for
+retrieval, the OCR job queue, stats counters, bulk and resumable uploads,
+the full-text search vector and conversation summaries.
+
+``documents.extracted_text`` is moved into ``document_contents`` (stored
+uncompressed; new texts are compressed as they are written) and indexed
+into the new ``search_vector`` before the column is dropped. Existing
+documents keep their file paths and have no ``sha256`` – they are simply
+not deduplicated.
+"""
+
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('file_path', sa.String(length=1000), nullable=False),
+    sa.Column('file_size', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    op.create_table('stat_counters',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('shard', sa.Integer(), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name', 'shard')
+    )
+    op.create_table('upload_buckets',
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('shard', sa.Integer(), nullable=False),
+    sa.Column('uploads', sa.Integer(), nullable=False),
+    sa.Column('bytes', sa.BigInteger(), nullable=False),
+    sa.Column('ocr_backlog', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('bucket_start', 'shard')
+    )
+    op.create_table('upload_batches',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('accepted', sa.Integer(), nullable=False),
+    sa.Column('results', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_upload_batches_user_id'), 'upload_batches', ['user_id'], unique=False)
+    op.create_table('upload_sessions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('filename', sa.String(length=500), nullable=False),
+    sa.Column('title', sa.String(length=500), nullable=True),
+    sa.Column('tag_names', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('total_size', sa.BigInteger(), nullable=False),
+    sa.Column('received', sa.BigInteger(), nullable=False),
+    sa.Column('writing_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_upload_sessions_expires_at'), 'upload_sessions', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_upload_sessions_user_id'), 'upload_sessions', ['user_id'], unique=False)
+    op.create_table('document_chunks',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('document_id', sa.UUID(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('page', sa.Integer(), nullable=True),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('token_count', sa.Integer(), nullable=False),
+    sa.Column('terms', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('paragraph_terms', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('embedding', sa.LargeBinary(), nullable=True),
+    sa.Column('embedding_scale', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_document_chunks_document_position', 'document_chunks', ['document_id', 'position'], unique=True)
+    op.create_table('document_contents',
+    sa.Column('document_id', sa.UUID(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=True),
+    sa.Column('compressed', sa.LargeBinary(), nullable=True),
+    sa.Column('char_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('document_id')
+    )
+    op.create_table('ocr_jobs',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('document_id', sa.UUID(), nullable=False),
+    sa.Column('file_path', sa.String(length=1000), nullable=False),
+    sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'DONE', 'FAILED', name='ocrjobstatus'), nullable=False),
+    sa.Column('priority', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ocr_jobs_document_id'), 'ocr_jobs', ['document_id'], unique=False)
+    op.create_index(op.f('ix_ocr_jobs_status'), 'ocr_jobs', ['status'], unique=False)
+    op.add_column('documents', sa.Column('sha256', sa.String(length=64), nullable=True))
+    op.add_column('documents', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.add_column('documents', sa.Column('batch_id', sa.UUID(), nullable=True))
+    op.alter_column('documents', 'file_size',
+               existing_type=sa.INTEGER(),
+               type_=sa.BigInteger(),
+               existing_nullable=False)
+    op.create_index(op.f('ix_documents_batch_id'), 'documents', ['batch_id'], unique=False)
+    op.create_index('ix_documents_created_at_id', 'documents', ['created_at', 'id'], unique=False)
+    op.create_index('ix_documents_search_vector', 'documents', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index(op.f('ix_documents_sha256'), 'documents', ['sha256'], unique=False)
+    op.create_foreign_key('documents_sha256_fkey', 'documents', 'blobs', ['sha256'], ['sha256'])
+    op.create_foreign_key(
+        'documents_batch_id_fkey', 'documents', 'upload_batches', ['batch_id'], ['id'], ondelete='SET NULL'
+    )
+    op.execute(
+        "INSERT INTO document_contents (document_id, body, char_count) "
+        "SELECT id, extracted_text, char_length(extracted_text) FROM documents WHERE extracted_text IS NOT NULL"
+    )
+    # Title (A) and text (B) lexemes, as DocumentRepository.search_vector builds them
+    op.execute(
+        sa.text(
+            "UPDATE documents SET search_vector ="
+            " setweight(to_tsvector(CAST(:config AS regconfig), coalesce(title, '')), 'A')"
+            " || setweight(to_tsvector(CAST(:config AS regconfig), coalesce(extracted_text, '')), 'B')"
+            " WHERE search_vector IS NULL"
+        ).bindparams(config=settings.SEARCH_LANGUAGE)
+    )
+    op.drop_column('documents', 'extracted_text')
+    op.create_index('ix_qa_messages_session_id_id', 'qa_messages', ['session_id', 'id'], unique=False)
+    op.add_column('qa_sessions', sa.Column('summary', sa.Text(), nullable=True))
+    op.add_column('qa_sessions', sa.Column('summary_until_id', sa.Integer(), nullable=True))
+    op.create_index(
+        'ix_qa_sessions_user_document_created', 'qa_sessions', ['user_id', 'document_id', 'created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_qa_sessions_user_document_created', table_name='qa_sessions')
+    op.drop_column('qa_sessions', 'summary_until_id')
+    op.drop_column('qa_sessions', 'summary')
+    op.drop_index('ix_qa_messages_session_id_id', table_name='qa_messages')
+    op.add_column('documents', sa.Column('extracted_text', sa.TEXT(), autoincrement=False, nullable=True))
+    _restore_extracted_text()
+    op.drop_constraint('documents_batch_id_fkey', 'documents', type_='foreignkey')
+    op.drop_constraint('documents_sha256_fkey', 'documents', type_='foreignkey')
+    op.drop_index(op.f('ix_documents_sha256'), table_name='documents')
+    op.drop_index('ix_documents_search_vector', table_name='documents', postgresql_using='gin')
+    op.drop_index('ix_documents_created_at_id', table_name='documents')
+    op.drop_index(op.f('ix_documents_batch_id'), table_name='documents')
+    op.alter_column('documents', 'file_size',
+               existing_type=sa.BigInteger(),
+               type_=sa.INTEGER(),
+               existing_nullable=False)
+    op.drop_column('documents', 'batch_id')
+    op.drop_column('documents', 'search_vector')
+    op.drop_column('documents', 'sha256')
+    op.drop_index(op.f('ix_ocr_jobs_status'), table_name='ocr_jobs')
+    op.drop_index(op.f('ix_ocr_jobs_document_id'), table_name='ocr_jobs')
+    op.drop_table('ocr_jobs')
+    sa.Enum(name='ocrjobstatus').drop(op.get_bind())
+    op.drop_table('document_contents')
+    op.drop_index('ix_document_chunks_document_position', table_name='document_chunks')
+    op.drop_table('document_chunks')
+    op.drop_index(op.f('ix_upload_sessions_user_id'), table_name='upload_sessions')
+    op.drop_index(op.f('ix_upload_sessions_expires_at'), table_name='upload_sessions')
+    op.drop_table('upload_sessions')
+    op.drop_index(op.f('ix_upload_batches_user_id'), table_name='upload_batches')
+    op.drop_table('upload_batches')
+    op.drop_table('upload_buckets')
+    op.drop_table('stat_counters')
+    op.drop_table('blobs')
+
+
+def _restore_extracted_text() -> None:
+    """Copy ``document_contents`` back into the old column, decompressing in Python."""
+    bind = op.get_bind()
+    op.execute(
+        "UPDATE documents d SET extracted_text = c.body FROM document_contents c "
+        "WHERE c.document_id = d.id AND c.body IS NOT NULL"
+    )
+    rows = bind.execute(sa.text("SELECT document_id, compressed FROM document_contents WHERE compressed IS NOT NULL"))
+    for document_id, compressed in rows.all():
+        bind.execute(
+            sa.text("UPDATE documents SET extracted_text = :text WHERE id = :id"),
+            {"text": zlib.decompress(compressed).decode(), "id": document_id},
+        )
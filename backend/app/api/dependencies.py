@@ -5,17 +5,15 @@ from fastapi import Depends, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.principals import Principal, principal_cache
 from app.core.security import decode_token
 from app.models.user import User, UserRole
 from app.repositories.user_repo import UserRepository
 from app.exceptions.http_exceptions import UnauthorizedException, ForbiddenException
 
 
-async def get_current_user(
-    authorization: str = Header(..., description="Bearer <token>"),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    """Extract and validate JWT from Authorization header."""
+def _token_subject(authorization: str) -> UUID:
+    """Validate the Bearer access token and return its subject (user id)."""
     if not authorization.startswith("Bearer "):
         raise UnauthorizedException("Invalid authorization header")
 
@@ -25,18 +23,47 @@ async def get_current_user(
         raise UnauthorizedException("Invalid or expired token")
 
     user_id = payload.get("sub")
-    if not user_id:
+    try:
+        return UUID(user_id)
+    except (TypeError, ValueError):
         raise UnauthorizedException("Invalid token payload")
 
+
+async def get_current_principal(
+    authorization: str = Header(..., description="Bearer <token>"),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """Identity and role of the caller, served from cache without loading the ORM User."""
+    user_id = _token_subject(authorization)
+
+    principal = principal_cache.get(str(user_id))
+    if principal is None:
+        principal = await UserRepository(db).get_principal(user_id)
+        if not principal:
+            raise UnauthorizedException("User not found")
+        principal_cache.set(str(user_id), principal)
+
+    return principal
+
+
+async def get_current_user(
+    authorization: str = Header(..., description="Bearer <token>"),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Full ORM User for routes that need more than identity and role."""
+    user_id = _token_subject(authorization)
+
     repo = UserRepository(db)
-    user = await repo.get_by_id(UUID(user_id))
+    user = await repo.get_by_id(user_id)
     if not user:
         raise UnauthorizedException("User not found")
 
     return user
 
 
-async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+async def require_admin(
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     """Ensure the current user has ADMIN role."""
     if current_user.role != UserRole.ADMIN:
         raise ForbiddenException("Admin access required")
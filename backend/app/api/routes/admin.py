@@ -1,15 +1,17 @@
 """Admin routes – user management and statistics."""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.api.dependencies import require_admin
-from app.models.user import User
-from app.schemas.admin import AdminUserResponse, AdminStatsResponse
+from app.core.principals import Principal
+from app.schemas.admin import AdminUserResponse, AdminStatsResponse, CacheStatsResponse, StatsPointResponse
 from app.repositories.user_repo import UserRepository
 from app.repositories.document_repo import DocumentRepository
 from app.services.document_service import DocumentService
+from app.services.stats_service import StatsInterval, StatsService
+from app.utils.cache import TTLCache
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -17,10 +19,10 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 @router.get("/users", response_model=list[AdminUserResponse])
 async def list_users(
     db: AsyncSession = Depends(get_db),
-    admin: User = Depends(require_admin),
+    admin: Principal = Depends(require_admin),
 ):
     repo = UserRepository(db)
-    users = await repo.get_all()
+    users = await repo.get_all_with_document_counts()
     return [
         AdminUserResponse(
             id=str(u.id),
@@ -28,32 +30,43 @@ async def list_users(
             full_name=u.full_name,
             role=u.role.value,
             created_at=str(u.created_at),
-            document_count=len(u.documents) if u.documents else 0,
+            document_count=document_count,
         )
-        for u in users
+        for u, document_count in users
     ]
 
 
 @router.get("/stats", response_model=AdminStatsResponse)
 async def get_stats(
     db: AsyncSession = Depends(get_db),
-    admin: User = Depends(require_admin),
+    admin: Principal = Depends(require_admin),
 ):
-    user_repo = UserRepository(db)
-    doc_repo = DocumentRepository(db)
-    return AdminStatsResponse(
-        total_users=await user_repo.count(),
-        total_documents=await doc_repo.count(),
-        total_deleted_documents=await doc_repo.count_deleted(),
-        uploads_today=await doc_repo.count_uploads_today(),
-    )
+    """Dashboard totals from incrementally maintained counters (cached for a few seconds)."""
+    return AdminStatsResponse(**await StatsService(db).get_stats())
+
+
+@router.get("/stats/series", response_model=list[StatsPointResponse])
+async def get_stats_series(
+    interval: StatsInterval = Query("day"),
+    days: int = Query(7, ge=1, le=365),
+    db: AsyncSession = Depends(get_db),
+    admin: Principal = Depends(require_admin),
+):
+    """Uploads, bytes and OCR backlog per hour or day, from the hourly upload buckets."""
+    return [StatsPointResponse(**point) for point in await StatsService(db).get_series(interval, days)]
+
+
+@router.get("/caches", response_model=list[CacheStatsResponse])
+async def get_cache_stats(admin: Principal = Depends(require_admin)):
+    """Hit/miss metrics of this worker's in-process caches."""
+    return [CacheStatsResponse(**stats) for stats in TTLCache.all_stats()]
 
 
 @router.delete("/documents/{doc_id}", status_code=204)
 async def admin_delete_document(
     doc_id: str,
     db: AsyncSession = Depends(get_db),
-    admin: User = Depends(require_admin),
+    admin: Principal = Depends(require_admin),
 ):
     from uuid import UUID
     service = DocumentService(db)
@@ -1,22 +1,30 @@
 """Document routes – upload, list, detail, update, delete."""
 
-import asyncio
-import math
-
-from fastapi import APIRouter, Depends, UploadFile, File, Form, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, UploadFile, File, Form, Header, Query, Request, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.api.dependencies import get_current_user
-from app.models.user import User
+from app.api.dependencies import get_current_principal
+from app.core.principals import Principal
 from app.schemas.document import (
     DocumentResponse, DocumentDetailResponse, DocumentListResponse, DocumentUpdate,
+    OCRJobResponse, UploadBatchResponse, UploadBatchProgressResponse,
+    UploadSessionCreate, UploadComplete, UploadSessionResponse,
 )
-from app.services.document_service import DocumentService
-from app.utils.ocr import process_ocr_background
+from app.core.config import settings
+from app.services.document_service import ALLOWED_TYPES, DocumentService
+from app.services.upload_service import UploadSessionService
+from app.utils.file_serving import serve_file, signed_preview_url, signed_url
+from app.utils.previews import PREVIEW_MEDIA_TYPES, PREVIEW_SIZES, PreviewError
+from app.workers.ocr_worker import ocr_pool
+from app.workers.preview_worker import preview_pool
+from app.utils.pagination import CountMode, page_count
+from app.exceptions.http_exceptions import NotFoundException, ServiceUnavailableException
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 
+FILE_MEDIA_TYPES = {file_type: media_type for media_type, file_type in ALLOWED_TYPES.items()}
+
 
 def _doc_to_response(doc) -> DocumentResponse:
     return DocumentResponse(
@@ -29,6 +37,31 @@ def _doc_to_response(doc) -> DocumentResponse:
         updated_at=str(doc.updated_at),
         uploaded_by=str(doc.uploaded_by),
         tags=[{"id": t.id, "name": t.name} for t in doc.tags],
+        thumbnail_url=signed_preview_url(doc.sha256, 1, "thumb"),
+    )
+
+
+def _batch_to_response(batch, **extra) -> UploadBatchResponse | UploadBatchProgressResponse:
+    fields = dict(
+        id=str(batch.id),
+        total=batch.total,
+        accepted=batch.accepted,
+        created_at=str(batch.created_at),
+        files=batch.results,
+    )
+    if extra:
+        return UploadBatchProgressResponse(**fields, **extra)
+    return UploadBatchResponse(**fields)
+
+
+def _session_to_response(session) -> UploadSessionResponse:
+    return UploadSessionResponse(
+        id=str(session.id),
+        filename=session.filename,
+        size=session.total_size,
+        offset=session.received,
+        max_chunk_size=settings.resumable_chunk_max_bytes,
+        expires_at=str(session.expires_at),
     )
 
 
@@ -39,6 +72,8 @@ def _doc_to_detail(doc) -> DocumentDetailResponse:
         file_type=doc.file_type,
         file_size=doc.file_size,
         file_path=doc.file_path,
+        file_url=signed_url(doc.file_path),
+        preview_url=signed_preview_url(doc.sha256, 1, "large"),
         extracted_text=doc.extracted_text,
         is_deleted=doc.is_deleted,
         created_at=str(doc.created_at),
@@ -46,6 +81,7 @@ def _doc_to_detail(doc) -> DocumentDetailResponse:
         uploaded_by=str(doc.uploaded_by),
         owner_email=doc.owner.email if doc.owner else None,
         tags=[{"id": t.id, "name": t.name} for t in doc.tags],
+        thumbnail_url=signed_preview_url(doc.sha256, 1, "thumb"),
     )
 
 
@@ -56,20 +92,142 @@ async def upload_document(
     title: str = Form(""),
     tags: str = Form(""),  # comma-separated
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
+    # Push back while the OCR queue is saturated instead of piling up work
+    if ocr_pool.saturated:
+        raise ServiceUnavailableException("OCR queue is full, please retry shortly")
+
     tag_names = [t.strip() for t in tags.split(",") if t.strip()] if tags else None
     service = DocumentService(db)
-    doc = await service.upload(
+    doc, job = await service.upload(
         file=file, title=title, user_id=current_user.id, tag_names=tag_names
     )
 
-    # Trigger OCR in background
-    background_tasks.add_task(process_ocr_background, str(doc.id), doc.file_path)
+    # Queue OCR once the job row is committed (skipped when a duplicate reuses stored text)
+    if job:
+        background_tasks.add_task(ocr_pool.submit, job.id, job.priority)
+    background_tasks.add_task(preview_pool.schedule, doc.sha256, doc.file_path)
 
     return _doc_to_response(doc)
 
 
+@router.post("/bulk", response_model=UploadBatchResponse, status_code=201)
+async def bulk_upload_documents(
+    background_tasks: BackgroundTasks,
+    files: list[UploadFile] = File(..., description="Documents and/or ZIP archives of documents"),
+    tags: str = Form(""),  # comma-separated, applied to every document
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    if ocr_pool.saturated:
+        raise ServiceUnavailableException("OCR queue is full, please retry shortly")
+
+    tag_names = [t.strip() for t in tags.split(",") if t.strip()] if tags else None
+    service = DocumentService(db)
+    batch, jobs, new_blobs = await service.bulk_upload(
+        files=files, user_id=current_user.id, tag_names=tag_names
+    )
+
+    if jobs:
+        background_tasks.add_task(ocr_pool.submit_many, jobs)
+    background_tasks.add_task(preview_pool.schedule_many, new_blobs)
+
+    return _batch_to_response(batch)
+
+
+@router.get("/batches/{batch_id}", response_model=UploadBatchProgressResponse)
+async def get_upload_batch(
+    batch_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    from uuid import UUID
+    service = DocumentService(db)
+    batch, jobs, with_text = await service.get_batch(
+        UUID(batch_id), user_id=current_user.id, user_role=current_user.role.value
+    )
+    return _batch_to_response(batch, ocr_jobs=jobs, documents_with_text=with_text)
+
+
+# ── Resumable uploads ────────────────────────────────
+@router.post("/uploads", response_model=UploadSessionResponse, status_code=201)
+async def create_upload_session(
+    body: UploadSessionCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    service = UploadSessionService(db)
+    session = await service.create(
+        user_id=current_user.id, filename=body.filename, size=body.size, title=body.title, tag_names=body.tags
+    )
+    return _session_to_response(session)
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload_session(
+    upload_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    from uuid import UUID
+    service = UploadSessionService(db)
+    return _session_to_response(await service.get(UUID(upload_id), current_user.id))
+
+
+@router.put("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Byte offset of this chunk – the session's current offset"),
+    chunk_sha256: str | None = Header(None, description="sha256 hex of this chunk, verified if sent"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Append the raw request body at ``offset``; the body streams straight to disk."""
+    from uuid import UUID
+    service = UploadSessionService(db)
+    session = await service.write_chunk(
+        UUID(upload_id), current_user.id, offset, request.stream(), checksum=chunk_sha256
+    )
+    return _session_to_response(session)
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=UploadBatchResponse, status_code=201)
+async def complete_upload(
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    body: UploadComplete | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    from uuid import UUID
+    if ocr_pool.saturated:
+        raise ServiceUnavailableException("OCR queue is full, please retry shortly")
+
+    service = UploadSessionService(db)
+    batch, jobs, new_blobs = await service.complete(
+        UUID(upload_id), current_user.id, sha256=body.sha256 if body else None
+    )
+
+    if jobs:
+        background_tasks.add_task(ocr_pool.submit_many, jobs)
+    background_tasks.add_task(preview_pool.schedule_many, new_blobs)
+
+    return _batch_to_response(batch)
+
+
+@router.delete("/uploads/{upload_id}", status_code=204)
+async def cancel_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    from uuid import UUID
+    service = UploadSessionService(db)
+    await service.cancel(UUID(upload_id), current_user.id)
+
+
 @router.get("", response_model=DocumentListResponse)
 async def list_documents(
     page: int = Query(1, ge=1),
@@ -77,19 +235,23 @@ async def list_documents(
     file_type: str | None = Query(None),
     tag: str | None = Query(None),
     title: str | None = Query(None),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    count: CountMode | None = Query(None, description="Defaults to exact, or none with a cursor"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     service = DocumentService(db)
-    items, total = await service.list_documents(
+    items, total, next_cursor = await service.list_documents(
         page=page, size=size, file_type=file_type, tag=tag, title_search=title,
+        cursor=cursor, count=count or ("none" if cursor else "exact"),
     )
     return DocumentListResponse(
-        items=[_doc_to_response(d) for d in items],
+        items=[DocumentResponse.from_row(row) for row in items],
         total=total,
         page=page,
         size=size,
-        pages=math.ceil(total / size) if total > 0 else 0,
+        pages=page_count(total, size),
+        next_cursor=next_cursor,
     )
 
 
@@ -97,20 +259,95 @@ async def list_documents(
 async def get_document(
     doc_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     from uuid import UUID
     service = DocumentService(db)
-    doc = await service.get_document(UUID(doc_id))
+    doc = await service.get_document(UUID(doc_id), with_text=True)
     return _doc_to_detail(doc)
 
 
+@router.api_route("/{doc_id}/file", methods=["GET", "HEAD"])
+async def download_document(
+    doc_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """The document's file, with Range and If-None-Match support."""
+    from pathlib import Path
+    from uuid import UUID
+    service = DocumentService(db)
+    doc = await service.get_document(UUID(doc_id))
+    filename = doc.title if doc.title.lower().endswith(f".{doc.file_type}") else f"{doc.title}.{doc.file_type}"
+    return await serve_file(
+        request,
+        Path(doc.file_path),
+        media_type=FILE_MEDIA_TYPES.get(doc.file_type),
+        cache_control="private, no-cache",
+        tag=doc.sha256,
+        filename=filename,
+        accel=True,
+    )
+
+
+@router.api_route("/{doc_id}/preview", methods=["GET", "HEAD"])
+async def get_document_preview(
+    doc_id: str,
+    request: Request,
+    page: int = Query(1, ge=1),
+    size: str = Query("thumb", description=f"One of {', '.join(PREVIEW_SIZES)}"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """A rendered page preview – for API clients; pages use the signed preview URLs."""
+    from uuid import UUID
+    if size not in PREVIEW_SIZES:
+        raise NotFoundException("Unknown preview size")
+    service = DocumentService(db)
+    doc = await service.get_document(UUID(doc_id))
+    if doc.sha256 is None:
+        raise NotFoundException("Preview not available")
+    try:
+        path = await preview_pool.get(doc.sha256, doc.file_path, page, size)
+    except PreviewError:
+        raise NotFoundException("Preview not available")
+    return await serve_file(
+        request,
+        path,
+        media_type=PREVIEW_MEDIA_TYPES.get(settings.PREVIEW_FORMAT),
+        # A document's bytes never change, so neither do its previews
+        cache_control="private, max-age=31536000, immutable",
+        tag=f"{doc.sha256}-{page}-{size}-{settings.PREVIEW_FORMAT}",
+    )
+
+
+@router.get("/{doc_id}/ocr", response_model=OCRJobResponse)
+async def get_ocr_status(
+    doc_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    from uuid import UUID
+    service = DocumentService(db)
+    job = await service.get_ocr_job(UUID(doc_id))
+    return OCRJobResponse(
+        id=job.id,
+        document_id=str(job.document_id),
+        status=job.status.value,
+        attempts=job.attempts,
+        last_error=job.last_error,
+        created_at=str(job.created_at),
+        updated_at=str(job.updated_at),
+    )
+
+
 @router.put("/{doc_id}", response_model=DocumentResponse)
 async def update_document(
     doc_id: str,
     body: DocumentUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     from uuid import UUID
     service = DocumentService(db)
@@ -128,7 +365,7 @@ async def update_document(
 async def delete_document(
     doc_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     from uuid import UUID
     service = DocumentService(db)
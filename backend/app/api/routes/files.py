@@ -0,0 +1,40 @@
+"""File routes – stored files behind short-lived signed URLs."""
+
+import mimetypes
+import time
+
+from fastapi import APIRouter, Query, Request
+
+from app.core.config import settings
+from app.utils.file_serving import FILES_PATH, serve_file, verify_signature
+from app.exceptions.http_exceptions import ForbiddenException, NotFoundException
+
+router = APIRouter(prefix="/files", tags=["Files"])
+
+
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"])
+async def get_file(
+    file_path: str,
+    request: Request,
+    md5: str = Query(..., description="Signature from a signed file URL"),
+    expires: int = Query(..., description="Unix time the URL stops working"),
+):
+    """Serve a file by signed URL – no session needed, so ``<img>`` and ``<a>`` tags can use it.
+
+    In production nginx answers these itself (see ``app.utils.file_serving``).
+    """
+    if not verify_signature(FILES_PATH + file_path, md5, expires):
+        raise ForbiddenException("Invalid or expired file link")
+
+    root = settings.upload_path.resolve()
+    path = (root / file_path).resolve()
+    if not path.is_relative_to(root) or path.is_relative_to(root / ".incoming") or not path.is_file():
+        raise NotFoundException("File not found")
+
+    return await serve_file(
+        request,
+        path,
+        media_type=mimetypes.guess_type(path.name)[0],
+        # Blob paths are content-addressed, so the bytes behind a URL never change
+        cache_control=f"private, max-age={max(expires - int(time.time()), 0)}, immutable",
+    )
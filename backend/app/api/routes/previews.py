@@ -0,0 +1,52 @@
+"""Preview routes – page thumbnails and previews behind signed URLs."""
+
+import time
+
+from fastapi import APIRouter, Depends, Path as PathParam, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.repositories.document_repo import BlobRepository
+from app.utils.file_serving import PREVIEWS_PATH, serve_file, verify_signature
+from app.utils.previews import PREVIEW_MEDIA_TYPES, PREVIEW_SIZES, PreviewError
+from app.workers.preview_worker import preview_pool
+from app.exceptions.http_exceptions import ForbiddenException, NotFoundException
+
+router = APIRouter(prefix="/previews", tags=["Previews"])
+
+
+@router.api_route("/{sha256}/{page}/{size}", methods=["GET", "HEAD"])
+async def get_preview(
+    sha256: str,
+    request: Request,
+    page: int = PathParam(..., ge=1),
+    size: str = PathParam(..., description=f"One of {', '.join(PREVIEW_SIZES)}"),
+    md5: str = Query(..., description="Signature from a signed preview URL"),
+    expires: int = Query(..., description="Unix time the URL stops working"),
+    db: AsyncSession = Depends(get_db),
+):
+    """A rendered page preview. Cache hits are served without touching the database."""
+    if not verify_signature(f"{PREVIEWS_PATH}{sha256}/{page}/{size}", md5, expires):
+        raise ForbiddenException("Invalid or expired preview link")
+    if size not in PREVIEW_SIZES:
+        raise NotFoundException("Unknown preview size")
+
+    path = await preview_pool.cached(sha256, page, size)
+    if path is None:
+        blob = await BlobRepository(db).get(sha256)
+        if not blob:
+            raise NotFoundException("File not found")
+        try:
+            path = await preview_pool.get(sha256, blob.file_path, page, size)
+        except PreviewError:
+            raise NotFoundException("Preview not available")
+
+    return await serve_file(
+        request,
+        path,
+        media_type=PREVIEW_MEDIA_TYPES.get(settings.PREVIEW_FORMAT),
+        # Previews of a blob never change, so browsers keep them for as long as the URL is valid
+        cache_control=f"private, max-age={max(expires - int(time.time()), 0)}, immutable",
+        tag=f"{sha256}-{page}-{size}-{settings.PREVIEW_FORMAT}",
+    )
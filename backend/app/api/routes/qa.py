@@ -1,12 +1,13 @@
 """QA routes – AI-powered document Q&A."""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query as QueryParam
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.api.dependencies import get_current_user
-from app.models.user import User
-from app.schemas.qa import QARequest, QAResponse
+from app.api.dependencies import get_current_principal
+from app.core.principals import Principal
+from app.schemas.qa import QARequest, QAResponse, QAHistoryResponse
 from app.services.qa_service import QAService
 
 router = APIRouter(prefix="/qa", tags=["AI Q&A"])
@@ -17,7 +18,7 @@ async def ask_question(
     document_id: str,
     body: QARequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     from uuid import UUID
     service = QAService(db)
@@ -27,3 +28,41 @@ async def ask_question(
         question=body.question,
     )
     return QAResponse(**result)
+
+
+@router.post("/{document_id}/stream")
+async def ask_question_stream(
+    document_id: str,
+    body: QARequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Server-sent events: ``token`` deltas as the model produces them, then ``done``."""
+    from uuid import UUID
+    service = QAService(db)
+    events = await service.stream_answer(
+        document_id=UUID(document_id),
+        user_id=current_user.id,
+        question=body.question,
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Keep proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{document_id}/history", response_model=QAHistoryResponse)
+async def get_history(
+    document_id: str,
+    cursor: str | None = QueryParam(None, description="history_cursor / next_cursor from a previous response"),
+    size: int = QueryParam(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Your latest Q&A session on the document, newest page first, messages oldest first."""
+    from uuid import UUID
+    service = QAService(db)
+    result = await service.get_history(UUID(document_id), current_user.id, cursor=cursor, size=size)
+    return QAHistoryResponse(**result)
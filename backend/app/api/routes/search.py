@@ -1,45 +1,40 @@
 """Search routes."""
 
-import math
 from fastapi import APIRouter, Depends, Query as QueryParam
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.api.dependencies import get_current_user
-from app.models.user import User
-from app.schemas.document import DocumentResponse, DocumentListResponse
+from app.api.dependencies import get_current_principal
+from app.core.principals import Principal
+from app.schemas.document import SearchResultResponse, SearchListResponse
 from app.services.document_service import DocumentService
+from app.services.search_service import SearchMode
+from app.utils.pagination import CountMode, page_count
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
 
-@router.get("", response_model=DocumentListResponse)
+@router.get("", response_model=SearchListResponse)
 async def search_documents(
     q: str = QueryParam(..., min_length=1, description="Search query"),
     page: int = QueryParam(1, ge=1),
     size: int = QueryParam(20, ge=1, le=100),
+    cursor: str | None = QueryParam(None, description="next_cursor from the previous page"),
+    count: CountMode | None = QueryParam(None, description="Defaults to exact, or none with a cursor"),
+    mode: SearchMode = QueryParam("lexical", description="lexical (full-text), semantic or hybrid"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     service = DocumentService(db)
-    items, total = await service.search(query=q, page=page, size=size)
-    return DocumentListResponse(
-        items=[
-            DocumentResponse(
-                id=str(d.id),
-                title=d.title,
-                file_type=d.file_type,
-                file_size=d.file_size,
-                is_deleted=d.is_deleted,
-                created_at=str(d.created_at),
-                updated_at=str(d.updated_at),
-                uploaded_by=str(d.uploaded_by),
-                tags=[{"id": t.id, "name": t.name} for t in d.tags],
-            )
-            for d in items
-        ],
+    items, total, next_cursor = await service.search(
+        query=q, page=page, size=size,
+        cursor=cursor, count=count or ("none" if cursor else "exact"), mode=mode,
+    )
+    return SearchListResponse(
+        items=[SearchResultResponse.from_row(row, rank=rank, snippet=snippet) for row, rank, snippet in items],
         total=total,
         page=page,
         size=size,
-        pages=math.ceil(total / size) if total > 0 else 0,
+        pages=page_count(total, size),
+        next_cursor=next_cursor,
     )
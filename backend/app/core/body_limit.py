@@ -0,0 +1,57 @@
+"""Body size caps for upload endpoints, enforced before the body is parsed.
+
+By the time an endpoint taking ``UploadFile`` runs, Starlette has already
+received and spooled the whole multipart body, so a size check there cannot
+stop an oversized upload. This middleware answers 413 from ``Content-Length``
+without reading the body, and counts the bytes of bodies sent without one
+(chunked), failing the request as soon as they pass the cap.
+"""
+
+from collections.abc import Callable
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.exceptions.http_exceptions import PayloadTooLargeException
+
+# Room for the multipart boundaries, part headers and small form fields (title, tags)
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class BodySizeLimitMiddleware:
+    """Caps the body of the ``(method, path)`` routes in ``limits``.
+
+    Each limit returns the largest payload, in bytes, the route accepts.
+    """
+
+    def __init__(self, app: ASGIApp, limits: dict[tuple[str, str], Callable[[], int]]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        payload = limit()
+        max_bytes = payload + MULTIPART_OVERHEAD_BYTES
+        detail = f"Upload too large. Maximum: {payload // (1024 * 1024)}MB"
+        declared = next((value for name, value in scope["headers"] if name == b"content-length"), None)
+        if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def capped_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # FastAPI re-raises HTTPExceptions from body parsing, so this becomes the response
+                    raise PayloadTooLargeException(detail)
+            return message
+
+        await self.app(scope, capped_receive, send)
@@ -1,5 +1,6 @@
 """Application configuration using pydantic-settings."""
 
+import os
 from pydantic_settings import BaseSettings
 from pathlib import Path
 
@@ -9,6 +10,7 @@ class Settings(BaseSettings):
     APP_NAME: str = "SmartArchive"
     DEBUG: bool = False
     API_V1_PREFIX: str = "/api"
+    QUERY_BUDGET_PER_REQUEST: int = 10  # log a warning above this many DB queries
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
 
     # ── Database ─────────────────────────────────────
@@ -19,14 +21,95 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Role changes made in another worker or directly in the database apply after at most this (capped at 300)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_SIZE: int = 10000
+
+    # ── Password Hashing ─────────────────────────────
+    BCRYPT_ROUNDS: int = 12  # hashes below this cost are upgraded on login
+    PASSWORD_HASH_WORKERS: int = 4  # max concurrent bcrypt operations per worker
 
     # ── File Upload ──────────────────────────────────
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE_MB: int = 10
+    UPLOAD_CHUNK_SIZE_KB: int = 256
+    BULK_MAX_FILES: int = 500  # per bulk upload, counting ZIP members
+    BULK_UPLOAD_CONCURRENCY: int = 8
+    # Resumable uploads stream chunk by chunk to disk, so they can be far larger
+    RESUMABLE_MAX_FILE_SIZE_MB: int = 4096
+    RESUMABLE_CHUNK_MAX_MB: int = 32
+    UPLOAD_SESSION_TTL_HOURS: int = 24
+    UPLOAD_CHUNK_LEASE_SECONDS: int = 600  # a chunk still streaming in after this is abandoned
+
+    # ── File Serving ─────────────────────────────────
+    # Signs /api/files and /api/previews URLs – required, and not the JWT key; nginx's
+    # secure_link_md5 needs the same value
+    FILE_URL_SECRET: str = ""
+    FILE_URL_TTL_SECONDS: int = 900
+    # Internal nginx location mapped to UPLOAD_DIR; when set, downloads go out via X-Accel-Redirect
+    FILE_ACCEL_REDIRECT_PREFIX: str = ""
+    FILE_READ_CHUNK_KB: int = 256
+
+    # ── OCR Workers ──────────────────────────────────
+    OCR_WORKERS: int = 0  # 0 = one process per CPU core
+    OCR_QUEUE_SIZE: int = 100
+    OCR_MAX_ATTEMPTS: int = 3
+    OCR_RETRY_BACKOFF_SECONDS: float = 5.0
+    OCR_JOB_TIMEOUT_SECONDS: int = 300
+    OCR_SMALL_FILE_MB: int = 2
+    OCR_PDF_DPI: int = 300
+    # Image preprocessing before Tesseract, run in this order; empty = hand images over as-is
+    OCR_PREPROCESS: str = "exif,grayscale,downscale,deskew,binarize"
+    OCR_TARGET_DPI: int = 300
+    OCR_PAGE_INCHES: float = 11.0  # assumed long edge of a photographed page, to estimate its DPI
+    OCR_DESKEW_MAX_ANGLE: float = 10.0
+    TEXT_COMPRESS_ABOVE_KB: int = 256  # extracted texts above this are stored compressed; 0 = never
+
+    # ── Previews ─────────────────────────────────────
+    PREVIEW_WORKERS: int = 2
+    PREVIEW_QUEUE_SIZE: int = 200  # post-upload renders; dropped when full and rendered on demand instead
+    PREVIEW_FORMAT: str = "webp"  # webp or jpeg
+    PREVIEW_QUALITY: int = 80
+    PREVIEW_CACHE_DIR: str = ""  # defaults to <UPLOAD_DIR>/.previews
+    PREVIEW_CACHE_MAX_MB: int = 1024
+    PREVIEW_URL_TTL_SECONDS: int = 3600
+
+    # ── Search ───────────────────────────────────────
+    SEARCH_LANGUAGE: str = "english"  # Postgres text search configuration
+    COUNT_CACHE_TTL_SECONDS: int = 30
+    TAG_CACHE_SIZE: int = 5000
+    EMBEDDING_MODEL: str = ""  # optional sentence-transformers model; hashing vectorizer otherwise
+    EMBEDDING_DIM: int = 256  # hashing vectorizer only
+    SEARCH_CANDIDATES: int = 200  # documents considered by semantic/hybrid ranking
+    SEARCH_SEMANTIC_WEIGHT: float = 0.5  # hybrid score = w·semantic + (1-w)·lexical
+    VECTOR_INDEX_NPROBE: int = 8
+
+    # ── Admin Stats ──────────────────────────────────
+    STATS_CACHE_TTL_SECONDS: int = 15
+    STATS_RECONCILE_SECONDS: int = 300  # counters are corrected against real counts this often
+    STATS_RECONCILE_HOURS: int = 48  # upload buckets re-derived on each reconciliation
+
+    # ── Question Answering ───────────────────────────
+    QA_CHUNK_CHARS: int = 1500
+    QA_TOP_K: int = 8
+    QA_CONTEXT_TOKENS: int = 1500  # budget for retrieved chunks in the prompt
+    QA_PROMPT_TOKENS: int = 3000  # whole prompt: system, summary, recent turns, chunks, question
+    QA_HISTORY_MESSAGES: int = 10  # recent messages considered for verbatim inclusion
+    QA_HISTORY_TOKENS: int = 800  # budget for verbatim recent turns
+    QA_SUMMARY_TOKENS: int = 300  # budget for the rolling summary of older turns
+    QA_INDEX_CACHE_SIZE: int = 64  # per-document BM25 indexes kept in memory
+    QA_OFFLINE: bool = False  # answer from the paragraph index only, even with an API key
+    QA_FALLBACK_EXCERPTS: int = 3  # excerpts in a keyword-only answer
+    QA_CACHE_SIZE: int = 2000  # cached answers per worker
+    QA_CACHE_TTL_SECONDS: int = 86400
+    QA_CACHE_SIMILARITY: float = 0.9  # cosine at which a rephrased question reuses an answer
 
     # ── OpenAI (optional) ────────────────────────────
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-3.5-turbo"
+    LLM_BASE_URL: str = "https://api.openai.com/v1"  # any OpenAI-compatible endpoint
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_MAX_CONNECTIONS: int = 20
 
     @property
     def cors_origins_list(self) -> list[str]:
@@ -36,6 +119,30 @@ class Settings(BaseSettings):
     def max_file_size_bytes(self) -> int:
         return self.MAX_FILE_SIZE_MB * 1024 * 1024
 
+    @property
+    def resumable_max_file_size_bytes(self) -> int:
+        return self.RESUMABLE_MAX_FILE_SIZE_MB * 1024 * 1024
+
+    @property
+    def resumable_chunk_max_bytes(self) -> int:
+        return self.RESUMABLE_CHUNK_MAX_MB * 1024 * 1024
+
+    @property
+    def upload_chunk_size_bytes(self) -> int:
+        return self.UPLOAD_CHUNK_SIZE_KB * 1024
+
+    @property
+    def ocr_preprocess_stages(self) -> list[str]:
+        return [stage.strip() for stage in self.OCR_PREPROCESS.split(",") if stage.strip()]
+
+    @property
+    def ocr_worker_count(self) -> int:
+        return self.OCR_WORKERS or os.cpu_count() or 1
+
+    @property
+    def preview_cache_path(self) -> Path:
+        return Path(self.PREVIEW_CACHE_DIR) if self.PREVIEW_CACHE_DIR else self.upload_path / ".previews"
+
     @property
     def upload_path(self) -> Path:
         path = Path(self.UPLOAD_DIR)
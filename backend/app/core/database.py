@@ -1,10 +1,19 @@
 """Async SQLAlchemy engine, session factory, and Base model."""
 
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import Connection, inspect
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
+from app.core import query_metrics
 from app.core.config import settings
 
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
@@ -12,6 +21,7 @@ engine = create_async_engine(
     pool_size=10,
     max_overflow=20,
 )
+query_metrics.install(engine)
 
 async_session_factory = async_sessionmaker(
     engine,
@@ -39,6 +49,24 @@ async def get_db() -> AsyncSession:
 
 
 async def init_db() -> None:
-    """Create all tables (used in development only)."""
+    """Create the schema on an empty database; otherwise check it is at the latest migration.
+
+    Migrations, and the data moves in them, only run through ``alembic upgrade head``.
+    """
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_or_check_schema)
+
+
+def _create_or_check_schema(conn: Connection) -> None:
+    script = ScriptDirectory.from_config(Config(str(ALEMBIC_INI)))
+    migrations = MigrationContext.configure(conn)
+    current, head = migrations.get_current_revision(), script.get_current_head()
+    if current is None:
+        if inspect(conn).has_table("documents"):
+            raise RuntimeError(
+                "The database predates migrations: run `alembic stamp 0001` and then `alembic upgrade head`"
+            )
+        Base.metadata.create_all(conn)
+        migrations.stamp(script, "head")
+    elif current != head:
+        raise RuntimeError(f"The database schema is at revision {current}, not {head}: run `alembic upgrade head`")
@@ -0,0 +1,82 @@
+"""App-scoped client for the OpenAI-compatible chat completions API."""
+
+import json
+from typing import AsyncIterator
+
+import httpx
+
+from app.core.config import settings
+
+
+class LLMClient:
+    """One pooled ``httpx.AsyncClient`` shared by every request.
+
+    Connections are kept alive between questions, so only the first call pays
+    for the TCP/TLS handshake. ``start``/``stop`` are driven by the app lifespan;
+    outside it (scripts, benchmarks) the client is created on first use.
+    """
+
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+
+    async def start(self) -> None:
+        if self._client is None:
+            headers = {}
+            if settings.OPENAI_API_KEY:
+                headers["Authorization"] = f"Bearer {settings.OPENAI_API_KEY}"
+            self._client = httpx.AsyncClient(
+                base_url=settings.LLM_BASE_URL,
+                headers=headers,
+                timeout=httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+                    keepalive_expiry=60.0,
+                ),
+            )
+
+    async def stop(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _http(self) -> httpx.AsyncClient:
+        await self.start()
+        return self._client
+
+    @staticmethod
+    def _payload(messages: list[dict], stream: bool) -> dict:
+        return {
+            "model": settings.OPENAI_MODEL,
+            "messages": messages,
+            "max_tokens": 1000,
+            "temperature": 0.3,
+            "stream": stream,
+        }
+
+    async def complete(self, messages: list[dict]) -> str:
+        client = await self._http()
+        response = await client.post("/chat/completions", json=self._payload(messages, stream=False))
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def stream(self, messages: list[dict]) -> AsyncIterator[str]:
+        """Yield content deltas as the server emits them (``text/event-stream``)."""
+        client = await self._http()
+        async with client.stream(
+            "POST", "/chat/completions", json=self._payload(messages, stream=True)
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                content = choices[0].get("delta", {}).get("content")
+                if content:
+                    yield content
+
+
+llm_client = LLMClient()
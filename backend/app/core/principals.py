@@ -0,0 +1,32 @@
+"""Verified user principals and their in-process cache."""
+
+from dataclasses import dataclass
+from uuid import UUID
+
+from app.core.config import settings
+from app.models.user import UserRole
+from app.utils.cache import TTLCache
+
+# Role or email changes made outside this worker – another worker, or SQL run by an
+# operator – are only picked up when the entry expires, so the TTL is capped here
+PRINCIPAL_CACHE_MAX_TTL_SECONDS = 300
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The identity fields most routes need – enough to authorize without an ORM User."""
+    id: UUID
+    email: str
+    role: UserRole
+
+
+# Keyed by the token subject (user id as a string); UserRepository writes invalidate it
+principal_cache = TTLCache(
+    "principals",
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=min(settings.PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_TTL_SECONDS),
+)
+
+
+def invalidate_principal(user_id: UUID | str) -> None:
+    principal_cache.pop(str(user_id))
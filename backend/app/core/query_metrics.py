@@ -0,0 +1,48 @@
+"""Per-request database query accounting.
+
+Counts every statement the engine executes while a request is being handled, so
+the middleware in ``main.py`` can expose the numbers and flag endpoints that
+exceed their query budget (e.g. a relationship that started loading implicitly).
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries():
+    """Collect the queries executed inside the block into a fresh ``QueryStats``."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def install(engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += time.perf_counter() - started
@@ -1,5 +1,7 @@
 """JWT token creation / verification and password hashing utilities."""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -9,7 +11,18 @@ from passlib.context import CryptContext
 from app.core.config import settings
 
 # ── Password Hashing ────────────────────────────────
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small thread pool keeps it off the event loop
+# while capping how many hashes a login storm can run at once.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
 
 
 def hash_password(password: str) -> str:
@@ -20,6 +33,22 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, hash_password, password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify off the event loop. Returns (valid, new_hash) – new_hash is set when the
+    stored hash uses outdated parameters and should be replaced."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
 # ── JWT ──────────────────────────────────────────────
 def create_access_token(subject: str, extra: dict | None = None) -> str:
     expire = datetime.now(timezone.utc) + timedelta(
@@ -25,3 +25,31 @@ class ForbiddenException(HTTPException):
 class NotFoundException(HTTPException):
     def __init__(self, detail: str = "Not found"):
         super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+
+class ConflictException(HTTPException):
+    def __init__(self, detail: str = "Conflict"):
+        super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
+class PayloadTooLargeException(HTTPException):
+    def __init__(self, detail: str = "Request body too large"):
+        super().__init__(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+
+
+class RangeNotSatisfiableException(HTTPException):
+    def __init__(self, size: int):
+        super().__init__(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+
+
+class ServiceUnavailableException(HTTPException):
+    def __init__(self, detail: str = "Service temporarily unavailable", retry_after: int = 30):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
@@ -1,14 +1,21 @@
 """SmartArchive – FastAPI Application Entry Point."""
 
 import logging
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
+from app.core.body_limit import BodySizeLimitMiddleware
 from app.core.config import settings
 from app.core.database import init_db
+from app.core.llm import llm_client
+from app.core.query_metrics import track_queries
+from app.workers.ocr_worker import ocr_pool
+from app.workers.preview_worker import preview_pool
+from app.utils.file_serving import check_signing_secret
+from app.workers.stats_worker import stats_reconciler
 
 # Configure logging
 logging.basicConfig(
@@ -22,12 +29,21 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application startup / shutdown."""
     logger.info(f"🚀 Starting {settings.APP_NAME}")
-    # Create tables (development fallback – use Alembic in production)
+    check_signing_secret()
+    # Create the schema on an empty database; an existing one must be migrated with Alembic first
     await init_db()
     # Ensure upload directory exists
     settings.upload_path  # triggers mkdir
     logger.info("✅ Database initialized, upload directory ready")
+    await ocr_pool.start()
+    await preview_pool.start()
+    await llm_client.start()
+    await stats_reconciler.start()
     yield
+    await stats_reconciler.stop()
+    await llm_client.stop()
+    await preview_pool.stop()
+    await ocr_pool.stop()
     logger.info(f"👋 Shutting down {settings.APP_NAME}")
 
 
@@ -38,6 +54,16 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# ── Upload size caps ─────────────────────────────────
+# Added before CORS so that 413 responses still carry CORS headers
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={
+        ("POST", "/api/documents"): lambda: settings.max_file_size_bytes,
+        ("POST", "/api/documents/bulk"): lambda: settings.max_file_size_bytes * settings.BULK_MAX_FILES,
+    },
+)
+
 # ── CORS ─────────────────────────────────────────────
 app.add_middleware(
     CORSMiddleware,
@@ -47,16 +73,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ── Static files (serve uploaded documents) ──────────
-import os
-os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+# ── Query budget ─────────────────────────────────────
+@app.middleware("http")
+async def query_budget(request: Request, call_next):
+    """Report DB queries per request and warn when an endpoint exceeds its budget."""
+    started = time.perf_counter()
+    with track_queries() as stats:
+        response = await call_next(request)
+    elapsed = time.perf_counter() - started
+
+    response.headers["X-DB-Queries"] = str(stats.count)
+    response.headers["Server-Timing"] = (
+        f'db;desc="{stats.count} queries";dur={stats.duration * 1000:.1f}, '
+        f"total;dur={elapsed * 1000:.1f}"
+    )
+    if stats.count > settings.QUERY_BUDGET_PER_REQUEST:
+        logger.warning(
+            f"{request.method} {request.url.path} ran {stats.count} queries "
+            f"(budget {settings.QUERY_BUDGET_PER_REQUEST}) in {elapsed * 1000:.0f}ms"
+        )
+    return response
+
 
 # ── Routers ──────────────────────────────────────────
-from app.api.routes import auth, documents, search, qa, admin
+from app.api.routes import auth, documents, files, previews, search, qa, admin
 
 app.include_router(auth.router, prefix="/api")
 app.include_router(documents.router, prefix="/api")
+app.include_router(files.router, prefix="/api")
+app.include_router(previews.router, prefix="/api")
 app.include_router(search.router, prefix="/api")
 app.include_router(qa.router, prefix="/api")
 app.include_router(admin.router, prefix="/api")
@@ -0,0 +1,33 @@
+"""Document chunk ORM model – the unit of retrieval for QA and semantic search."""
+
+import uuid
+
+from sqlalchemy import Text, Integer, Float, ForeignKey, Index, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class DocumentChunk(Base):
+    __tablename__ = "document_chunks"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    document_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False
+    )
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    page: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    token_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Term -> frequency, so the BM25 index is rebuilt without re-tokenizing
+    terms: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    # The same, per paragraph of ``content`` – the keyword fallback ranks paragraphs
+    paragraph_terms: Mapped[list | None] = mapped_column(JSONB, nullable=True)
+    # int8-quantized embedding; multiply by embedding_scale to recover the float vector
+    embedding: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    embedding_scale: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    __table_args__ = (
+        Index("ix_document_chunks_document_position", "document_id", "position", unique=True),
+    )
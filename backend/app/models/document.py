@@ -1,12 +1,13 @@
-"""Document, Tag, and association ORM models."""
+"""Document, DocumentContent, Tag, Blob, and association ORM models."""
 
 import uuid
+import zlib
 from datetime import datetime, timezone
 
 from sqlalchemy import (
-    String, Text, Boolean, Integer, ForeignKey, DateTime, Table, Column,
+    String, Text, Boolean, Integer, BigInteger, ForeignKey, DateTime, Table, Column, Index, LargeBinary,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -26,7 +27,21 @@ class Tag(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False, index=True)
 
-    documents = relationship("Document", secondary=document_tags, back_populates="tags")
+    documents = relationship("Document", secondary=document_tags, back_populates="tags", lazy="raise")
+
+
+class Blob(Base):
+    """Content-addressed file shared by every document with the same bytes."""
+    __tablename__ = "blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    file_path: Mapped[str] = mapped_column(String(1000), nullable=False)
+    file_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Documents referencing it, deleted ones excluded; the row and file go when it reaches 0
+    ref_count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
 
 
 class Document(Base):
@@ -38,9 +53,17 @@ class Document(Base):
     title: Mapped[str] = mapped_column(String(500), nullable=False, index=True)
     file_path: Mapped[str] = mapped_column(String(1000), nullable=False)
     file_type: Mapped[str] = mapped_column(String(20), nullable=False)
-    file_size: Mapped[int] = mapped_column(Integer, nullable=False)
-    extracted_text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    file_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    sha256: Mapped[str | None] = mapped_column(
+        String(64), ForeignKey("blobs.sha256"), nullable=True, index=True
+    )
+    # Weighted title (A) + extracted text (B) lexemes, maintained by DocumentRepository
+    search_vector: Mapped[str | None] = mapped_column(TSVECTOR, nullable=True, deferred=True)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    # Set for documents created by a bulk upload
+    batch_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("upload_batches.id", ondelete="SET NULL"), nullable=True, index=True
+    )
 
     uploaded_by: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
@@ -55,7 +78,42 @@ class Document(Base):
         onupdate=lambda: datetime.now(timezone.utc),
     )
 
-    # Relationships
-    owner = relationship("User", back_populates="documents", lazy="selectin")
-    tags = relationship("Tag", secondary=document_tags, back_populates="documents", lazy="selectin")
-    qa_sessions = relationship("QASession", back_populates="document", lazy="selectin")
+    __table_args__ = (
+        Index("ix_documents_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_documents_created_at_id", "created_at", "id"),
+    )
+
+    # Relationships – never loaded implicitly; repositories opt in per query
+    owner = relationship("User", back_populates="documents", lazy="raise")
+    tags = relationship("Tag", secondary=document_tags, back_populates="documents", lazy="raise")
+    qa_sessions = relationship("QASession", back_populates="document", lazy="raise")
+    content = relationship(
+        "DocumentContent", uselist=False, lazy="raise", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    @property
+    def extracted_text(self) -> str | None:
+        """OCR text – only available when the repository loaded ``content`` (``with_text=True``)."""
+        return self.content.text if self.content else None
+
+
+class DocumentContent(Base):
+    """Extracted text, kept out of ``documents`` so listings and searches never read it.
+
+    Texts above ``TEXT_COMPRESS_ABOVE_KB`` are stored zlib-compressed in
+    ``compressed`` instead of ``body``.
+    """
+    __tablename__ = "document_contents"
+
+    document_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True
+    )
+    body: Mapped[str | None] = mapped_column(Text, nullable=True)
+    compressed: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    char_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    @property
+    def text(self) -> str:
+        if self.compressed is not None:
+            return zlib.decompress(self.compressed).decode()
+        return self.body or ""
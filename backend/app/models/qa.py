@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import String, Text, ForeignKey, DateTime, Integer
+from sqlalchemy import String, Text, ForeignKey, DateTime, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -23,11 +23,19 @@ class QASession(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+    # Rolling summary of turns older than the verbatim prompt window, up to this message id
+    summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    summary_until_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
-    # Relationships
-    user = relationship("User", back_populates="qa_sessions")
-    document = relationship("Document", back_populates="qa_sessions")
-    messages = relationship("QAMessage", back_populates="session", lazy="selectin", order_by="QAMessage.created_at")
+    __table_args__ = (
+        # Latest session for (user, document) is a single index probe
+        Index("ix_qa_sessions_user_document_created", "user_id", "document_id", "created_at"),
+    )
+
+    # Relationships – never loaded implicitly; repositories opt in per query
+    user = relationship("User", back_populates="qa_sessions", lazy="raise")
+    document = relationship("Document", back_populates="qa_sessions", lazy="raise")
+    messages = relationship("QAMessage", back_populates="session", lazy="raise", order_by="QAMessage.created_at")
 
 
 class QAMessage(Base):
@@ -43,5 +51,10 @@ class QAMessage(Base):
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
 
+    __table_args__ = (
+        # History pages are keyset scans on (session_id, id)
+        Index("ix_qa_messages_session_id_id", "session_id", "id"),
+    )
+
     # Relationships
-    session = relationship("QASession", back_populates="messages")
+    session = relationship("QASession", back_populates="messages", lazy="raise")
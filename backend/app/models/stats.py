@@ -0,0 +1,35 @@
+"""Statistics ORM models – incrementally maintained counters and hourly buckets."""
+
+from datetime import datetime
+
+from sqlalchemy import String, Integer, BigInteger, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class StatCounter(Base):
+    """One shard of a named counter; the counter's value is the sum over its shards.
+
+    Writers pick a random shard, so concurrent uploads rarely wait on each
+    other's row lock until commit.
+    """
+    __tablename__ = "stat_counters"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+
+class UploadBucket(Base):
+    """Live (not deleted) uploads per hour, sharded like ``StatCounter``.
+
+    ``ocr_backlog`` is sampled by the reconciler into shard 0 of the current hour.
+    """
+    __tablename__ = "upload_buckets"
+
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True)
+    uploads: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    bytes: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    ocr_backlog: Mapped[int | None] = mapped_column(Integer, nullable=True)
@@ -0,0 +1,33 @@
+"""Upload session ORM model – a resumable upload in progress."""
+
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import String, BigInteger, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class UploadSession(Base):
+    """The bytes received so far live in a part file in staging (``storage.part_path``)."""
+    __tablename__ = "upload_sessions"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    filename: Mapped[str] = mapped_column(String(500), nullable=False)
+    title: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    tag_names: Mapped[list | None] = mapped_column(JSONB, nullable=True)
+    total_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    received: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    # Lease of the request writing the chunk at ``received``; past it, another may take over
+    writing_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
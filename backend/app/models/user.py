@@ -39,6 +39,6 @@ class User(Base):
         onupdate=lambda: datetime.now(timezone.utc),
     )
 
-    # Relationships
-    documents = relationship("Document", back_populates="owner", lazy="selectin")
-    qa_sessions = relationship("QASession", back_populates="user", lazy="selectin")
+    # Relationships – never loaded implicitly; repositories opt in per query
+    documents = relationship("Document", back_populates="owner", lazy="raise")
+    qa_sessions = relationship("QASession", back_populates="user", lazy="raise")
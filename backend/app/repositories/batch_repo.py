@@ -0,0 +1,41 @@
+"""Upload batch repository – batch records and their OCR progress."""
+
+from uuid import UUID
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document, DocumentContent
+from app.models.ocr_job import OCRJob
+from app.models.upload_batch import UploadBatch
+
+
+class BatchRepository:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, batch: UploadBatch) -> UploadBatch:
+        self.db.add(batch)
+        await self.db.flush()
+        return batch
+
+    async def get(self, batch_id: UUID) -> UploadBatch | None:
+        return await self.db.get(UploadBatch, batch_id)
+
+    async def progress(self, batch_id: UUID) -> tuple[dict[str, int], int]:
+        """OCR job counts by status for the batch's documents, and how many have text already."""
+        in_batch = Document.batch_id == batch_id
+        result = await self.db.execute(
+            select(OCRJob.status, func.count(OCRJob.id))
+            .join(Document, Document.id == OCRJob.document_id)
+            .where(in_batch)
+            .group_by(OCRJob.status)
+        )
+        jobs = {status.value: count for status, count in result.all()}
+        with_text = await self.db.scalar(
+            select(func.count(DocumentContent.document_id))
+            .join(Document, Document.id == DocumentContent.document_id)
+            .where(in_batch)
+        )
+        return jobs, with_text
@@ -0,0 +1,129 @@
+"""Chunk repository – database queries for the DocumentChunk model."""
+
+from uuid import UUID
+
+from sqlalchemy import select, delete, func, literal, or_, true
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.chunk import DocumentChunk
+from app.models.document import Document
+from app.utils.bm25 import Chunk
+
+# Rows per INSERT – keeps each statement well under the 32767 bind-parameter limit
+_INSERT_BATCH = 1000
+
+
+class ChunkRepository:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_for_document(self, document_id: UUID) -> list[DocumentChunk]:
+        result = await self.db.execute(
+            select(DocumentChunk)
+            .where(DocumentChunk.document_id == document_id)
+            .order_by(DocumentChunk.position)
+        )
+        return list(result.scalars().all())
+
+    async def get_contents(self, chunk_ids: list[int]) -> dict[int, str]:
+        if not chunk_ids:
+            return {}
+        result = await self.db.execute(
+            select(DocumentChunk.id, DocumentChunk.content).where(DocumentChunk.id.in_(chunk_ids))
+        )
+        return dict(result.all())
+
+    async def get_embeddings_after(
+        self, chunk_id: int, ranges: list[tuple[int, int]] = ()
+    ) -> list[tuple[int, UUID, bytes, float]]:
+        """``(id, document_id, embedding, scale)`` of every embedded chunk newer than ``chunk_id``
+        or with an id in one of the inclusive ``ranges``, ordered by id."""
+        result = await self.db.execute(
+            select(
+                DocumentChunk.id,
+                DocumentChunk.document_id,
+                DocumentChunk.embedding,
+                DocumentChunk.embedding_scale,
+            )
+            .where(
+                or_(DocumentChunk.id > chunk_id, *(DocumentChunk.id.between(lo, hi) for lo, hi in ranges)),
+                DocumentChunk.embedding.is_not(None),
+            )
+            .order_by(DocumentChunk.id)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def find_indexed_duplicate(self, sha256: str, exclude_ids: list[UUID]) -> UUID | None:
+        """A document with the same content hash, outside ``exclude_ids``, whose chunks are already built."""
+        result = await self.db.execute(
+            select(DocumentChunk.document_id)
+            .join(Document, Document.id == DocumentChunk.document_id)
+            .where(Document.sha256 == sha256, Document.id.not_in(exclude_ids))
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def copy_to(self, source_id: UUID, target_ids: list[UUID]) -> None:
+        """Give every target a copy of the source's chunks without re-chunking.
+
+        One DELETE and one INSERT ... SELECT over ``unnest(target_ids)`` × source chunks,
+        however many targets there are.
+        """
+        if not target_ids:
+            return
+        columns = [
+            "position", "page", "content", "token_count", "terms", "paragraph_terms", "embedding", "embedding_scale",
+        ]
+        targets = select(
+            func.unnest(literal(target_ids, ARRAY(PG_UUID(as_uuid=True)))).label("id")
+        ).subquery()
+        await self.db.execute(delete(DocumentChunk).where(DocumentChunk.document_id.in_(target_ids)))
+        await self.db.execute(
+            insert(DocumentChunk).from_select(
+                ["document_id", *columns],
+                select(targets.c.id, *(getattr(DocumentChunk, c) for c in columns))
+                .select_from(DocumentChunk)
+                .join(targets, true())
+                .where(DocumentChunk.document_id == source_id),
+            )
+        )
+
+    async def replace_for_document(
+        self,
+        document_id: UUID,
+        chunks: list[Chunk],
+        term_freqs: list[dict[str, int]],
+        embeddings: list[tuple[bytes, float]] | None = None,
+        paragraph_terms: list[list[dict[str, int]]] | None = None,
+    ) -> None:
+        """Swap the document's chunks for ``chunks`` using one DELETE and batched multi-row INSERTs.
+
+        ``embeddings`` holds one ``(int8 bytes, scale)`` pair per chunk, and
+        ``paragraph_terms`` one list of term frequencies per chunk.
+        """
+        await self.db.execute(delete(DocumentChunk).where(DocumentChunk.document_id == document_id))
+        embeddings = embeddings or [(None, None)] * len(chunks)
+        paragraph_terms = paragraph_terms or [None] * len(chunks)
+        rows = [
+            {
+                "document_id": document_id,
+                "position": chunk.position,
+                "page": chunk.page,
+                "content": chunk.content,
+                "token_count": chunk.token_count,
+                "terms": terms,
+                "paragraph_terms": paragraphs,
+                "embedding": embedding,
+                "embedding_scale": scale,
+            }
+            for chunk, terms, (embedding, scale), paragraphs in zip(chunks, term_freqs, embeddings, paragraph_terms)
+        ]
+        for start in range(0, len(rows), _INSERT_BATCH):
+            await self.db.execute(
+                insert(DocumentChunk)
+                .values(rows[start:start + _INSERT_BATCH])
+                # Two requests indexing the same document at once write identical rows
+                .on_conflict_do_nothing(index_elements=[DocumentChunk.document_id, DocumentChunk.position])
+            )
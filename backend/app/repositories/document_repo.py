@@ -1,13 +1,107 @@
-"""Document repository – database queries for Document and Tag models."""
+"""Document repository – database queries for Document, Tag, and Blob models."""
 
+import json
+import zlib
+from pathlib import Path
 from uuid import UUID
 from datetime import datetime, timezone, timedelta
 
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func, update, delete, cast, literal, literal_column, tuple_, exists, or_, Row
+from sqlalchemy.dialects.postgresql import insert, JSON, REGCONFIG, aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, aliased
 
-from app.models.document import Document, Tag, document_tags
+from app.core.config import settings
+from app.models.chunk import DocumentChunk
+from app.models.document import Document, DocumentContent, Tag, Blob, document_tags
+from app.repositories.stats_repo import StatsRepository
+from app.utils.cache import TTLCache
+from app.utils.pagination import CountMode, decode_cursor, encode_cursor
+from app.utils.storage import discard
+
+SNIPPET_OPTIONS = "MaxFragments=2, MinWords=8, MaxWords=25, StartSel=**, StopSel=**"
+# Stored as a document's text when OCR gives up on it
+EXTRACTION_FAILED_PREFIX = "[OCR extraction failed"
+
+
+def _search_config():
+    return cast(literal(settings.SEARCH_LANGUAGE), REGCONFIG)
+
+
+def normalize_tag_names(names: list[str]) -> list[str]:
+    """Lower-case, trim, drop empties and de-duplicate while keeping order."""
+    return list(dict.fromkeys(n for n in (name.lower().strip()[:100] for name in names) if n))
+
+
+def weighted_vector(value, weight: str):
+    """tsvector of ``value`` with every lexeme at ``weight`` (A–D)."""
+    # setweight() takes a "char" – a bound string parameter would be sent as varchar
+    return func.setweight(
+        func.to_tsvector(_search_config(), func.coalesce(value, "")), literal_column(f"'{weight}'")
+    )
+
+
+def search_vector(title, text):
+    """tsvector with title lexemes weighted above extracted-text lexemes."""
+    return weighted_vector(title, "A").op("||")(weighted_vector(text, "B"))
+
+
+def summary_columns() -> tuple:
+    """Exactly the columns a DocumentResponse is built from, with tags as a JSON array.
+
+    Queries selecting these return plain rows – no ORM entities, identity map or
+    tag relationship loads. Tags are aggregated per row by a correlated
+    subquery over its own aliases, so tag filters in the outer query do not
+    narrow it.
+    """
+    tag = aliased(Tag)
+    links = document_tags.alias()
+    tags = (
+        select(
+            func.coalesce(
+                func.json_agg(aggregate_order_by(func.json_build_object("id", tag.id, "name", tag.name), tag.name)),
+                literal_column("'[]'::json"),
+                type_=JSON,
+            )
+        )
+        .select_from(links.join(tag, tag.id == links.c.tag_id))
+        .where(links.c.document_id == Document.id)
+        .correlate(Document)
+        .scalar_subquery()
+    )
+    return (
+        Document.id,
+        Document.title,
+        Document.file_type,
+        Document.file_size,
+        Document.is_deleted,
+        Document.created_at,
+        Document.updated_at,
+        Document.uploaded_by,
+        Document.sha256,
+        tags.label("tags"),
+    )
+
+
+def content_values(text: str) -> dict:
+    """DocumentContent column values for ``text`` – zlib-compressed above ``TEXT_COMPRESS_ABOVE_KB``."""
+    data = text.encode()
+    limit = settings.TEXT_COMPRESS_ABOVE_KB * 1024
+    if limit and len(data) > limit:
+        return {"body": None, "compressed": zlib.compress(data), "char_count": len(text)}
+    return {"body": text, "compressed": None, "char_count": len(text)}
+
+
+def _extracted():
+    """DocumentContent rows holding OCR text rather than a failure marker."""
+    return func.coalesce(DocumentContent.body, "").notlike(f"{EXTRACTION_FAILED_PREFIX}%")
+
+
+# Tag name → id; tags are never deleted, so entries only age out to bound memory
+_tag_ids = TTLCache("tag_ids", maxsize=settings.TAG_CACHE_SIZE, ttl=3600)
+
+# Exact totals per filter combination; cleared locally whenever documents change
+_count_cache = TTLCache("document_counts", maxsize=512, ttl=settings.COUNT_CACHE_TTL_SECONDS)
 
 
 class DocumentRepository:
@@ -15,18 +109,57 @@ class DocumentRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create(self, document: Document) -> Document:
+    async def create(self, document: Document, text: str | None = None) -> Document:
+        document.search_vector = search_vector(document.title, text)
+        document.content = DocumentContent(**content_values(text)) if text is not None else None
+        _count_cache.clear()
         self.db.add(document)
         await self.db.flush()
-        await self.db.refresh(document)
+        await StatsRepository(self.db).record_upload(document.created_at, document.file_size)
         return document
 
-    async def get_by_id(self, doc_id: UUID) -> Document | None:
-        result = await self.db.execute(
+    async def create_many(
+        self, rows: list[dict], texts: dict[UUID, str], tag_ids: list[int]
+    ) -> None:
+        """Insert documents in bulk – one INSERT each for documents, contents and tag links.
+
+        ``rows`` are Document column values including ``id`` and ``created_at``;
+        ``texts`` holds the extracted text already known for some of them.
+        """
+        if not rows:
+            return
+        _count_cache.clear()
+        await self.db.execute(
+            insert(Document).values(
+                [{**row, "search_vector": search_vector(row["title"], texts.get(row["id"]))} for row in rows]
+            )
+        )
+        if texts:
+            await self.db.execute(
+                insert(DocumentContent).values(
+                    [{"document_id": doc_id, **content_values(text)} for doc_id, text in texts.items()]
+                )
+            )
+        if tag_ids:
+            await self.db.execute(
+                insert(document_tags).values(
+                    [{"document_id": row["id"], "tag_id": tag_id} for row in rows for tag_id in tag_ids]
+                )
+            )
+        await StatsRepository(self.db).record_upload(
+            rows[0]["created_at"], sum(row["file_size"] for row in rows), count=len(rows)
+        )
+
+    async def get_by_id(self, doc_id: UUID, with_text: bool = False) -> Document | None:
+        """The document with tags and owner; ``with_text`` also loads its extracted text."""
+        query = (
             select(Document)
             .options(selectinload(Document.tags), selectinload(Document.owner))
             .where(Document.id == doc_id, Document.is_deleted == False)
         )
+        if with_text:
+            query = query.options(selectinload(Document.content))
+        result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
     async def get_list(
@@ -37,12 +170,15 @@ class DocumentRepository:
         tag: str | None = None,
         title_search: str | None = None,
         user_id: UUID | None = None,
-    ) -> tuple[list[Document], int]:
-        query = (
-            select(Document)
-            .options(selectinload(Document.tags))
-            .where(Document.is_deleted == False)
-        )
+        cursor: str | None = None,
+        count: CountMode = "exact",
+    ) -> tuple[list[Row], int | None, str | None]:
+        """Newest-first listing of ``summary_columns`` rows. Returns (items, total, next_cursor).
+
+        With a ``cursor`` the page starts right after the row it encodes (keyset on
+        ``(created_at, id)``); otherwise ``page`` is used as an offset.
+        """
+        query = select(Document.id).where(Document.is_deleted == False)
 
         if user_id:
             query = query.where(Document.uploaded_by == user_id)
@@ -53,80 +189,225 @@ class DocumentRepository:
         if tag:
             query = query.join(document_tags).join(Tag).where(Tag.name == tag)
 
-        # Count
-        count_query = select(func.count()).select_from(query.subquery())
-        total = (await self.db.execute(count_query)).scalar_one()
+        total = await self._count(
+            query, count, ("list", user_id, file_type, title_search, tag)
+        )
 
-        # Paginate
-        query = query.order_by(Document.created_at.desc())
-        query = query.offset((page - 1) * size).limit(size)
-        result = await self.db.execute(query)
-        items = list(result.scalars().all())
+        # Paginate – fetch one extra row to know whether there is a next page
+        query = query.with_only_columns(*summary_columns()).order_by(
+            Document.created_at.desc(), Document.id.desc()
+        )
+        if cursor:
+            created_at, doc_id = decode_cursor(cursor, datetime, UUID)
+            query = query.where(tuple_(Document.created_at, Document.id) < (created_at, doc_id))
+        else:
+            query = query.offset((page - 1) * size)
+        result = await self.db.execute(query.limit(size + 1))
+        items = list(result.all())
+
+        next_cursor = None
+        if len(items) > size:
+            items = items[:size]
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+
+        return items, total, next_cursor
 
-        return items, total
+    async def _count(self, query, mode: CountMode, cache_key: tuple) -> int | None:
+        if mode == "none":
+            return None
+        if mode == "estimate":
+            return await self._estimate_count(query)
+
+        total = _count_cache.get(cache_key)
+        if total is None:
+            count_query = select(func.count()).select_from(query.subquery())
+            total = (await self.db.execute(count_query)).scalar_one()
+            _count_cache.set(cache_key, total)
+        return total
+
+    async def _estimate_count(self, query) -> int:
+        """Planner row estimate – no scan, but only as good as the table statistics."""
+        dialect = self.db.bind.dialect
+        sql = query.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+        conn = await self.db.connection()
+        plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
 
     async def update(self, document: Document) -> Document:
+        # New title lexemes (A) on top of the stored text lexemes (B) – the text is not re-read
+        document.search_vector = weighted_vector(document.title, "A").op("||")(
+            func.ts_filter(Document.search_vector, literal_column("'{b}'"))
+        )
+        _count_cache.clear()
         await self.db.flush()
-        await self.db.refresh(document)
         return document
 
     async def soft_delete(self, document: Document) -> None:
+        if not document.is_deleted:
+            await StatsRepository(self.db).record_delete(document.created_at, document.file_size)
         document.is_deleted = True
+        _count_cache.clear()
+        if document.sha256:
+            await BlobRepository(self.db).release(document.sha256)
         await self.db.flush()
 
-    async def update_extracted_text(self, doc_id: UUID, text: str) -> None:
+    async def update_extracted_text(self, doc_id: UUID, text: str, share: bool = True) -> list[UUID]:
+        """Store OCR text. Returns the ids of duplicate documents that received it too.
+
+        With ``share=False`` (a failure marker) only this document gets the
+        text, and a later duplicate runs OCR again.
+        """
         result = await self.db.execute(select(Document).where(Document.id == doc_id))
         doc = result.scalar_one_or_none()
+        duplicates = []
         if doc:
-            doc.extracted_text = text
+            _count_cache.clear()
+            values = content_values(text)
+            await self.db.execute(
+                insert(DocumentContent)
+                .values(document_id=doc_id, **values)
+                .on_conflict_do_update(index_elements=[DocumentContent.document_id], set_=values)
+            )
+            # Also bumps updated_at, which keys the per-document caches
+            doc.search_vector = search_vector(Document.title, text)
+            if doc.sha256 and share:
+                # Share the result with any duplicate still waiting on it,
+                # including duplicates whose own OCR attempt failed
+                waiting = ~exists().where(DocumentContent.document_id == Document.id, _extracted())
+                result = await self.db.execute(
+                    insert(DocumentContent)
+                    .from_select(
+                        ["document_id", *values],
+                        select(
+                            Document.id,
+                            *(literal(v, getattr(DocumentContent, k).type) for k, v in values.items()),
+                        ).where(
+                            Document.sha256 == doc.sha256,
+                            Document.id != doc_id,
+                            waiting,
+                        ),
+                    )
+                    .on_conflict_do_update(index_elements=[DocumentContent.document_id], set_=values)
+                    .returning(DocumentContent.document_id)
+                )
+                duplicates = list(result.scalars().all())
+                if duplicates:
+                    await self.db.execute(
+                        update(Document)
+                        .where(Document.id.in_(duplicates))
+                        .values(search_vector=search_vector(Document.title, text))
+                        .execution_options(synchronize_session=False)
+                    )
             await self.db.flush()
+        return duplicates
+
+    async def known_texts(self, sha256s: list[str]) -> dict[str, str]:
+        """Text already extracted from each digest's bytes, taken from any document carrying them.
+
+        Failure markers don't count, so a duplicate of a document OCR gave up on runs OCR again.
+        """
+        if not sha256s:
+            return {}
+        result = await self.db.execute(
+            select(Document.sha256, DocumentContent)
+            .join(DocumentContent, DocumentContent.document_id == Document.id)
+            .where(Document.sha256.in_(sha256s), _extracted())
+            .distinct(Document.sha256)
+        )
+        return {sha256: content.text for sha256, content in result.all()}
 
     async def search(
-        self, query_text: str, page: int = 1, size: int = 20
-    ) -> tuple[list[Document], int]:
-        query = (
-            select(Document)
-            .options(selectinload(Document.tags))
+        self,
+        query_text: str,
+        page: int = 1,
+        size: int = 20,
+        cursor: str | None = None,
+        count: CountMode = "exact",
+    ) -> tuple[list[tuple[Row, float, str | None]], int | None, str | None]:
+        """Ranked full-text search. Returns ((summary row, rank, snippet), total, next_cursor).
+
+        Results are ordered by ``(rank, created_at, id)``, which is also the cursor key.
+        """
+        tsquery = func.websearch_to_tsquery(_search_config(), query_text)
+        rank = func.ts_rank(Document.search_vector, tsquery)
+        matches = select(Document.id, Document.created_at, rank.label("rank")).where(
+            Document.is_deleted == False,
+            Document.search_vector.op("@@")(tsquery),
+        )
+
+        total = await self._count(matches, count, ("search", query_text))
+
+        # Rank and paginate on the index first; only build snippets for the page
+        ranked = matches.order_by(rank.desc(), Document.created_at.desc(), Document.id.desc())
+        if cursor:
+            last_rank, created_at, doc_id = decode_cursor(cursor, float, datetime, UUID)
+            ranked = ranked.where(
+                tuple_(rank, Document.created_at, Document.id) < (last_rank, created_at, doc_id)
+            )
+        else:
+            ranked = ranked.offset((page - 1) * size)
+        ranked = ranked.limit(size + 1).subquery()
+
+        # Compressed texts are not readable in SQL – headline their first matching chunk instead
+        first_chunk = (
+            select(DocumentChunk.content)
             .where(
-                Document.is_deleted == False,
-                or_(
-                    Document.title.ilike(f"%{query_text}%"),
-                    Document.extracted_text.ilike(f"%{query_text}%"),
-                ),
+                DocumentChunk.document_id == Document.id,
+                func.to_tsvector(_search_config(), DocumentChunk.content).op("@@")(tsquery),
             )
+            .order_by(DocumentChunk.position)
+            .limit(1)
+            .scalar_subquery()
         )
-        count_query = select(func.count()).select_from(query.subquery())
-        total = (await self.db.execute(count_query)).scalar_one()
-
-        query = query.order_by(Document.created_at.desc())
-        query = query.offset((page - 1) * size).limit(size)
-        result = await self.db.execute(query)
-        items = list(result.scalars().all())
+        snippet = func.ts_headline(
+            _search_config(), func.coalesce(DocumentContent.body, first_chunk, ""), tsquery, SNIPPET_OPTIONS
+        )
+        result = await self.db.execute(
+            select(*summary_columns(), ranked.c.rank, snippet.label("snippet"))
+            .join(ranked, Document.id == ranked.c.id)
+            .outerjoin(DocumentContent, DocumentContent.document_id == Document.id)
+            .order_by(ranked.c.rank.desc(), ranked.c.created_at.desc(), ranked.c.id.desc())
+        )
+        items = [(row, row.rank, row.snippet or None) for row in result.all()]
 
-        return items, total
+        next_cursor = None
+        if len(items) > size:
+            items = items[:size]
+            last, last_rank, _ = items[-1]
+            next_cursor = encode_cursor(last_rank, last.created_at, last.id)
 
-    async def count(self, include_deleted: bool = False) -> int:
-        q = select(func.count(Document.id))
-        if not include_deleted:
-            q = q.where(Document.is_deleted == False)
-        result = await self.db.execute(q)
-        return result.scalar_one()
+        return items, total, next_cursor
 
-    async def count_deleted(self) -> int:
+    async def search_ranks(self, query_text: str, limit: int) -> dict[UUID, float]:
+        """Full-text rank of the ``limit`` best matching documents, keyed by id."""
+        tsquery = func.websearch_to_tsquery(_search_config(), query_text)
+        rank = func.ts_rank(Document.search_vector, tsquery)
         result = await self.db.execute(
-            select(func.count(Document.id)).where(Document.is_deleted == True)
+            select(Document.id, rank)
+            .where(Document.is_deleted == False, Document.search_vector.op("@@")(tsquery))
+            .order_by(rank.desc())
+            .limit(limit)
         )
-        return result.scalar_one()
+        return dict(result.all())
 
-    async def count_uploads_today(self) -> int:
-        today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    async def filter_visible(self, doc_ids: list[UUID]) -> set[UUID]:
+        """The subset of ``doc_ids`` that exist and are not soft-deleted."""
+        if not doc_ids:
+            return set()
         result = await self.db.execute(
-            select(func.count(Document.id)).where(
-                Document.created_at >= today_start,
-                Document.is_deleted == False,
-            )
+            select(Document.id).where(Document.id.in_(doc_ids), Document.is_deleted == False)
         )
-        return result.scalar_one()
+        return set(result.scalars().all())
+
+    async def get_summaries(self, doc_ids: list[UUID]) -> list[Row]:
+        """``summary_columns`` rows in the order of ``doc_ids``; missing ids are skipped."""
+        if not doc_ids:
+            return []
+        result = await self.db.execute(select(*summary_columns()).where(Document.id.in_(doc_ids)))
+        by_id = {row.id: row for row in result.all()}
+        return [by_id[i] for i in doc_ids if i in by_id]
 
 
 class TagRepository:
@@ -135,17 +416,109 @@ class TagRepository:
         self.db = db
 
     async def get_or_create(self, name: str) -> Tag:
-        result = await self.db.execute(select(Tag).where(Tag.name == name.lower().strip()))
-        tag = result.scalar_one_or_none()
-        if not tag:
-            tag = Tag(name=name.lower().strip())
-            self.db.add(tag)
-            await self.db.flush()
-            await self.db.refresh(tag)
-        return tag
+        tags = await self.get_or_create_many([name])
+        if not tags:
+            raise ValueError("Tag name must not be empty")
+        return tags[0]
 
     async def get_or_create_many(self, names: list[str]) -> list[Tag]:
-        tags = []
-        for name in names:
-            tags.append(await self.get_or_create(name))
-        return tags
+        """Resolve names to tags with one upsert and one select, or just the select.
+
+        Concurrent uploads creating the same new tag are safe: the loser's
+        insert waits for the winner's and then finds its row in the select.
+        """
+        wanted = normalize_tag_names(names)
+        if not wanted:
+            return []
+        known = {name: tag_id for name in wanted if (tag_id := _tag_ids.get(name)) is not None}
+        tags = await self._upsert_and_load(
+            [name for name in wanted if name not in known], list(known.values())
+        )
+
+        # A cached id can belong to a tag whose inserting transaction has not committed yet
+        unresolved = [name for name in wanted if name not in tags]
+        if unresolved:
+            tags.update(await self._upsert_and_load(unresolved, []))
+
+        for name, tag in tags.items():
+            _tag_ids.set(name, tag.id)
+        return [tags[name] for name in wanted]
+
+    async def _upsert_and_load(self, names: list[str], ids: list[int]) -> dict[str, Tag]:
+        """Insert the ``names`` that don't exist yet, then load them and the tags with ``ids``."""
+        if names:
+            await self.db.execute(
+                insert(Tag)
+                .values([{"name": name} for name in names])
+                .on_conflict_do_nothing(index_elements=[Tag.name])
+            )
+        result = await self.db.execute(select(Tag).where(or_(Tag.id.in_(ids), Tag.name.in_(names))))
+        return {tag.name: tag for tag in result.scalars().all()}
+
+
+class BlobRepository:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, sha256: str) -> Blob | None:
+        return await self.db.get(Blob, sha256)
+
+    async def acquire(self, sha256: str, file_path: str, file_size: int) -> Blob:
+        """Create the blob or take another reference to it, atomically."""
+        stmt = (
+            insert(Blob)
+            .values(sha256=sha256, file_path=file_path, file_size=file_size, ref_count=1)
+            .on_conflict_do_update(
+                index_elements=[Blob.sha256],
+                set_={"ref_count": Blob.ref_count + 1},
+            )
+            .returning(Blob)
+        )
+        result = await self.db.execute(stmt, execution_options={"populate_existing": True})
+        return result.scalar_one()
+
+    async def acquire_many(self, blobs: dict[str, tuple[str, int, int]]) -> dict[str, Blob]:
+        """Bulk ``acquire``: ``{sha256: (file_path, file_size, references)}`` in one upsert.
+
+        A returned blob whose ``ref_count`` equals the references asked for was created here.
+        """
+        if not blobs:
+            return {}
+        stmt = insert(Blob).values(
+            [
+                {"sha256": sha256, "file_path": path, "file_size": size, "ref_count": refs}
+                for sha256, (path, size, refs) in blobs.items()
+            ]
+        )
+        result = await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[Blob.sha256],
+                set_={"ref_count": Blob.ref_count + stmt.excluded.ref_count},
+            ).returning(Blob),
+            execution_options={"populate_existing": True},
+        )
+        return {blob.sha256: blob for blob in result.scalars().all()}
+
+    async def release(self, sha256: str) -> None:
+        """Drop a reference. The last one deletes the blob row and unlinks its file.
+
+        The decrement locks the row until commit, so a concurrent ``acquire``
+        of the same bytes waits and then creates the blob – and its file –
+        afresh. Deleted documents still naming the blob are detached from it.
+        """
+        result = await self.db.execute(
+            update(Blob)
+            .where(Blob.sha256 == sha256, Blob.ref_count > 0)
+            .values(ref_count=Blob.ref_count - 1)
+            .returning(Blob.ref_count, Blob.file_path)
+        )
+        row = result.one_or_none()
+        if row is None or row.ref_count > 0:
+            return
+        detached = update(Document).where(Document.sha256 == sha256).values(sha256=None).cte("detached")
+        await self.db.execute(
+            delete(Blob).where(Blob.sha256 == sha256).add_cte(detached),
+            execution_options={"synchronize_session": False},
+        )
+        await discard(Path(row.file_path))
@@ -0,0 +1,108 @@
+"""OCR job repository – database queries for the OCRJob model."""
+
+from uuid import UUID
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import select, update, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document
+from app.models.ocr_job import OCRJob, OCRJobStatus
+
+
+class OCRJobRepository:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, document_id: UUID, file_path: str, priority: int) -> OCRJob:
+        job = OCRJob(document_id=document_id, file_path=file_path, priority=priority)
+        self.db.add(job)
+        await self.db.flush()
+        return job
+
+    async def create_many(self, jobs: list[tuple[UUID, str, int]]) -> list[tuple[int, int]]:
+        """Insert ``(document_id, file_path, priority)`` jobs in one statement. Returns ``(id, priority)`` pairs."""
+        if not jobs:
+            return []
+        result = await self.db.execute(
+            insert(OCRJob)
+            .values([
+                {"document_id": doc_id, "file_path": path, "priority": priority}
+                for doc_id, path, priority in jobs
+            ])
+            .returning(OCRJob.id, OCRJob.priority)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def pending_blobs(self, sha256s: list[str]) -> set[str]:
+        """The digests among ``sha256s`` that already have an OCR job queued or running."""
+        if not sha256s:
+            return set()
+        result = await self.db.execute(
+            select(Document.sha256)
+            .join(OCRJob, OCRJob.document_id == Document.id)
+            .where(
+                Document.sha256.in_(sha256s),
+                OCRJob.status.in_([OCRJobStatus.QUEUED, OCRJobStatus.RUNNING]),
+            )
+            .distinct()
+        )
+        return set(result.scalars().all())
+
+    async def get_latest_for_document(self, document_id: UUID) -> OCRJob | None:
+        result = await self.db.execute(
+            select(OCRJob)
+            .where(OCRJob.document_id == document_id)
+            .order_by(OCRJob.created_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def claim(self, job_id: int) -> OCRJob | None:
+        """Atomically move a queued job to RUNNING. Returns None if another worker has it."""
+        result = await self.db.execute(
+            update(OCRJob)
+            .where(OCRJob.id == job_id, OCRJob.status == OCRJobStatus.QUEUED)
+            .values(
+                status=OCRJobStatus.RUNNING,
+                attempts=OCRJob.attempts + 1,
+                updated_at=datetime.now(timezone.utc),
+            )
+            .returning(OCRJob)
+        )
+        return result.scalar_one_or_none()
+
+    async def finish(self, job_id: int, status: OCRJobStatus, error: str | None = None) -> None:
+        """Record the outcome of an attempt. QUEUED means the job will be retried."""
+        await self.db.execute(
+            update(OCRJob)
+            .where(OCRJob.id == job_id)
+            .values(status=status, last_error=error, updated_at=datetime.now(timezone.utc))
+        )
+
+    async def get_pending(self, stale_after: timedelta) -> list[OCRJob]:
+        """Queued jobs plus running jobs abandoned by a worker that went away."""
+        await self.db.execute(
+            update(OCRJob)
+            .where(
+                OCRJob.status == OCRJobStatus.RUNNING,
+                OCRJob.updated_at < datetime.now(timezone.utc) - stale_after,
+            )
+            .values(status=OCRJobStatus.QUEUED)
+        )
+        result = await self.db.execute(
+            select(OCRJob)
+            .where(OCRJob.status == OCRJobStatus.QUEUED)
+            .order_by(OCRJob.priority, OCRJob.created_at)
+        )
+        return list(result.scalars().all())
+
+    async def count_backlog(self) -> int:
+        """Jobs waiting or running – a scan of the status index, not the table."""
+        result = await self.db.execute(
+            select(func.count(OCRJob.id)).where(
+                OCRJob.status.in_([OCRJobStatus.QUEUED, OCRJobStatus.RUNNING])
+            )
+        )
+        return result.scalar_one()
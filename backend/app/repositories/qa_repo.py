@@ -1,9 +1,8 @@
 """QA repository – database queries for QASession and QAMessage models."""
 
 from uuid import UUID
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.models.qa import QASession, QAMessage
 
@@ -17,29 +16,49 @@ class QARepository:
         session = QASession(user_id=user_id, document_id=document_id)
         self.db.add(session)
         await self.db.flush()
-        await self.db.refresh(session)
         return session
 
-    async def get_session(self, session_id: int) -> QASession | None:
+    async def get_latest_session_id(self, user_id: UUID, document_id: UUID) -> int | None:
+        """Id of the user's most recent session on the document – messages are not touched."""
         result = await self.db.execute(
-            select(QASession)
-            .options(selectinload(QASession.messages))
-            .where(QASession.id == session_id)
+            select(QASession.id)
+            .where(QASession.user_id == user_id, QASession.document_id == document_id)
+            .order_by(QASession.created_at.desc(), QASession.id.desc())
+            .limit(1)
         )
         return result.scalar_one_or_none()
 
-    async def get_sessions_for_document(self, user_id: UUID, document_id: UUID) -> list[QASession]:
+    async def get_latest_session(self, user_id: UUID, document_id: UUID) -> QASession | None:
+        """The user's most recent session on the document, without its messages."""
         result = await self.db.execute(
             select(QASession)
-            .options(selectinload(QASession.messages))
             .where(QASession.user_id == user_id, QASession.document_id == document_id)
-            .order_by(QASession.created_at.desc())
+            .order_by(QASession.created_at.desc(), QASession.id.desc())
+            .limit(1)
         )
-        return list(result.scalars().all())
+        return result.scalar_one_or_none()
 
-    async def add_message(self, session_id: int, role: str, content: str) -> QAMessage:
-        msg = QAMessage(session_id=session_id, role=role, content=content)
-        self.db.add(msg)
+    async def update_summary(self, session_id: int, summary: str, until_id: int) -> None:
+        """Store the rolling summary, which now covers messages up to ``until_id``."""
+        await self.db.execute(
+            update(QASession)
+            .where(QASession.id == session_id)
+            .values(summary=summary, summary_until_id=until_id)
+        )
+
+    async def add_messages(self, session_id: int, messages: list[tuple[str, str]]) -> list[QAMessage]:
+        """Insert ``(role, content)`` pairs in order with a single flush."""
+        rows = [QAMessage(session_id=session_id, role=role, content=content) for role, content in messages]
+        self.db.add_all(rows)
         await self.db.flush()
-        await self.db.refresh(msg)
-        return msg
+        return rows
+
+    async def get_messages(
+        self, session_id: int, before_id: int | None = None, limit: int = 20
+    ) -> list[QAMessage]:
+        """Up to ``limit`` messages older than ``before_id``, newest first (keyset on id)."""
+        query = select(QAMessage).where(QAMessage.session_id == session_id)
+        if before_id is not None:
+            query = query.where(QAMessage.id < before_id)
+        result = await self.db.execute(query.order_by(QAMessage.id.desc()).limit(limit))
+        return list(result.scalars().all())
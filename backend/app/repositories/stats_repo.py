@@ -0,0 +1,197 @@
+"""Stats repository – sharded counters, hourly upload buckets, and the exact counts behind them."""
+
+import random
+from datetime import datetime, timezone
+
+from sqlalchemy import select, func, text, true, Row
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document
+from app.models.stats import StatCounter, UploadBucket
+from app.models.user import User
+
+COUNTER_SHARDS = 8
+# Arbitrary key for the advisory lock that keeps reconciliation to one worker at a time
+RECONCILE_LOCK_KEY = 720_001
+
+
+def hour_start(at: datetime) -> datetime:
+    return at.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+class StatsRepository:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # ── Incremental updates ──────────────────────────
+    async def increment(self, **deltas: int) -> None:
+        """Add ``deltas`` to the named counters in one upsert on a random shard."""
+        shard = random.randrange(COUNTER_SHARDS)
+        stmt = insert(StatCounter).values(
+            [{"name": name, "shard": shard, "value": delta} for name, delta in deltas.items()]
+        )
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[StatCounter.name, StatCounter.shard],
+                set_={"value": StatCounter.value + stmt.excluded.value},
+            )
+        )
+
+    async def bump_bucket(self, at: datetime, uploads: int, size: int) -> None:
+        stmt = insert(UploadBucket).values(
+            bucket_start=hour_start(at), shard=random.randrange(COUNTER_SHARDS), uploads=uploads, bytes=size
+        )
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[UploadBucket.bucket_start, UploadBucket.shard],
+                set_={
+                    "uploads": UploadBucket.uploads + stmt.excluded.uploads,
+                    "bytes": UploadBucket.bytes + stmt.excluded.bytes,
+                },
+            )
+        )
+
+    async def record_upload(self, created_at: datetime, file_size: int, count: int = 1) -> None:
+        """``count`` documents totalling ``file_size`` bytes were uploaded at ``created_at``."""
+        await self.increment(documents=count, bytes_stored=file_size)
+        await self.bump_bucket(created_at, count, file_size)
+
+    async def record_delete(self, created_at: datetime, file_size: int) -> None:
+        """A soft delete moves the document out of its upload bucket and the live totals."""
+        await self.increment(documents=-1, deleted_documents=1, bytes_stored=-file_size)
+        await self.bump_bucket(created_at, -1, -file_size)
+
+    async def set_backlog(self, at: datetime, backlog: int) -> None:
+        stmt = insert(UploadBucket).values(
+            bucket_start=hour_start(at), shard=0, uploads=0, bytes=0, ocr_backlog=backlog
+        )
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[UploadBucket.bucket_start, UploadBucket.shard],
+                set_={"ocr_backlog": stmt.excluded.ocr_backlog},
+            )
+        )
+
+    # ── Reads ────────────────────────────────────────
+    async def get_counters(self) -> dict[str, int]:
+        result = await self.db.execute(
+            select(StatCounter.name, func.sum(StatCounter.value)).group_by(StatCounter.name)
+        )
+        return {name: int(value) for name, value in result.all()}
+
+    async def uploads_since(self, since: datetime) -> int:
+        result = await self.db.execute(
+            select(func.coalesce(func.sum(UploadBucket.uploads), 0))
+            .where(UploadBucket.bucket_start >= hour_start(since))
+        )
+        return int(result.scalar_one())
+
+    async def get_series(self, since: datetime, interval: str) -> list[Row]:
+        """``(period, uploads, bytes, ocr_backlog)`` per hour or day from ``since``, oldest first."""
+        period = func.date_trunc(interval, UploadBucket.bucket_start).label("period")
+        result = await self.db.execute(
+            select(
+                period,
+                func.sum(UploadBucket.uploads).label("uploads"),
+                func.sum(UploadBucket.bytes).label("bytes"),
+                func.max(UploadBucket.ocr_backlog).label("ocr_backlog"),
+            )
+            .where(UploadBucket.bucket_start >= hour_start(since))
+            .group_by(period)
+            .order_by(period)
+        )
+        return list(result.all())
+
+    # ── Reconciliation ───────────────────────────────
+    async def try_lock_reconcile(self) -> bool:
+        """Transaction-scoped lock, so only one worker reconciles at a time."""
+        result = await self.db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": RECONCILE_LOCK_KEY}
+        )
+        return bool(result.scalar_one())
+
+    async def counter_drift(self) -> dict[str, int]:
+        """Exact count minus counter value, per counter – full scans, so only the reconciler calls this.
+
+        Both sides come from one statement and so one snapshot: an increment
+        committed meanwhile is in neither and survives the correction.
+        """
+        live = Document.is_deleted == False
+        exact = select(
+            select(func.count(User.id)).scalar_subquery().label("users"),
+            func.count(Document.id).filter(live).label("documents"),
+            func.count(Document.id).filter(Document.is_deleted == True).label("deleted_documents"),
+            func.coalesce(func.sum(Document.file_size).filter(live), 0).label("bytes_stored"),
+        ).select_from(Document).subquery()
+        names = list(exact.c.keys())
+        counted = select(*(
+            func.coalesce(func.sum(StatCounter.value).filter(StatCounter.name == name), 0).label(name)
+            for name in names
+        )).subquery()
+        result = await self.db.execute(
+            select(*(exact.c[name] - counted.c[name] for name in names)).select_from(exact.join(counted, true()))
+        )
+        return {name: int(drift) for name, drift in zip(names, result.one())}
+
+    async def bucket_drift(self, since: datetime) -> list[tuple[datetime, int, int]]:
+        """``(bucket_start, uploads, bytes)`` the buckets from ``since`` on are off by, in one snapshot."""
+        since = hour_start(since)
+        hour = func.date_trunc("hour", Document.created_at)
+        exact = (
+            select(
+                hour.label("start"),
+                func.count(Document.id).label("uploads"),
+                func.sum(Document.file_size).label("bytes"),
+            )
+            .where(Document.is_deleted == False, Document.created_at >= since)
+            .group_by(hour)
+            .subquery()
+        )
+        counted = (
+            select(
+                UploadBucket.bucket_start.label("start"),
+                func.sum(UploadBucket.uploads).label("uploads"),
+                func.sum(UploadBucket.bytes).label("bytes"),
+            )
+            .where(UploadBucket.bucket_start >= since)
+            .group_by(UploadBucket.bucket_start)
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(
+                func.coalesce(exact.c.start, counted.c.start),
+                func.coalesce(exact.c.uploads, 0) - func.coalesce(counted.c.uploads, 0),
+                func.coalesce(exact.c.bytes, 0) - func.coalesce(counted.c.bytes, 0),
+            ).select_from(exact.join(counted, exact.c.start == counted.c.start, full=True))
+        )
+        return [(start, int(uploads), int(size)) for start, uploads, size in result.all() if uploads or size]
+
+    async def apply_counter_drift(self, drift: dict[str, int]) -> None:
+        """Add each counter's drift to its shard 0, leaving the other shards – and their increments – alone."""
+        values = [{"name": name, "shard": 0, "value": d} for name, d in drift.items() if d]
+        if values:
+            stmt = insert(StatCounter).values(values)
+            await self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[StatCounter.name, StatCounter.shard],
+                    set_={"value": StatCounter.value + stmt.excluded.value},
+                )
+            )
+
+    async def apply_bucket_drift(self, drift: list[tuple[datetime, int, int]]) -> None:
+        """Add each bucket's drift to its shard 0, keeping backlog samples."""
+        if drift:
+            stmt = insert(UploadBucket).values(
+                [{"bucket_start": start, "shard": 0, "uploads": n, "bytes": size} for start, n, size in drift]
+            )
+            await self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[UploadBucket.bucket_start, UploadBucket.shard],
+                    set_={
+                        "uploads": UploadBucket.uploads + stmt.excluded.uploads,
+                        "bytes": UploadBucket.bytes + stmt.excluded.bytes,
+                    },
+                )
+            )
@@ -0,0 +1,97 @@
+"""Upload session repository – resumable upload bookkeeping."""
+
+from uuid import UUID
+from datetime import datetime, timezone
+
+from sqlalchemy import select, delete, update, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.upload_session import UploadSession
+
+
+class UploadSessionRepository:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, session: UploadSession) -> UploadSession:
+        self.db.add(session)
+        await self.db.flush()
+        return session
+
+    async def get(self, upload_id: UUID) -> UploadSession | None:
+        return await self.db.get(UploadSession, upload_id)
+
+    async def lock(self, upload_id: UUID) -> UploadSession | None:
+        """Row-lock the session for this transaction. None if missing or another request holds it."""
+        result = await self.db.execute(
+            select(UploadSession)
+            .where(UploadSession.id == upload_id)
+            .with_for_update(skip_locked=True)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def claim(
+        self, upload_id: UUID, user_id: UUID, offset: int, until: datetime
+    ) -> UploadSession | None:
+        """Lease the chunk at ``offset`` until ``until``.
+
+        None if the session is missing, expired, not the user's, at another
+        offset, or leased to a request that is still writing.
+        """
+        now = datetime.now(timezone.utc)
+        result = await self.db.execute(
+            update(UploadSession)
+            .where(
+                UploadSession.id == upload_id,
+                UploadSession.user_id == user_id,
+                UploadSession.received == offset,
+                UploadSession.expires_at >= now,
+                or_(UploadSession.writing_until.is_(None), UploadSession.writing_until < now),
+            )
+            .values(writing_until=until)
+            .returning(UploadSession)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def finish(self, upload_id: UUID, offset: int, lease: datetime, received: int) -> UploadSession | None:
+        """Record the chunk if its lease at ``offset`` is still held. None if it was lost."""
+        result = await self.db.execute(
+            update(UploadSession)
+            .where(
+                UploadSession.id == upload_id,
+                UploadSession.received == offset,
+                UploadSession.writing_until == lease,
+            )
+            .values(received=received, writing_until=None)
+            .returning(UploadSession)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def release(self, upload_id: UUID, lease: datetime) -> None:
+        await self.db.execute(
+            update(UploadSession)
+            .where(UploadSession.id == upload_id, UploadSession.writing_until == lease)
+            .values(writing_until=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def delete(self, session: UploadSession) -> None:
+        await self.db.delete(session)
+        await self.db.flush()
+
+    async def delete_expired(self) -> list[UUID]:
+        """Drop sessions past their expiry that nobody is writing to. Returns their ids."""
+        now = datetime.now(timezone.utc)
+        expired = (
+            select(UploadSession.id)
+            .where(UploadSession.expires_at < now)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db.execute(
+            delete(UploadSession).where(UploadSession.id.in_(expired)).returning(UploadSession.id)
+        )
+        return list(result.scalars().all())
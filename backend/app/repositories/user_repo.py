@@ -1,10 +1,13 @@
 """User repository – database queries for User model."""
 
 from uuid import UUID
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.user import User
+from app.core.principals import Principal, invalidate_principal
+from app.models.user import User, UserRole
+from app.models.document import Document
+from app.repositories.stats_repo import StatsRepository
 
 
 class UserRepository:
@@ -16,6 +19,13 @@ class UserRepository:
         result = await self.db.execute(select(User).where(User.id == user_id))
         return result.scalar_one_or_none()
 
+    async def get_principal(self, user_id: UUID) -> Principal | None:
+        result = await self.db.execute(
+            select(User.id, User.email, User.role).where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        return Principal(id=row.id, email=row.email, role=row.role) if row else None
+
     async def get_by_email(self, email: str) -> User | None:
         result = await self.db.execute(select(User).where(User.email == email))
         return result.scalar_one_or_none()
@@ -24,12 +34,31 @@ class UserRepository:
         self.db.add(user)
         await self.db.flush()
         await self.db.refresh(user)
+        await StatsRepository(self.db).increment(users=1)
         return user
 
+    async def set_role(self, user_id: UUID, role: UserRole) -> None:
+        """Change a user's role and drop this worker's cached principal for them.
+
+        Other workers keep theirs until it expires (``PRINCIPAL_CACHE_TTL_SECONDS``).
+        """
+        await self.db.execute(update(User).where(User.id == user_id).values(role=role))
+        invalidate_principal(user_id)
+
     async def get_all(self) -> list[User]:
         result = await self.db.execute(select(User).order_by(User.created_at.desc()))
         return list(result.scalars().all())
 
-    async def count(self) -> int:
-        result = await self.db.execute(select(func.count(User.id)))
-        return result.scalar_one()
+    async def get_all_with_document_counts(self) -> list[tuple[User, int]]:
+        """All users with their document counts, aggregated in SQL instead of loading documents."""
+        doc_counts = (
+            select(Document.uploaded_by, func.count(Document.id).label("document_count"))
+            .group_by(Document.uploaded_by)
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(User, func.coalesce(doc_counts.c.document_count, 0))
+            .outerjoin(doc_counts, doc_counts.c.uploaded_by == User.id)
+            .order_by(User.created_at.desc())
+        )
+        return [(user, count) for user, count in result.all()]
@@ -14,8 +14,30 @@ class AdminUserResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class CacheStatsResponse(BaseModel):
+    name: str
+    size: int
+    maxsize: int
+    ttl: float
+    hits: int
+    misses: int
+    hit_rate: float
+    # Answer cache only
+    near_hits: int | None = None
+    latency_saved_seconds: float | None = None
+
+
 class AdminStatsResponse(BaseModel):
     total_users: int
     total_documents: int
     total_deleted_documents: int
     uploads_today: int
+    bytes_stored: int  # live (not deleted) documents
+    ocr_backlog: int  # jobs queued or running
+
+
+class StatsPointResponse(BaseModel):
+    period: str
+    uploads: int  # uploads in the period that are not deleted
+    bytes: int
+    ocr_backlog: int | None = None  # latest sample in the period, if any
@@ -1,7 +1,9 @@
 """Pydantic schemas for documents."""
 
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.utils.file_serving import signed_preview_url
 
 
 # ── Requests ─────────────────────────────────────────
@@ -10,6 +12,17 @@ class DocumentUpdate(BaseModel):
     tags: list[str] | None = None
 
 
+class UploadSessionCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=500)
+    size: int = Field(..., gt=0)  # total bytes
+    title: str | None = None
+    tags: list[str] | None = None
+
+
+class UploadComplete(BaseModel):
+    sha256: str | None = None  # whole-file digest to verify, if the client has one
+
+
 # ── Responses ────────────────────────────────────────
 class TagResponse(BaseModel):
     id: int
@@ -28,19 +41,88 @@ class DocumentResponse(BaseModel):
     updated_at: str
     uploaded_by: str
     tags: list[TagResponse] = []
+    thumbnail_url: str | None = None  # signed URL of the first-page thumbnail
 
     model_config = {"from_attributes": True}
 
+    @classmethod
+    def from_row(cls, row, **extra):
+        """Build from a ``summary_columns`` row, skipping validation – the row is already typed."""
+        return cls.model_construct(
+            id=str(row.id),
+            title=row.title,
+            file_type=row.file_type,
+            file_size=row.file_size,
+            is_deleted=row.is_deleted,
+            created_at=str(row.created_at),
+            updated_at=str(row.updated_at),
+            uploaded_by=str(row.uploaded_by),
+            tags=[TagResponse.model_construct(**tag) for tag in row.tags],
+            thumbnail_url=signed_preview_url(row.sha256, 1, "thumb"),
+            **extra,
+        )
+
 
 class DocumentDetailResponse(DocumentResponse):
     file_path: str
+    file_url: str | None = None  # short-lived signed URL, usable without the auth header
+    preview_url: str | None = None  # signed URL of a large first-page preview
     extracted_text: str | None = None
     owner_email: str | None = None
 
 
 class DocumentListResponse(BaseModel):
     items: list[DocumentResponse]
-    total: int
+    total: int | None  # None when the count was skipped (count=none)
     page: int
     size: int
-    pages: int
+    pages: int | None
+    next_cursor: str | None = None
+
+
+class SearchResultResponse(DocumentResponse):
+    rank: float  # ts_rank, cosine similarity, or the blended score – depending on mode
+    snippet: str | None = None  # lexical: matches wrapped in **…**; otherwise the best chunk
+
+
+class SearchListResponse(DocumentListResponse):
+    items: list[SearchResultResponse]
+
+
+class OCRJobResponse(BaseModel):
+    id: int
+    document_id: str
+    status: str
+    attempts: int
+    last_error: str | None = None
+    created_at: str
+    updated_at: str
+
+
+class BatchFileResponse(BaseModel):
+    filename: str
+    status: str  # queued, duplicate (stored content reused) or rejected
+    document_id: str | None = None
+    error: str | None = None
+
+
+class UploadBatchResponse(BaseModel):
+    id: str
+    total: int
+    accepted: int
+    created_at: str
+    files: list[BatchFileResponse]
+
+
+class UploadBatchProgressResponse(UploadBatchResponse):
+    ocr_jobs: dict[str, int]  # job count by status
+    documents_with_text: int
+
+
+class UploadSessionResponse(BaseModel):
+    id: str
+    filename: str
+    size: int
+    offset: int  # bytes received so far – where the next chunk starts
+    max_chunk_size: int
+    expires_at: str
@@ -8,6 +8,7 @@ class QARequest(BaseModel):
 
 
 class QAMessageResponse(BaseModel):
+    id: int
     role: str
     content: str
     created_at: str
@@ -18,4 +19,12 @@ class QAMessageResponse(BaseModel):
 class QAResponse(BaseModel):
     answer: str
     session_id: int
-    messages: list[QAMessageResponse] = []
+    cached: bool = False  # answer reused from an earlier, equivalent question
+    messages: list[QAMessageResponse] = []  # this turn only: the question and the answer
+    history_cursor: str | None = None  # pass to GET /qa/{document_id}/history for earlier turns
+
+
+class QAHistoryResponse(BaseModel):
+    session_id: int | None
+    messages: list[QAMessageResponse]  # oldest first
+    next_cursor: str | None = None  # continues further back in time
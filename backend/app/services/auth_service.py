@@ -2,7 +2,9 @@
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token
+from app.core.security import (
+    hash_password_async, verify_and_update_password, create_access_token, create_refresh_token,
+)
 from app.models.user import User, UserRole
 from app.repositories.user_repo import UserRepository
 from app.exceptions.http_exceptions import BadRequestException, UnauthorizedException
@@ -21,7 +23,7 @@ class AuthService:
 
         user = User(
             email=email,
-            password_hash=hash_password(password),
+            password_hash=await hash_password_async(password),
             full_name=full_name,
             role=UserRole.USER,
         )
@@ -34,9 +36,16 @@ class AuthService:
     async def login(self, email: str, password: str) -> tuple[User, str, str]:
         """Login a user. Returns (user, access_token, refresh_token)."""
         user = await self.repo.get_by_email(email)
-        if not user or not verify_password(password, user.password_hash):
+        if not user:
             raise UnauthorizedException("Invalid email or password")
 
+        valid, new_hash = await verify_and_update_password(password, user.password_hash)
+        if not valid:
+            raise UnauthorizedException("Invalid email or password")
+        if new_hash:
+            # Transparently upgrade hashes made with an older cost factor
+            user.password_hash = new_hash
+
         access_token = create_access_token(str(user.id), {"role": user.role.value})
         refresh_token = create_refresh_token(str(user.id))
         return user, access_token, refresh_token
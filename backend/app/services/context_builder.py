@@ -0,0 +1,180 @@
+"""Context builder – packs the QA prompt into a fixed token budget.
+
+The prompt is the system prompt, the question and up to ``QA_CONTEXT_TOKENS``
+of retrieved chunks, plus – in order of priority – the most recent turns
+verbatim and a rolling summary of older turns, as far as ``QA_PROMPT_TOKENS``
+allows. Questions too long to fit next to the chunks are rejected. The summary
+lives on the session and is extended only with the messages that just left the
+verbatim window, so each turn does bounded work however long the conversation is;
+the QA service saves the extended summary.
+"""
+
+import re
+import uuid
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.models.document import Document
+from app.models.qa import QAMessage
+from app.repositories.qa_repo import QARepository
+from app.services.retrieval_service import RetrievalService
+from app.utils.tokens import count_tokens
+from app.exceptions.http_exceptions import BadRequestException
+
+SYSTEM_PROMPT = (
+    "You are a helpful document assistant. Answer questions based "
+    "on the provided document context. If you cannot find the answer "
+    "in the context, say so clearly."
+)
+
+# Chat-format overhead per message (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+# Page label and separator around each retrieved chunk
+CHUNK_OVERHEAD_TOKENS = 8
+SUMMARY_LINE_CHARS = 200
+
+# A short question opening with one of these leans on earlier turns ("and who signed it?");
+# longer ones, or ones that name their subject, are answered the same in any conversation
+FOLLOW_UP_MAX_WORDS = 8
+FOLLOW_UP_OPENERS = frozenset("""
+and but or so then also it its they them their this that these those he his she her
+""".split())
+FOLLOW_UP_PHRASES = frozenset(["what about", "how about", "what else", "why not", "why so"])
+
+
+@dataclass
+class Conversation:
+    session_id: int | None = None
+    turns: list[QAMessage] = field(default_factory=list)  # verbatim, oldest first
+    summary: str | None = None
+    # Set when the summary was extended – the last message it now covers – so it must be saved
+    summary_until_id: int | None = None
+
+
+def is_follow_up(question: str, conversation: Conversation) -> bool:
+    """Whether the question likely depends on the conversation so far."""
+    if not (conversation.turns or conversation.summary):
+        return False
+    words = re.findall(r"\w+", question.lower())
+    if len(words) > FOLLOW_UP_MAX_WORDS:
+        return False
+    # "Why?", "and then?"
+    return len(words) <= 2 or words[0] in FOLLOW_UP_OPENERS or " ".join(words[:2]) in FOLLOW_UP_PHRASES
+
+
+def _question_message(question: str, context: str = "") -> str:
+    return f"Document context:\n{context}\n\nQuestion: {question}"
+
+
+def _fixed_budget() -> int:
+    """Tokens left for everything but the retrieved chunks."""
+    return settings.QA_PROMPT_TOKENS - settings.QA_CONTEXT_TOKENS - settings.QA_TOP_K * CHUNK_OVERHEAD_TOKENS
+
+
+def check_question(question: str) -> None:
+    """Reject a question that would not fit in the prompt next to the system prompt and the chunks."""
+    limit = (
+        _fixed_budget()
+        - count_tokens(SYSTEM_PROMPT)
+        - count_tokens(_question_message(""))
+        - 2 * MESSAGE_OVERHEAD_TOKENS
+    )
+    if count_tokens(question) > limit:
+        raise BadRequestException(f"Question too long. Maximum: about {max(limit, 0)} tokens")
+
+
+def _summary_line(message: QAMessage) -> str:
+    text = " ".join(message.content.split())
+    if message.role == "assistant":
+        # The first sentence usually carries the answer
+        text = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS].rsplit(" ", 1)[0] + "…"
+    return f"{'User' if message.role == 'user' else 'Assistant'}: {text}"
+
+
+def roll_summary(summary: str | None, messages: list[QAMessage], budget: int) -> str:
+    """Append one line per message and drop the oldest lines until the summary fits ``budget``."""
+    lines = (summary.splitlines() if summary else []) + [_summary_line(m) for m in messages]
+    sizes = [count_tokens(line) + 1 for line in lines]
+    while len(lines) > 1 and sum(sizes) > budget:
+        lines.pop(0)
+        sizes.pop(0)
+    return "\n".join(lines)
+
+
+class ContextBuilder:
+
+    def __init__(self, qa_repo: QARepository, retrieval: RetrievalService):
+        self.qa_repo = qa_repo
+        self.retrieval = retrieval
+
+    async def conversation(self, user_id: uuid.UUID, document_id: uuid.UUID) -> Conversation:
+        """The latest session's recent turns, folding whatever no longer fits into its summary.
+
+        The session is not modified; a summary that was extended comes back with
+        ``summary_until_id`` set for the caller to save.
+        """
+        session = await self.qa_repo.get_latest_session(user_id, document_id)
+        if session is None:
+            return Conversation()
+
+        window = settings.QA_HISTORY_MESSAGES
+        recent = await self.qa_repo.get_messages(session.id, limit=window)  # newest first
+
+        # Two slots stay spare: the next turn pushes two messages out of the window,
+        # and anything that leaves it must already be in the summary
+        verbatim, used = [], 0
+        for message in recent[:max(window - 2, 0)]:
+            tokens = count_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS
+            if used + tokens > settings.QA_HISTORY_TOKENS:
+                break
+            verbatim.append(message)
+            used += tokens
+
+        conversation = Conversation(session.id, list(reversed(verbatim)), session.summary)
+        unsummarized = [
+            m for m in reversed(recent[len(verbatim):]) if m.id > (session.summary_until_id or 0)
+        ]
+        if unsummarized:
+            conversation.summary = roll_summary(session.summary, unsummarized, settings.QA_SUMMARY_TOKENS)
+            conversation.summary_until_id = unsummarized[-1].id
+        return conversation
+
+    async def build(self, doc: Document, question: str, conversation: Conversation) -> list[dict]:
+        """Chat messages for the LLM, within ``QA_PROMPT_TOKENS``.
+
+        The question must have passed ``check_question``.
+        """
+        system = SYSTEM_PROMPT
+        budget = _fixed_budget() - sum(
+            count_tokens(text) + MESSAGE_OVERHEAD_TOKENS for text in (system, _question_message(question))
+        )
+        # Newest turns first, then the summary, as far as the budget allows
+        history = []
+        for message in reversed(conversation.turns):
+            tokens = count_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS
+            if tokens > budget:
+                break
+            history.insert(0, {"role": message.role, "content": message.content})
+            budget -= tokens
+        if conversation.summary:
+            summary = f"\n\nSummary of the earlier conversation:\n{conversation.summary}"
+            if count_tokens(summary) <= budget:
+                system += summary
+
+        # Follow-ups ("what about the second one?") retrieve with the previous question too
+        query = question
+        if is_follow_up(question, conversation):
+            previous = next((m.content for m in reversed(conversation.turns) if m.role == "user"), "")
+            query = f"{previous} {question}"
+
+        chunks = await self.retrieval.retrieve(doc, query, token_budget=settings.QA_CONTEXT_TOKENS)
+        context = "\n---\n".join(
+            f"[Page {c.page}]\n{c.content}" if c.page else c.content for c in chunks
+        )
+        return [
+            {"role": "system", "content": system},
+            *history,
+            {"role": "user", "content": _question_message(question, context)},
+        ]
@@ -1,15 +1,36 @@
 """Document service – business logic for document management."""
 
-import os
+import asyncio
 import uuid
-from pathlib import Path
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path, PurePosixPath
 
 from fastapi import UploadFile
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.models.document import Document
-from app.repositories.document_repo import DocumentRepository, TagRepository
+from app.models.ocr_job import OCRJob
+from app.models.upload_batch import UploadBatch
+from app.repositories.batch_repo import BatchRepository
+from app.repositories.document_repo import DocumentRepository, TagRepository, BlobRepository
+from app.repositories.ocr_job_repo import OCRJobRepository
+from app.services.retrieval_service import RetrievalService
+from app.services.search_service import SearchMode, SearchService
+from app.workers.ocr_worker import job_priority
+from app.utils.pagination import CountMode
+from app.utils.storage import (
+    FileTooLargeError,
+    StagedFile,
+    blob_path,
+    discard,
+    promote_to_blob,
+    stage_zip_members,
+    staging_path,
+    stream_upload_to_disk,
+)
 from app.exceptions.http_exceptions import (
     BadRequestException,
     NotFoundException,
@@ -20,57 +41,232 @@ ALLOWED_TYPES = {"application/pdf": "pdf", "image/jpeg": "jpg", "image/png": "pn
 ALLOWED_EXTENSIONS = {".pdf", ".jpg", ".jpeg", ".png"}
 
 
+def _file_type(ext: str) -> str:
+    file_type = ext.lstrip(".")
+    return "jpg" if file_type == "jpeg" else file_type
+
+
 class DocumentService:
 
     def __init__(self, db: AsyncSession):
         self.repo = DocumentRepository(db)
         self.tag_repo = TagRepository(db)
+        self.blob_repo = BlobRepository(db)
+        self.job_repo = OCRJobRepository(db)
+        self.batch_repo = BatchRepository(db)
+        self.retrieval = RetrievalService(db)
+        self.search_service = SearchService(db)
 
     async def upload(
         self, file: UploadFile, title: str, user_id: uuid.UUID, tag_names: list[str] | None = None
-    ) -> Document:
+    ) -> tuple[Document, OCRJob | None]:
+        """Store an upload. Returns (document, ocr_job) – the job is None when OCR is not needed.
+
+        Identical bytes are stored once: a duplicate upload takes a reference on the
+        existing blob and reuses the text extracted for an earlier copy instead of
+        running OCR again. Without text (OCR failed or is still running) it queues
+        OCR unless a job for the blob is already pending.
+        """
         # Validate extension
         ext = Path(file.filename or "").suffix.lower()
         if ext not in ALLOWED_EXTENSIONS:
             raise BadRequestException(f"File type '{ext}' not allowed. Allowed: {ALLOWED_EXTENSIONS}")
 
-        # Read file & validate size
-        content = await file.read()
-        if len(content) > settings.max_file_size_bytes:
-            raise BadRequestException(f"File too large. Maximum: {settings.MAX_FILE_SIZE_MB}MB")
+        file_type = _file_type(ext)
 
-        # Determine file type
-        file_type = ext.lstrip(".")
-        if file_type == "jpeg":
-            file_type = "jpg"
+        # Stream to a staging file, enforcing the size limit and hashing on the way
+        staged = staging_path(ext)
+        try:
+            file_size, sha256 = await stream_upload_to_disk(file, staged)
+        except FileTooLargeError:
+            raise BadRequestException(f"File too large. Maximum: {settings.MAX_FILE_SIZE_MB}MB")
 
-        # Save to disk
-        file_id = uuid.uuid4()
-        filename = f"{file_id}{ext}"
-        file_path = settings.upload_path / filename
-        with open(file_path, "wb") as f:
-            f.write(content)
+        # Deduplicate by content – the staged copy is dropped if the blob already exists
+        try:
+            blob = await self.blob_repo.acquire(
+                sha256, str(blob_path(sha256, f".{file_type}")), file_size
+            )
+            await promote_to_blob(staged, Path(blob.file_path))
+        except Exception:
+            await discard(staged)
+            raise
 
         # Create document record
         doc = Document(
-            id=file_id,
             title=title or file.filename or "Untitled",
-            file_path=str(file_path),
+            file_path=blob.file_path,
             file_type=file_type,
-            file_size=len(content),
+            file_size=file_size,
+            sha256=sha256,
             uploaded_by=user_id,
         )
 
         # Handle tags
-        if tag_names:
-            tags = await self.tag_repo.get_or_create_many(tag_names)
-            doc.tags = tags
+        doc.tags = await self.tag_repo.get_or_create_many(tag_names) if tag_names else []
 
-        doc = await self.repo.create(doc)
-        return doc
+        new_blob = blob.ref_count == 1
+        text = None if new_blob else (await self.repo.known_texts([sha256])).get(sha256)
+        doc = await self.repo.create(doc, text=text)
+
+        job = None
+        if text is not None:
+            await self.retrieval.copy_from_duplicate([doc.id], sha256)
+        elif new_blob or not await self.job_repo.pending_blobs([sha256]):
+            job = await self.job_repo.create(doc.id, doc.file_path, job_priority(file_size))
+        return doc, job
+
+    async def bulk_upload(
+        self, files: list[UploadFile], user_id: uuid.UUID, tag_names: list[str] | None = None
+    ) -> tuple[UploadBatch, list[tuple[int, int]], list[tuple[str, str]]]:
+        """Store a multi-file upload, expanding ZIP archives. Returns (batch, jobs, new_blobs).
+
+        ``jobs`` are the ``(job_id, priority)`` OCR jobs to queue and
+        ``new_blobs`` the ``(sha256, file_path)`` of content stored for the
+        first time, which needs previews.
+
+        Files are staged concurrently, then the whole batch is written with one
+        blob upsert, one INSERT per table and one OCR job INSERT. Unsupported
+        or oversized files are rejected individually; everything else in the
+        batch still goes in.
+        """
+        if len(files) > settings.BULK_MAX_FILES:
+            raise BadRequestException(f"Too many files. Maximum per batch: {settings.BULK_MAX_FILES}")
+
+        return await self.ingest(await self._stage_all(files), user_id, tag_names)
+
+    async def ingest(
+        self, staged: list[StagedFile], user_id: uuid.UUID, tag_names: list[str] | None = None
+    ) -> tuple[UploadBatch, list[tuple[int, int]], list[tuple[str, str]]]:
+        """Turn staged files into one batch of documents; returns what ``bulk_upload`` does.
+
+        Staged files are consumed either way.
+        """
+        accepted = [f for f in staged if f.error is None]
+        if len(accepted) > settings.BULK_MAX_FILES:
+            await asyncio.gather(*(discard(f.path) for f in accepted))
+            raise BadRequestException(f"Too many files. Maximum per batch: {settings.BULK_MAX_FILES}")
+
+        # One blob per distinct digest, referenced once per file carrying it
+        refs = Counter(f.sha256 for f in accepted)
+        first: dict[str, StagedFile] = {}
+        for f in accepted:
+            first.setdefault(f.sha256, f)
+        try:
+            blobs = await self.blob_repo.acquire_many({
+                sha256: (str(blob_path(sha256, f".{_file_type(f.ext)}")), f.size, refs[sha256])
+                for sha256, f in first.items()
+            })
+            for sha256, f in first.items():
+                await promote_to_blob(f.path, Path(blobs[sha256].file_path))
+            await asyncio.gather(*(discard(f.path) for f in accepted if first[f.sha256] is not f))
+        except Exception:
+            await asyncio.gather(*(discard(f.path) for f in accepted))
+            raise
+
+        # Blobs are deleted with their last reference, so one holding only this batch's is new
+        new = {sha256 for sha256, blob in blobs.items() if blob.ref_count == refs[sha256]}
+        known = await self.repo.known_texts([sha256 for sha256 in blobs if sha256 not in new])
+        # Existing blobs without text get OCR again, unless a job for them is still pending
+        pending = await self.job_repo.pending_blobs(
+            [sha256 for sha256 in blobs if sha256 not in new and sha256 not in known]
+        )
+        tags = await self.tag_repo.get_or_create_many(tag_names) if tag_names else []
+        batch = await self.batch_repo.create(
+            UploadBatch(id=uuid.uuid4(), user_id=user_id, total=len(staged), accepted=len(accepted), results=[])
+        )
+
+        now = datetime.now(timezone.utc)
+        rows: list[dict] = []
+        texts: dict[uuid.UUID, str] = {}
+        ocr: list[tuple[uuid.UUID, str, int]] = []
+        copies: dict[str, list[uuid.UUID]] = {}
+        results: list[dict] = []
+        for f in staged:
+            if f.error is not None:
+                results.append({"filename": f.name, "status": "rejected", "document_id": None, "error": f.error})
+                continue
+            blob = blobs[f.sha256]
+            doc_id = uuid.uuid4()
+            rows.append({
+                "id": doc_id,
+                "title": f.title or PurePosixPath(f.name).name,
+                "file_path": blob.file_path,
+                "file_type": _file_type(f.ext),
+                "file_size": f.size,
+                "sha256": f.sha256,
+                "uploaded_by": user_id,
+                "batch_id": batch.id,
+                "created_at": now,
+            })
+            status = "duplicate"
+            if f.sha256 in known:
+                texts[doc_id] = known[f.sha256]
+                copies.setdefault(f.sha256, []).append(doc_id)
+            elif first[f.sha256] is f and f.sha256 not in pending:
+                # OCR each blob once; the result is copied to the batch's other references
+                ocr.append((doc_id, blob.file_path, job_priority(f.size, interactive=False)))
+                status = "queued"
+            results.append({"filename": f.name, "status": status, "document_id": str(doc_id), "error": None})
+
+        await self.repo.create_many(rows, texts, [tag.id for tag in tags])
+        jobs = await self.job_repo.create_many(ocr)
+        for sha256, doc_ids in copies.items():
+            await self.retrieval.copy_from_duplicate(doc_ids, sha256)
+
+        batch.results = results
+        new_blobs = [(sha256, blob.file_path) for sha256, blob in blobs.items() if sha256 in new]
+        return batch, jobs, new_blobs
+
+    async def _stage_all(self, files: list[UploadFile]) -> list[StagedFile]:
+        """Stage every upload (and ZIP member) with bounded parallelism, in upload order."""
+        semaphore = asyncio.Semaphore(settings.BULK_UPLOAD_CONCURRENCY)
+
+        async def stage(file: UploadFile) -> list[StagedFile]:
+            name = file.filename or "upload"
+            ext = Path(name).suffix.lower()
+            async with semaphore:
+                if ext == ".zip":
+                    return await asyncio.to_thread(
+                        stage_zip_members, file.file, name, ALLOWED_EXTENSIONS, settings.BULK_MAX_FILES
+                    )
+                if ext not in ALLOWED_EXTENSIONS:
+                    return [StagedFile(name, error=f"File type '{ext}' not allowed")]
+                path = staging_path(ext)
+                try:
+                    size, sha256 = await stream_upload_to_disk(file, path)
+                except FileTooLargeError:
+                    return [StagedFile(name, error=f"File too large. Maximum: {settings.MAX_FILE_SIZE_MB}MB")]
+                return [StagedFile(name, ext, path, size, sha256)]
+
+        outcomes = await asyncio.gather(*(stage(file) for file in files), return_exceptions=True)
+        staged = [f for outcome in outcomes if isinstance(outcome, list) for f in outcome]
+        failure = next((o for o in outcomes if isinstance(o, BaseException)), None)
+        if failure is not None:
+            await asyncio.gather(*(discard(f.path) for f in staged if f.path))
+            raise failure
+        return staged
+
+    async def get_batch(
+        self, batch_id: uuid.UUID, user_id: uuid.UUID, user_role: str
+    ) -> tuple[UploadBatch, dict[str, int], int]:
+        """A batch with its OCR job counts by status and the number of documents with text."""
+        batch = await self.batch_repo.get(batch_id)
+        if not batch:
+            raise NotFoundException("Upload batch not found")
+        if str(batch.user_id) != str(user_id) and user_role != "ADMIN":
+            raise ForbiddenException("You can only view your own upload batches")
+        jobs, with_text = await self.batch_repo.progress(batch_id)
+        return batch, jobs, with_text
+
+    async def get_ocr_job(self, doc_id: uuid.UUID) -> OCRJob:
+        await self.get_document(doc_id)
+        job = await self.job_repo.get_latest_for_document(doc_id)
+        if not job:
+            raise NotFoundException("No OCR job for this document")
+        return job
 
-    async def get_document(self, doc_id: uuid.UUID) -> Document:
-        doc = await self.repo.get_by_id(doc_id)
+    async def get_document(self, doc_id: uuid.UUID, with_text: bool = False) -> Document:
+        doc = await self.repo.get_by_id(doc_id, with_text=with_text)
         if not doc:
             raise NotFoundException("Document not found")
         return doc
@@ -83,10 +279,12 @@ class DocumentService:
         tag: str | None = None,
         title_search: str | None = None,
         user_id: uuid.UUID | None = None,
-    ) -> tuple[list[Document], int]:
+        cursor: str | None = None,
+        count: CountMode = "exact",
+    ) -> tuple[list[Row], int | None, str | None]:
         return await self.repo.get_list(
             page=page, size=size, file_type=file_type, tag=tag,
-            title_search=title_search, user_id=user_id,
+            title_search=title_search, user_id=user_id, cursor=cursor, count=count,
         )
 
     async def update_document(
@@ -110,5 +308,12 @@ class DocumentService:
             raise ForbiddenException("You can only delete your own documents")
         await self.repo.soft_delete(doc)
 
-    async def search(self, query: str, page: int = 1, size: int = 20) -> tuple[list[Document], int]:
-        return await self.repo.search(query, page, size)
+    async def search(
+        self, query: str, page: int = 1, size: int = 20,
+        cursor: str | None = None, count: CountMode = "exact", mode: SearchMode = "lexical",
+    ) -> tuple[list[tuple[Row, float, str | None]], int | None, str | None]:
+        if mode == "lexical":
+            return await self.repo.search(query, page, size, cursor=cursor, count=count)
+        if cursor:
+            raise BadRequestException("Cursor pagination is only available in lexical mode")
+        return await self.search_service.search(query, mode, page, size, count=count)
@@ -1,27 +1,81 @@
 """QA service – AI question-answering business logic."""
 
+import asyncio
+import json
+import logging
+import time
 import uuid
-import httpx
+from typing import AsyncIterator
 
+import httpx
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.llm import llm_client
+from app.models.document import Document
+from app.models.qa import QAMessage
 from app.repositories.qa_repo import QARepository
 from app.repositories.document_repo import DocumentRepository
+from app.services.context_builder import ContextBuilder, Conversation, check_question, is_follow_up
+from app.services.retrieval_service import RetrievalService
+from app.utils.answer_cache import CachedAnswer, answer_cache, normalize_question
+from app.utils.embeddings import get_embedder
+from app.utils.pagination import decode_cursor, encode_cursor
 from app.exceptions.http_exceptions import NotFoundException, BadRequestException
 
+logger = logging.getLogger(__name__)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _message(m: QAMessage) -> dict:
+    return {"id": m.id, "role": m.role, "content": m.content, "created_at": str(m.created_at)}
+
+
+async def _save_turn(
+    qa_repo: QARepository,
+    session_id: int | None,
+    user_id: uuid.UUID,
+    document_id: uuid.UUID,
+    question: str,
+    answer: str,
+) -> dict:
+    """Append the question and answer to the session (a new one if ``None``) in one flush.
+
+    Returns only this turn, plus a cursor to page back through earlier ones.
+    """
+    has_history = session_id is not None
+    if session_id is None:
+        session_id = (await qa_repo.create_session(user_id, document_id)).id
+    rows = await qa_repo.add_messages(session_id, [("user", question), ("assistant", answer)])
+    return {
+        "answer": answer,
+        "session_id": session_id,
+        "messages": [_message(m) for m in rows],
+        "history_cursor": encode_cursor(rows[0].id) if has_history else None,
+    }
+
+
+def content_version(doc: Document) -> str:
+    """``updated_at`` – every text change bumps it, so answers about older text
+    are never hit again, in any worker. Renames and retags bump it too."""
+    return doc.updated_at.isoformat()
+
 
 class QAService:
 
     def __init__(self, db: AsyncSession):
         self.qa_repo = QARepository(db)
         self.doc_repo = DocumentRepository(db)
+        self.retrieval = RetrievalService(db)
+        self.context = ContextBuilder(self.qa_repo, self.retrieval)
 
-    async def ask_question(
-        self, document_id: uuid.UUID, user_id: uuid.UUID, question: str
-    ) -> dict:
-        # Verify document exists
-        doc = await self.doc_repo.get_by_id(document_id)
+    async def _get_answerable_document(self, document_id: uuid.UUID) -> Document:
+        doc = await self.doc_repo.get_by_id(document_id, with_text=True)
         if not doc:
             raise NotFoundException("Document not found")
 
@@ -29,123 +83,159 @@ class QAService:
             raise BadRequestException(
                 "No extracted text available for this document. OCR may still be processing."
             )
+        return doc
+
+    async def _conversation(self, user_id: uuid.UUID, document_id: uuid.UUID) -> Conversation:
+        """The conversation to answer in, saving its summary if it was extended."""
+        conversation = await self.context.conversation(user_id, document_id)
+        if conversation.summary_until_id is not None:
+            await self.qa_repo.update_summary(
+                conversation.session_id, conversation.summary, conversation.summary_until_id
+            )
+        return conversation
 
-        # Check if AI is configured
-        if not settings.OPENAI_API_KEY:
-            return await self._fallback_answer(document_id, user_id, question, doc.extracted_text)
-
-        # Create or reuse session
-        sessions = await self.qa_repo.get_sessions_for_document(user_id, document_id)
-        if sessions:
-            session = sessions[0]
-        else:
-            session = await self.qa_repo.create_session(user_id, document_id)
-
-        # Save user message
-        await self.qa_repo.add_message(session.id, "user", question)
-
-        # Prepare context - chunk text
-        chunks = self._chunk_text(doc.extracted_text, max_chars=3000)
-        context = "\n---\n".join(chunks[:3])  # Use first 3 chunks
+    @staticmethod
+    async def _cache_key(doc: Document, question: str) -> tuple[tuple, np.ndarray]:
+        """``(document, content version, normalized question)`` and the question's vector."""
+        normalized = normalize_question(question)
+        vector = (await asyncio.to_thread(get_embedder().embed, [normalized]))[0]
+        return (doc.id, content_version(doc), normalized), vector
 
-        # Call LLM
-        answer = await self._call_llm(question, context)
+    async def ask_question(
+        self, document_id: uuid.UUID, user_id: uuid.UUID, question: str
+    ) -> dict:
+        check_question(question)
+        doc = await self._get_answerable_document(document_id)
 
-        # Save assistant message
-        await self.qa_repo.add_message(session.id, "assistant", answer)
+        # Check if AI is configured
+        if settings.QA_OFFLINE or not settings.OPENAI_API_KEY:
+            return await self._fallback_answer(doc, user_id, question)
+
+        conversation = await self._conversation(user_id, doc.id)
+        # Follow-ups depend on earlier turns, so a cached answer to the same words may not fit
+        key = vector = cached = None
+        if not is_follow_up(question, conversation):
+            key, vector = await self._cache_key(doc, question)
+            cached = answer_cache.lookup(*key, vector)
+        if cached:
+            answer = cached.answer
+        else:
+            # Call LLM
+            started = time.perf_counter()
+            answer = await self._call_llm(await self.context.build(doc, question, conversation))
+            if key:
+                answer_cache.store(*key, CachedAnswer(answer, vector, time.perf_counter() - started))
 
-        # Reload session with messages
-        session = await self.qa_repo.get_session(session.id)
+        turn = await _save_turn(self.qa_repo, conversation.session_id, user_id, doc.id, question, answer)
+        return {**turn, "cached": cached is not None}
 
+    async def stream_answer(
+        self, document_id: uuid.UUID, user_id: uuid.UUID, question: str
+    ) -> AsyncIterator[str]:
+        """Validate the question, then return an SSE event stream for the answer.
+
+        Events: ``token`` (``{"content"}``) per delta, then ``done`` (the same body
+        as the non-streaming endpoint) or ``error``. Validation errors are raised
+        here, before any bytes are sent, so they still map to HTTP error responses.
+        """
+        check_question(question)
+        doc = await self._get_answerable_document(document_id)
+
+        if settings.QA_OFFLINE or not settings.OPENAI_API_KEY:
+            return self._replay(await self._fallback_answer(doc, user_id, question))
+
+        # Any summary update is committed with the request's session
+        conversation = await self._conversation(user_id, doc.id)
+        key = vector = None
+        if not is_follow_up(question, conversation):
+            key, vector = await self._cache_key(doc, question)
+            cached = answer_cache.lookup(*key, vector)
+            if cached:
+                turn = await _save_turn(
+                    self.qa_repo, conversation.session_id, user_id, doc.id, question, cached.answer
+                )
+                return self._replay({**turn, "cached": True})
+
+        messages = await self.context.build(doc, question, conversation)
+        return self._stream_events(
+            conversation.session_id, user_id, doc.id, question, messages, key, vector
+        )
+
+    async def get_history(
+        self, document_id: uuid.UUID, user_id: uuid.UUID, cursor: str | None = None, size: int = 20
+    ) -> dict:
+        """One page of the user's latest session on the document, walking back from ``cursor``."""
+        session_id = await self.qa_repo.get_latest_session_id(user_id, document_id)
+        if session_id is None:
+            return {"session_id": None, "messages": [], "next_cursor": None}
+
+        before_id = decode_cursor(cursor, int)[0] if cursor else None
+        rows = await self.qa_repo.get_messages(session_id, before_id, limit=size + 1)
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            next_cursor = encode_cursor(rows[-1].id)
         return {
-            "answer": answer,
-            "session_id": session.id,
-            "messages": [
-                {"role": m.role, "content": m.content, "created_at": str(m.created_at)}
-                for m in session.messages
-            ],
+            "session_id": session_id,
+            "messages": [_message(m) for m in reversed(rows)],
+            "next_cursor": next_cursor,
         }
 
-    async def _call_llm(self, question: str, context: str) -> str:
-        """Call OpenAI-compatible API."""
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": settings.OPENAI_MODEL,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": (
-                                "You are a helpful document assistant. Answer questions based "
-                                "on the provided document context. If you cannot find the answer "
-                                "in the context, say so clearly."
-                            ),
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Document context:\n{context}\n\nQuestion: {question}",
-                        },
-                    ],
-                    "max_tokens": 1000,
-                    "temperature": 0.3,
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
+    @staticmethod
+    async def _replay(turn: dict) -> AsyncIterator[str]:
+        yield _sse("token", {"content": turn["answer"]})
+        yield _sse("done", turn)
 
-    async def _fallback_answer(
-        self, document_id: uuid.UUID, user_id: uuid.UUID, question: str, text: str
-    ) -> dict:
-        """Provide a simple keyword-based answer when no LLM API key is configured."""
-        session = await self.qa_repo.create_session(user_id, document_id)
-        await self.qa_repo.add_message(session.id, "user", question)
-
-        # Simple: find paragraphs that contain question keywords
-        keywords = [w.lower() for w in question.split() if len(w) > 3]
-        paragraphs = text.split("\n\n")
-        relevant = [p for p in paragraphs if any(k in p.lower() for k in keywords)]
-
-        if relevant:
-            answer = (
-                "⚠️ AI is not configured (no OPENAI_API_KEY). Here are relevant excerpts:\n\n"
-                + "\n\n".join(relevant[:3])
+    @staticmethod
+    async def _stream_events(
+        session_id: int | None,
+        user_id: uuid.UUID,
+        document_id: uuid.UUID,
+        question: str,
+        messages: list[dict],
+        cache_key: tuple | None,
+        vector: np.ndarray | None,
+    ) -> AsyncIterator[str]:
+        parts = []
+        started = time.perf_counter()
+        try:
+            async for content in llm_client.stream(messages):
+                parts.append(content)
+                yield _sse("token", {"content": content})
+        except httpx.HTTPError as e:
+            logger.error(f"LLM stream failed for document {document_id}: {e}")
+            yield _sse("error", {"detail": "The AI service did not respond"})
+            return
+
+        answer = "".join(parts)
+        if cache_key:
+            answer_cache.store(*cache_key, CachedAnswer(answer, vector, time.perf_counter() - started))
+        # The request's session is gone by the time the stream ends
+        async with async_session_factory() as db:
+            turn = await _save_turn(QARepository(db), session_id, user_id, document_id, question, answer)
+            await db.commit()
+        yield _sse("done", {**turn, "cached": False})
+
+    async def _call_llm(self, messages: list[dict]) -> str:
+        """Call the OpenAI-compatible API over the shared, keep-alive client."""
+        return await llm_client.complete(messages)
+
+    async def _fallback_answer(self, doc: Document, user_id: uuid.UUID, question: str) -> dict:
+        """Answer with BM25-ranked excerpts when no LLM is configured or QA_OFFLINE is set."""
+        excerpts = await self.retrieval.keyword_search(doc, question)
+        notice = (
+            "⚠️ Offline mode – answering from the document text only."
+            if settings.QA_OFFLINE
+            else "⚠️ AI is not configured (no OPENAI_API_KEY)."
+        )
+
+        if excerpts:
+            answer = f"{notice} Here are relevant excerpts:\n\n" + "\n\n".join(
+                f"[Page {page}] {text}" if page else text for text, page in excerpts
             )
         else:
-            answer = (
-                "⚠️ AI is not configured (no OPENAI_API_KEY). "
-                "No relevant excerpts found for your question."
-            )
-
-        await self.qa_repo.add_message(session.id, "assistant", answer)
-        session = await self.qa_repo.get_session(session.id)
+            answer = f"{notice} No relevant excerpts found for your question."
 
-        return {
-            "answer": answer,
-            "session_id": session.id,
-            "messages": [
-                {"role": m.role, "content": m.content, "created_at": str(m.created_at)}
-                for m in session.messages
-            ],
-        }
-
-    @staticmethod
-    def _chunk_text(text: str, max_chars: int = 3000) -> list[str]:
-        """Split text into chunks for LLM context windows."""
-        chunks = []
-        current = ""
-        for paragraph in text.split("\n\n"):
-            if len(current) + len(paragraph) > max_chars:
-                if current:
-                    chunks.append(current.strip())
-                current = paragraph
-            else:
-                current += "\n\n" + paragraph
-        if current.strip():
-            chunks.append(current.strip())
-        return chunks or [text[:max_chars]]
+        session_id = await self.qa_repo.get_latest_session_id(user_id, doc.id)
+        turn = await _save_turn(self.qa_repo, session_id, user_id, doc.id, question, answer)
+        return {**turn, "cached": False}
@@ -0,0 +1,159 @@
+"""Retrieval service – chunk indexing and BM25 lookup for document Q&A."""
+
+import asyncio
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.document import Document
+from app.repositories.chunk_repo import ChunkRepository
+from app.utils.bm25 import BM25Index, Chunk, chunk_text, paragraphs, snippet, term_frequencies
+from app.utils.cache import TTLCache
+from app.utils.embeddings import get_embedder, quantize
+
+# (document id, updated_at) -> (BM25Index, chunks). Any text change bumps
+# updated_at, so entries left behind in other workers are simply never hit again.
+_indexes = TTLCache("chunk_indexes", maxsize=settings.QA_INDEX_CACHE_SIZE, ttl=3600)
+# (document id, updated_at) -> (BM25Index, [(paragraph, page)]) for keyword-only answers
+_paragraph_indexes = TTLCache("paragraph_indexes", maxsize=settings.QA_INDEX_CACHE_SIZE, ttl=3600)
+
+
+def _build_chunks(
+    text: str,
+) -> tuple[list[Chunk], list[dict[str, int]], list[list[dict[str, int]]], list[tuple[bytes, float]]]:
+    """Chunks, their term frequencies (whole and per paragraph) and their int8 embeddings."""
+    chunks = chunk_text(text, max_chars=settings.QA_CHUNK_CHARS)
+    paragraph_terms = [[term_frequencies(p) for p in paragraphs(c)] for c in chunks]
+    term_freqs = [_merge(terms) for terms in paragraph_terms]
+    embeddings = []
+    if chunks:
+        codes, scales = quantize(get_embedder().embed([c.content for c in chunks]))
+        embeddings = [(code.tobytes(), float(scale)) for code, scale in zip(codes, scales)]
+    return chunks, term_freqs, paragraph_terms, embeddings
+
+
+def _merge(term_freqs: list[dict[str, int]]) -> dict[str, int]:
+    merged: dict[str, int] = {}
+    for tf in term_freqs:
+        for term, freq in tf.items():
+            merged[term] = merged.get(term, 0) + freq
+    return merged
+
+
+def _build_paragraph_index(
+    chunks: list[Chunk], paragraph_terms: list[list[dict[str, int]] | None]
+) -> tuple[BM25Index, list[tuple[str, int | None]]]:
+    units, term_freqs = [], []
+    for chunk, terms in zip(chunks, paragraph_terms):
+        texts = paragraphs(chunk)
+        # Chunks stored before paragraph terms existed are tokenized here
+        term_freqs.extend(terms or [term_frequencies(p) for p in texts])
+        units.extend((p, chunk.page) for p in texts)
+    return BM25Index(term_freqs), units
+
+
+def select_within_budget(ranked: list[Chunk], token_budget: int) -> list[Chunk]:
+    """Take chunks best-first while they fit the budget, then restore document order.
+
+    The best chunk is always kept, even when it alone exceeds the budget.
+    """
+    picked, used = [], 0
+    for chunk in ranked:
+        if used + chunk.token_count > token_budget:
+            continue
+        picked.append(chunk)
+        used += chunk.token_count
+    return sorted(picked or ranked[:1], key=lambda c: c.position)
+
+
+class RetrievalService:
+
+    def __init__(self, db: AsyncSession):
+        self.chunk_repo = ChunkRepository(db)
+
+    async def index_document(
+        self, document_id: uuid.UUID, text: str, duplicates: list[uuid.UUID] = ()
+    ) -> list[Chunk]:
+        """Chunk and embed ``text`` for the document, and copy the result to ``duplicates``."""
+        # Tokenizing and embedding a few hundred pages is CPU work – keep it off the event loop
+        chunks, term_freqs, paragraph_terms, embeddings = await asyncio.to_thread(_build_chunks, text)
+        await self.chunk_repo.replace_for_document(
+            document_id, chunks, term_freqs, embeddings, paragraph_terms
+        )
+        await self.chunk_repo.copy_to(document_id, list(duplicates))
+        return chunks
+
+    async def copy_from_duplicate(self, document_ids: list[uuid.UUID], sha256: str) -> bool:
+        """Give ``document_ids`` the chunks of an already indexed document with identical content."""
+        source_id = await self.chunk_repo.find_indexed_duplicate(sha256, document_ids)
+        if source_id is None:
+            return False
+        await self.chunk_repo.copy_to(source_id, document_ids)
+        return True
+
+    async def _load_chunks(
+        self, doc: Document
+    ) -> tuple[list[Chunk], list[dict[str, int]], list[list[dict[str, int]] | None]]:
+        rows = await self.chunk_repo.get_for_document(doc.id)
+        if rows:
+            chunks = [Chunk(r.position, r.content, r.page, r.token_count) for r in rows]
+            return chunks, [r.terms for r in rows], [r.paragraph_terms for r in rows]
+
+        # Documents indexed before chunking existed are indexed on first use
+        chunks, term_freqs, paragraph_terms, embeddings = await asyncio.to_thread(
+            _build_chunks, doc.extracted_text or ""
+        )
+        await self.chunk_repo.replace_for_document(doc.id, chunks, term_freqs, embeddings, paragraph_terms)
+        return chunks, term_freqs, paragraph_terms
+
+    async def _load_index(self, doc: Document) -> tuple[BM25Index, list[Chunk]]:
+        key = (doc.id, doc.updated_at)
+        cached = _indexes.get(key)
+        if cached is not None:
+            return cached
+
+        chunks, term_freqs, _ = await self._load_chunks(doc)
+        entry = (BM25Index(term_freqs), chunks)
+        _indexes.set(key, entry)
+        return entry
+
+    async def _load_paragraph_index(self, doc: Document) -> tuple[BM25Index, list[tuple[str, int | None]]]:
+        key = (doc.id, doc.updated_at)
+        cached = _paragraph_indexes.get(key)
+        if cached is not None:
+            return cached
+
+        chunks, _, paragraph_terms = await self._load_chunks(doc)
+        entry = await asyncio.to_thread(_build_paragraph_index, chunks, paragraph_terms)
+        _paragraph_indexes.set(key, entry)
+        return entry
+
+    async def retrieve(
+        self,
+        doc: Document,
+        question: str,
+        k: int | None = None,
+        token_budget: int | None = None,
+    ) -> list[Chunk]:
+        """The chunks most relevant to ``question`` that fit in ``token_budget``, in document order.
+
+        When nothing matches lexically, the opening chunks are returned instead.
+        """
+        k = k or settings.QA_TOP_K
+        token_budget = token_budget or settings.QA_CONTEXT_TOKENS
+        index, chunks = await self._load_index(doc)
+
+        ranked = [chunks[i] for i, _ in index.top(question, k)] or chunks[:k]
+        return select_within_budget(ranked, token_budget)
+
+    async def keyword_search(
+        self, doc: Document, question: str, k: int | None = None
+    ) -> list[tuple[str, int | None]]:
+        """Snippets of the ``k`` paragraphs that best match ``question`` as ``(snippet, page)``, best first.
+
+        Needs no LLM or embedding model – the engine behind keyword-only answers.
+        """
+        k = k or settings.QA_FALLBACK_EXCERPTS
+        index, units = await self._load_paragraph_index(doc)
+        return [(snippet(units[i][0], question), units[i][1]) for i, _ in index.top(question, k)]
@@ -0,0 +1,155 @@
+"""Search service – semantic and hybrid document search over chunk embeddings."""
+
+import asyncio
+import bisect
+import time
+import uuid
+from typing import Literal
+
+import numpy as np
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.repositories.chunk_repo import ChunkRepository
+from app.repositories.document_repo import DocumentRepository
+from app.utils.embeddings import get_embedder
+from app.utils.pagination import CountMode
+from app.utils.vector_index import QueryBatcher, VectorIndex
+
+SearchMode = Literal["lexical", "semantic", "hybrid"]
+
+SNIPPET_CHARS = 240
+# How long ids skipped below the sync mark are looked for again before they count as never committed
+GAP_RECHECK_SECONDS = 900
+
+# Per-process index, created on first use and kept current from the chunk table
+_index: VectorIndex | None = None
+_batcher: QueryBatcher | None = None
+_sync_lock = asyncio.Lock()
+# Chunk id ranges (first, last, noticed at) below the sync mark that were not visible yet. Ids come
+# from the sequence at insert time, so a transaction holding lower ids can commit after one holding
+# higher ids; each sync looks for these again. Rolled back or deleted chunks leave gaps that expire.
+_gaps: list[tuple[int, int, float]] = []
+
+
+def _vector_index() -> tuple[VectorIndex, QueryBatcher]:
+    global _index, _batcher
+    if _index is None:
+        _index = VectorIndex(get_embedder().dim, nprobe=settings.VECTOR_INDEX_NPROBE)
+        _batcher = QueryBatcher(_index)
+    return _index, _batcher
+
+
+def combine_scores(
+    semantic: dict[uuid.UUID, float], lexical: dict[uuid.UUID, float], weight: float
+) -> dict[uuid.UUID, float]:
+    """Weighted sum of the two scores, each scaled to [0, 1] by its best value."""
+    def scaled(scores: dict[uuid.UUID, float]) -> dict[uuid.UUID, float]:
+        best = max(scores.values(), default=0.0)
+        return {k: max(v, 0.0) / best for k, v in scores.items()} if best > 0 else {}
+
+    sem, lex = scaled(semantic), scaled(lexical)
+    return {d: weight * sem.get(d, 0.0) + (1 - weight) * lex.get(d, 0.0) for d in sem.keys() | lex.keys()}
+
+
+def missing_ranges(first: int, last: int, ids: list[int]) -> list[tuple[int, int]]:
+    """The inclusive sub-ranges of ``first..last`` not covered by the sorted ``ids``."""
+    ranges, start = [], first
+    for i in ids[bisect.bisect_left(ids, first):bisect.bisect_right(ids, last)]:
+        if i > start:
+            ranges.append((start, i - 1))
+        start = i + 1
+    if start <= last:
+        ranges.append((start, last))
+    return ranges
+
+
+def _snippet(content: str | None) -> str | None:
+    if not content:
+        return None
+    text = " ".join(content.split())
+    return text if len(text) <= SNIPPET_CHARS else text[:SNIPPET_CHARS].rsplit(" ", 1)[0] + "…"
+
+
+class SearchService:
+
+    def __init__(self, db: AsyncSession):
+        self.doc_repo = DocumentRepository(db)
+        self.chunk_repo = ChunkRepository(db)
+
+    async def _sync(self, index: VectorIndex) -> None:
+        """Pull chunks embedded since the last sync – by any worker process – into the index."""
+        global _gaps
+        async with _sync_lock:
+            now = time.monotonic()
+            mark = index.last_chunk_id
+            rows = await self.chunk_repo.get_embeddings_after(mark, [(lo, hi) for lo, hi, _ in _gaps])
+            seen = [row[0] for row in rows]
+            last_id = max(mark, seen[-1] if seen else 0)
+            _gaps = [
+                (lo, hi, noticed)
+                for first, last, noticed in _gaps
+                if now - noticed < GAP_RECHECK_SECONDS
+                for lo, hi in missing_ranges(first, last, seen)
+            ] + [(lo, hi, now) for lo, hi in missing_ranges(mark + 1, last_id, seen)]
+            if not rows:
+                return
+            # Vectors written by a different embedder (e.g. before a model change) are skipped
+            rows = [row for row in rows if len(row[2]) == index.dim]
+            if rows:
+                codes = np.frombuffer(b"".join(row[2] for row in rows), dtype=np.int8).reshape(-1, index.dim)
+                scales = np.array([row[3] for row in rows], dtype=np.float32)
+                # May re-cluster the index – CPU work, so off the event loop
+                await asyncio.to_thread(
+                    index.add, [row[0] for row in rows], [row[1] for row in rows], codes, scales
+                )
+            index.last_chunk_id = last_id
+
+    async def semantic_matches(self, query: str, limit: int) -> dict[uuid.UUID, tuple[float, int]]:
+        """Best ``(cosine, chunk id)`` per document for up to ``limit`` documents."""
+        index, batcher = _vector_index()
+        await self._sync(index)
+        vector = (await asyncio.to_thread(get_embedder().embed, [query]))[0]
+        # Several chunks usually hit the same document – over-fetch before grouping
+        best: dict[uuid.UUID, tuple[float, int]] = {}
+        for chunk_id, doc_id, score in await batcher.search(vector, limit * 4):
+            if score > 0 and doc_id not in best:
+                best[doc_id] = (score, chunk_id)
+                if len(best) == limit:
+                    break
+        return best
+
+    async def search(
+        self,
+        query: str,
+        mode: SearchMode,
+        page: int = 1,
+        size: int = 20,
+        count: CountMode = "exact",
+    ) -> tuple[list[tuple[Row, float, str | None]], int | None, None]:
+        """Semantic or hybrid search. Returns ((summary row, score, snippet), total, None).
+
+        Ranking is over the best ``SEARCH_CANDIDATES`` documents, paged by offset;
+        the total counts those candidates.
+        """
+        matches = await self.semantic_matches(query, settings.SEARCH_CANDIDATES)
+        semantic = {doc_id: score for doc_id, (score, _) in matches.items()}
+        if mode == "hybrid":
+            lexical = await self.doc_repo.search_ranks(query, settings.SEARCH_CANDIDATES)
+            scores = combine_scores(semantic, lexical, settings.SEARCH_SEMANTIC_WEIGHT)
+        else:
+            scores = semantic
+
+        visible = await self.doc_repo.filter_visible(list(scores))
+        ranked = sorted((d for d in scores if d in visible), key=lambda d: (-scores[d], str(d)))
+        page_ids = ranked[(page - 1) * size:page * size]
+
+        rows = await self.doc_repo.get_summaries(page_ids)
+        contents = await self.chunk_repo.get_contents([matches[d][1] for d in page_ids if d in matches])
+        items = [
+            (row, round(scores[row.id], 6), _snippet(contents.get(matches[row.id][1])) if row.id in matches else None)
+            for row in rows
+        ]
+        total = None if count == "none" else len(ranked)
+        return items, total, None
@@ -0,0 +1,83 @@
+"""Stats service – admin dashboard totals and time series from maintained counters."""
+
+from datetime import datetime, timezone, timedelta
+from typing import Literal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.repositories.ocr_job_repo import OCRJobRepository
+from app.repositories.stats_repo import StatsRepository
+from app.utils.cache import TTLCache
+
+StatsInterval = Literal["hour", "day"]
+
+# Dashboards refresh often; a few seconds of staleness saves every query
+_stats_cache = TTLCache("admin_stats", maxsize=64, ttl=settings.STATS_CACHE_TTL_SECONDS)
+
+
+class StatsService:
+
+    def __init__(self, db: AsyncSession):
+        self.repo = StatsRepository(db)
+        self.job_repo = OCRJobRepository(db)
+
+    async def get_stats(self) -> dict:
+        """Totals from the counters – no table scans."""
+        cached = _stats_cache.get("totals")
+        if cached is not None:
+            return cached
+
+        counters = await self.repo.get_counters()
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        stats = {
+            "total_users": counters.get("users", 0),
+            "total_documents": counters.get("documents", 0),
+            "total_deleted_documents": counters.get("deleted_documents", 0),
+            "uploads_today": await self.repo.uploads_since(today),
+            "bytes_stored": counters.get("bytes_stored", 0),
+            "ocr_backlog": await self.job_repo.count_backlog(),
+        }
+        _stats_cache.set("totals", stats)
+        return stats
+
+    async def get_series(self, interval: StatsInterval, days: int) -> list[dict]:
+        """Uploads, bytes and sampled OCR backlog per hour or day over the last ``days``."""
+        key = ("series", interval, days)
+        cached = _stats_cache.get(key)
+        if cached is not None:
+            return cached
+
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        points = [
+            {
+                "period": str(row.period),
+                "uploads": int(row.uploads),
+                "bytes": int(row.bytes),
+                "ocr_backlog": row.ocr_backlog,
+            }
+            for row in await self.repo.get_series(since, interval)
+        ]
+        _stats_cache.set(key, points)
+        return points
+
+    async def reconcile(self) -> dict[str, int] | None:
+        """Correct the counters and recent buckets by their drift and sample the OCR backlog.
+
+        Returns how far each counter had drifted, or None when another worker
+        holds the reconciliation lock. Drift is added to shard 0 rather than
+        the shards being rewritten, so increments racing with it are kept.
+        """
+        if not await self.repo.try_lock_reconcile():
+            return None
+
+        now = datetime.now(timezone.utc)
+        drift = await self.repo.counter_drift()
+        await self.repo.apply_counter_drift(drift)
+
+        since = now - timedelta(hours=settings.STATS_RECONCILE_HOURS)
+        await self.repo.apply_bucket_drift(await self.repo.bucket_drift(since))
+        await self.repo.set_backlog(now, await self.job_repo.count_backlog())
+
+        _stats_cache.clear()
+        return drift
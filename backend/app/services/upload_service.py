@@ -0,0 +1,206 @@
+"""Resumable upload service – sessions, chunk appends and completion into the upload store."""
+
+import asyncio
+import hashlib
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import aiofiles
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.upload_batch import UploadBatch
+from app.models.upload_session import UploadSession
+from app.repositories.upload_session_repo import UploadSessionRepository
+from app.services.document_service import ALLOWED_EXTENSIONS, DocumentService
+from app.utils.cache import TTLCache
+from app.utils.storage import (
+    FileTooLargeError,
+    StagedFile,
+    discard,
+    hash_prefix,
+    part_path,
+    stage_zip_members,
+    write_at,
+)
+from app.exceptions.http_exceptions import (
+    BadRequestException,
+    ConflictException,
+    ForbiddenException,
+    NotFoundException,
+)
+
+RESUMABLE_EXTENSIONS = ALLOWED_EXTENSIONS | {".zip"}
+
+# upload id → (offset, sha256 state over the part file up to it). A miss – another
+# worker took the previous chunk, or a restart – rehashes the part file once.
+_digests = TTLCache("upload_digests", maxsize=256, ttl=settings.UPLOAD_SESSION_TTL_HOURS * 3600)
+
+
+class UploadSessionService:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repo = UploadSessionRepository(db)
+        self.documents = DocumentService(db)
+
+    async def create(
+        self, user_id: uuid.UUID, filename: str, size: int,
+        title: str | None = None, tag_names: list[str] | None = None,
+    ) -> UploadSession:
+        ext = Path(filename).suffix.lower()
+        if ext not in RESUMABLE_EXTENSIONS:
+            raise BadRequestException(f"File type '{ext}' not allowed. Allowed: {RESUMABLE_EXTENSIONS}")
+        if size <= 0 or size > settings.resumable_max_file_size_bytes:
+            raise BadRequestException(f"File size must be 1 byte to {settings.RESUMABLE_MAX_FILE_SIZE_MB}MB")
+
+        await self._purge_expired()
+        session = await self.repo.create(UploadSession(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            filename=filename,
+            title=title or None,
+            tag_names=tag_names,
+            total_size=size,
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS),
+        ))
+        async with aiofiles.open(part_path(session.id), "wb"):
+            pass
+        return session
+
+    async def get(self, upload_id: uuid.UUID, user_id: uuid.UUID) -> UploadSession:
+        return self._check(await self.repo.get(upload_id), user_id)
+
+    async def write_chunk(
+        self, upload_id: uuid.UUID, user_id: uuid.UUID, offset: int,
+        chunks: AsyncIterable[bytes], checksum: str | None = None,
+    ) -> UploadSession:
+        """Store the chunk starting at ``offset``, which must be the current end of the upload.
+
+        The offset is leased to this request in a short transaction, so a
+        concurrent request for the same upload gets a 409 instead of
+        interleaving bytes, and no connection is held while the chunk streams
+        in; the new offset is then recorded only if the lease is still ours.
+        ``checksum`` is the chunk's sha256 hex, if the client sent one; on a
+        mismatch nothing is recorded and the chunk can be resent.
+        """
+        lease = datetime.now(timezone.utc) + timedelta(seconds=settings.UPLOAD_CHUNK_LEASE_SECONDS)
+        session = await self.repo.claim(upload_id, user_id, offset, lease)
+        if session is None:
+            session = self._check(await self.repo.get(upload_id), user_id)
+            if offset != session.received:
+                raise ConflictException(f"Expected a chunk at offset {session.received}")
+            raise ConflictException("Another request is writing to this upload")
+        await self.db.commit()
+
+        digest = await self._digest(session)
+        chunk_digest = hashlib.sha256()
+        limit = min(settings.resumable_chunk_max_bytes, session.total_size - offset)
+        try:
+            try:
+                written = await write_at(
+                    part_path(upload_id), offset, _within_lease(chunks, lease), limit, digest, chunk_digest
+                )
+            except FileTooLargeError:
+                raise BadRequestException(
+                    f"Chunk too large. At most {limit} bytes are accepted at offset {offset}"
+                )
+            except FileNotFoundError:
+                # Cancelled meanwhile
+                raise NotFoundException("Upload session not found")
+            if checksum and checksum.lower() != chunk_digest.hexdigest():
+                raise BadRequestException("Chunk checksum mismatch")
+        except Exception:
+            # Let the chunk be resent right away rather than when the lease runs out
+            await self.repo.release(upload_id, lease)
+            await self.db.commit()
+            raise
+
+        session = await self.repo.finish(upload_id, offset, lease, offset + written)
+        if session is None:
+            self._check(await self.repo.get(upload_id), user_id)
+            raise ConflictException("The chunk took too long and another request took over; resend it")
+        _digests.set(session.id, (session.received, digest))
+        return session
+
+    async def complete(
+        self, upload_id: uuid.UUID, user_id: uuid.UUID, sha256: str | None = None
+    ) -> tuple[UploadBatch, list[tuple[int, int]], list[tuple[str, str]]]:
+        """Move a fully received upload into the store. Returns what ``DocumentService.ingest`` does.
+
+        A ZIP archive is expanded into one document per member; anything else
+        becomes a single-document batch, so both report the same way.
+        """
+        session = self._check(await self._lock(upload_id), user_id)
+        if session.received != session.total_size:
+            raise ConflictException(f"Upload incomplete: {session.received} of {session.total_size} bytes")
+        if session.writing_until and session.writing_until >= datetime.now(timezone.utc):
+            raise ConflictException("Another request is writing to this upload")
+
+        path = part_path(session.id)
+        digest = (await self._digest(session)).hexdigest()
+        if sha256 and sha256.lower() != digest:
+            raise BadRequestException("File checksum mismatch")
+
+        ext = Path(session.filename).suffix.lower()
+        if ext == ".zip":
+            staged = await asyncio.to_thread(
+                _stage_archive, path, session.filename, settings.resumable_max_file_size_bytes
+            )
+        else:
+            staged = [StagedFile(session.filename, ext, path, session.total_size, digest, title=session.title)]
+
+        await self.repo.delete(session)
+        _digests.pop(session.id)
+        result = await self.documents.ingest(staged, user_id, session.tag_names)
+        if ext == ".zip":
+            await discard(path)
+        return result
+
+    async def cancel(self, upload_id: uuid.UUID, user_id: uuid.UUID) -> None:
+        session = self._check(await self._lock(upload_id), user_id)
+        await self.repo.delete(session)
+        _digests.pop(session.id)
+        await discard(part_path(session.id))
+
+    # ── Helpers ──────────────────────────────────────
+    async def _lock(self, upload_id: uuid.UUID) -> UploadSession | None:
+        session = await self.repo.lock(upload_id)
+        if session is None and await self.repo.get(upload_id) is not None:
+            raise ConflictException("Another request is writing to this upload")
+        return session
+
+    @staticmethod
+    def _check(session: UploadSession | None, user_id: uuid.UUID) -> UploadSession:
+        if not session or session.expires_at < datetime.now(timezone.utc):
+            raise NotFoundException("Upload session not found")
+        if str(session.user_id) != str(user_id):
+            raise ForbiddenException("You can only access your own uploads")
+        return session
+
+    async def _digest(self, session: UploadSession):
+        """sha256 state over the bytes received so far – cached, or rebuilt from the part file."""
+        cached = _digests.get(session.id)
+        if cached is not None and cached[0] == session.received:
+            return cached[1].copy()
+        return await asyncio.to_thread(hash_prefix, part_path(session.id), session.received)
+
+    async def _purge_expired(self) -> None:
+        for upload_id in await self.repo.delete_expired():
+            _digests.pop(upload_id)
+            await discard(part_path(upload_id))
+
+
+async def _within_lease(chunks: AsyncIterable[bytes], lease: datetime) -> AsyncIterator[bytes]:
+    """``chunks``, stopping once the lease is over – another request may be writing by then."""
+    async for data in chunks:
+        if datetime.now(timezone.utc) >= lease:
+            raise ConflictException("The chunk took too long to arrive; resend it")
+        yield data
+
+
+def _stage_archive(path: Path, name: str, max_bytes: int) -> list[StagedFile]:
+    with open(path, "rb") as archive:
+        return stage_zip_members(archive, name, ALLOWED_EXTENSIONS, settings.BULK_MAX_FILES, max_bytes)
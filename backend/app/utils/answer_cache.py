@@ -0,0 +1,88 @@
+"""Per-document answer cache with near-duplicate question matching."""
+
+import re
+import time
+from dataclasses import dataclass
+from uuid import UUID
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case words only – punctuation and spacing do not change the key."""
+    return " ".join(_WORD_RE.findall(question.lower()))
+
+
+@dataclass
+class CachedAnswer:
+    answer: str
+    vector: np.ndarray
+    latency: float  # seconds the LLM took to produce the answer
+
+
+class AnswerCache(TTLCache):
+    """TTL/LRU cache of LLM answers keyed by ``(document, content version, question)``.
+
+    A question that misses the exact key still hits when an earlier question on
+    the same document version is at least ``threshold`` cosine-similar to it.
+    Hits accumulate the LLM latency they avoided.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, threshold: float):
+        super().__init__(name, maxsize=maxsize, ttl=ttl)
+        self.threshold = threshold
+        self.near_hits = 0
+        self.latency_saved = 0.0
+
+    def lookup(self, document_id: UUID, version: str, question: str, vector: np.ndarray) -> CachedAnswer | None:
+        now = time.monotonic()
+        key = (document_id, version, question)
+        entry = self._data.get(key)
+        if entry is None or entry[0] < now:
+            # Near-duplicate scan over the live entries for this document version
+            candidates = [
+                (k, e[1]) for k, e in self._data.items() if k[:2] == key[:2] and e[0] >= now
+            ]
+            key = None
+            if candidates:
+                scores = np.stack([c.vector for _, c in candidates]) @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    key = candidates[best][0]
+                    self.near_hits += 1
+
+        if key is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        cached = self._data[key][1]
+        self.hits += 1
+        self.latency_saved += cached.latency
+        return cached
+
+    def store(self, document_id: UUID, version: str, question: str, cached: CachedAnswer) -> None:
+        self.set((document_id, version, question), cached)
+
+    def invalidate_document(self, document_id: UUID) -> None:
+        for key in [k for k in self._data if k[0] == document_id]:
+            self.pop(key)
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "near_hits": self.near_hits,
+            "latency_saved_seconds": round(self.latency_saved, 3),
+        }
+
+
+answer_cache = AnswerCache(
+    "qa_answers",
+    maxsize=settings.QA_CACHE_SIZE,
+    ttl=settings.QA_CACHE_TTL_SECONDS,
+    threshold=settings.QA_CACHE_SIMILARITY,
+)
@@ -0,0 +1,188 @@
+"""Offline lexical retrieval – text chunking and a small Okapi BM25 index."""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.utils.tokens import count_tokens
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+_PAGE_RE = re.compile(r"\[Page (\d+)\]")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can could did do does for from had has have how i if in into
+is it its me my no not of on or our so that the their them then there these they this to was we
+were what when where which who whom why will with would you your
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased word tokens with stopwords and single characters removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+@dataclass
+class Chunk:
+    position: int
+    content: str
+    page: int | None = None
+    token_count: int = 0
+
+    def __post_init__(self):
+        self.token_count = self.token_count or count_tokens(self.content)
+
+
+def chunk_text(text: str, max_chars: int = 1500) -> list[Chunk]:
+    """Split text into paragraph-aligned chunks of at most ``max_chars``.
+
+    ``[Page N]`` markers written by the OCR step start a new chunk and set its
+    page number; paragraphs longer than ``max_chars`` are split at whitespace.
+    """
+    chunks: list[Chunk] = []
+    current: list[str] = []
+    size = 0
+    page = None
+
+    def flush() -> None:
+        nonlocal current, size
+        body = "\n\n".join(current).strip()
+        if body:
+            chunks.append(Chunk(len(chunks), body, page))
+        current, size = [], 0
+
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        first_line, _, rest = paragraph.partition("\n")
+        marker = _PAGE_RE.fullmatch(first_line.strip())
+        if marker:
+            flush()
+            page = int(marker.group(1))
+            paragraph = rest.strip()
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind(" ", 0, max_chars)
+            cut = cut if cut > max_chars // 2 else max_chars
+            flush()
+            current, size = [paragraph[:cut]], cut
+            flush()
+            paragraph = paragraph[cut:].strip()
+        if not paragraph:
+            continue
+        if size + len(paragraph) > max_chars:
+            flush()
+        current.append(paragraph)
+        size += len(paragraph) + 2
+    flush()
+    return chunks
+
+
+def paragraphs(chunk: Chunk) -> list[str]:
+    """The paragraphs ``chunk_text`` joined into the chunk (over-long ones arrive already split)."""
+    return chunk.content.split("\n\n")
+
+
+def term_frequencies(text: str) -> dict[str, int]:
+    return dict(Counter(tokenize(text)))
+
+
+def snippet(text: str, query: str, max_chars: int = 300) -> str:
+    """The run of sentences around the one sharing most terms with ``query``, within ``max_chars``."""
+    terms = set(tokenize(query))
+    sentences = _SENTENCE_RE.split(" ".join(text.split()))
+    hits = [len(terms.intersection(tokenize(s))) for s in sentences]
+    start = end = max(range(len(sentences)), key=lambda i: (hits[i], -i))
+    size = len(sentences[start])
+    grown = True
+    while grown:
+        grown = False
+        if end + 1 < len(sentences) and size + 1 + len(sentences[end + 1]) <= max_chars:
+            end += 1
+            size += 1 + len(sentences[end])
+            grown = True
+        if start > 0 and size + 1 + len(sentences[start - 1]) <= max_chars:
+            start -= 1
+            size += 1 + len(sentences[start])
+            grown = True
+
+    body = " ".join(sentences[start:end + 1])
+    truncated = len(body) > max_chars
+    if truncated:
+        body = body[:max_chars].rsplit(" ", 1)[0]
+    return ("…" if start > 0 else "") + body + ("…" if truncated or end + 1 < len(sentences) else "")
+
+
+class BM25Index:
+    """Okapi BM25 over pre-computed per-unit (chunk or paragraph) term frequencies.
+
+    Built from stored term frequencies, so no re-tokenization is needed to
+    answer a query. The length-normalized part of each posting's score does not
+    depend on the query and is computed once here; a lookup is then one
+    vectorized add per query term.
+    """
+
+    def __init__(self, term_freqs: list[dict[str, int]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(term_freqs)
+        lengths = np.array([sum(tf.values()) for tf in term_freqs], dtype=np.float32)
+        avg_length = float(lengths.mean()) if self.size else 0.0
+        norms = k1 * (1 - b + b * lengths / (avg_length or 1))
+
+        vocabulary: dict[str, int] = {}
+        term_ids, units, freqs = [], [], []
+        for i, tf in enumerate(term_freqs):
+            for term, freq in tf.items():
+                term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                units.append(i)
+                freqs.append(freq)
+        term_ids = np.array(term_ids, dtype=np.int32)
+        units = np.array(units, dtype=np.int32)
+        freqs = np.array(freqs, dtype=np.float32)
+        weights = freqs * (k1 + 1) / (freqs + norms[units])
+
+        # All postings in two flat arrays grouped by term; term -> (start, end) slice
+        order = np.argsort(term_ids, kind="stable")
+        self._units = units[order]
+        self._weights = weights[order]
+        bounds = np.searchsorted(term_ids[order], np.arange(len(vocabulary) + 1)).tolist()
+        self.postings: dict[str, tuple[int, int]] = {
+            term: (bounds[t], bounds[t + 1]) for term, t in vocabulary.items()
+        }
+
+    def idf(self, term: str) -> float:
+        start, end = self.postings.get(term, (0, 0))
+        df = end - start
+        return math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+
+    def _score_vector(self, query: str) -> np.ndarray | None:
+        scores = None
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            if scores is None:
+                scores = np.zeros(self.size, dtype=np.float32)
+            start, end = self.postings[term]
+            scores[self._units[start:end]] += self.idf(term) * self._weights[start:end]
+        return scores
+
+    def scores(self, query: str) -> dict[int, float]:
+        """BM25 score of every unit that shares at least one term with ``query``."""
+        scores = self._score_vector(query)
+        if scores is None:
+            return {}
+        matched = np.flatnonzero(scores)
+        return dict(zip(matched.tolist(), scores[matched].tolist()))
+
+    def top(self, query: str, k: int) -> list[tuple[int, float]]:
+        """The ``k`` best ``(unit index, score)`` pairs, highest score first."""
+        scores = self._score_vector(query)
+        if scores is None or k <= 0:
+            return []
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        ranked = sorted(matched.tolist(), key=lambda i: (-scores[i], i))
+        return [(i, float(scores[i])) for i in ranked]
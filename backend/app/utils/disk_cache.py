@@ -0,0 +1,91 @@
+"""Size-bounded LRU cache of files on disk, with hit/miss metrics."""
+
+import os
+from pathlib import Path
+
+
+class DiskLRUCache:
+    """Files under ``root`` with recency tracked by mtime, evicted oldest-first past ``max_bytes``.
+
+    Recency lives in the file system rather than in memory, so it survives
+    restarts and is shared by every worker process using the same directory.
+    Each process tracks the bytes it has added since its last scan; once that
+    estimate exceeds the budget, a full scan evicts down to ``low_water`` of
+    it, so scans stay rare. Keys are relative paths chosen by the caller.
+    Blocking – call from a thread.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, low_water: float = 0.9):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._total: int | None = None
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    def get(self, key: str) -> Path | None:
+        """The cached file for ``key``, marked as recently used – or None."""
+        path = self.root / key
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def added(self, size: int) -> None:
+        """Account for a file the caller has just written under ``root``; evicts if over budget."""
+        if self._total is None:
+            self._total = self._scan_total()
+        self._total += size
+        if self._total > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        files = [(stat.st_mtime, stat.st_size, path) for path, stat in self._walk(self.root)]
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * self.low_water
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass  # another process evicted it first
+            total -= size
+            self.evictions += 1
+        self._total = total
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "bytes": self._total,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _scan_total(self) -> int:
+        return sum(stat.st_size for _, stat in self._walk(self.root))
+
+    def _walk(self, directory: Path):
+        """``(path, stat)`` of every finished file, tolerating files removed mid-scan."""
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._walk(Path(entry.path))
+                elif not entry.name.endswith(".tmp"):
+                    yield entry.path, entry.stat()
+            except FileNotFoundError:
+                continue
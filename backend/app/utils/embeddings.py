@@ -0,0 +1,94 @@
+"""Text embeddings for semantic search – a local model when configured, feature hashing otherwise."""
+
+import hashlib
+import logging
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.bm25 import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place so a dot product is the cosine similarity."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors /= norms
+    return vectors
+
+
+def _hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+
+
+class HashingEmbedder:
+    """Signed feature hashing of words, word prefixes and word bigrams.
+
+    Needs no model download or training and is stable across processes (blake2b,
+    not ``hash()``; crc32 is linear, so near-identical strings collide with
+    opposite signs). Prefix features let inflections ("invoice"/"invoices") meet.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    @staticmethod
+    def _features(text: str) -> list[str]:
+        tokens = tokenize(text)
+        prefixes = [f"{t[:5]}~" for t in tokens if len(t) > 5]
+        bigrams = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return tokens + prefixes + bigrams
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = Counter(self._features(text))
+            if not counts:
+                continue
+            hashes = np.fromiter((_hash(f) for f in counts), np.uint64, len(counts))
+            weights = 1.0 + np.log(np.fromiter(counts.values(), np.float32, len(counts)))
+            signs = np.where(hashes >> np.uint64(63), -1.0, 1.0).astype(np.float32)
+            np.add.at(vectors[row], (hashes % np.uint64(self.dim)).astype(np.intp), signs * weights)
+        return normalize(vectors)
+
+
+class ModelEmbedder:
+    """A local sentence-transformers model run on the CPU."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = model_name
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = self.model.encode(
+            texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=True
+        )
+        return vectors.astype(np.float32)
+
+
+@lru_cache(maxsize=1)
+def get_embedder() -> HashingEmbedder | ModelEmbedder:
+    if settings.EMBEDDING_MODEL:
+        try:
+            return ModelEmbedder(settings.EMBEDDING_MODEL)
+        except ImportError:
+            logger.warning("sentence-transformers not installed – using the hashing embedder")
+        except Exception as e:
+            logger.warning(f"Could not load embedding model {settings.EMBEDDING_MODEL}: {e}")
+    return HashingEmbedder(settings.EMBEDDING_DIM)
+
+
+def quantize(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantization. Returns ``(codes, scales)``."""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.round(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
@@ -0,0 +1,239 @@
+"""File serving – conditional, range-aware responses and signed download URLs.
+
+Signed URLs use nginx's ``secure_link`` format, so a reverse proxy can check
+them and send the bytes itself without calling the app::
+
+    location /api/files/ {
+        secure_link $arg_md5,$arg_expires;
+        secure_link_md5 "$secure_link_expires$uri <FILE_URL_SECRET>";
+        if ($secure_link = "") { return 403; }
+        if ($secure_link = "0") { return 410; }
+        alias /app/uploads/;
+    }
+
+    location /internal-files/ {
+        internal;
+        alias /app/uploads/;
+    }
+
+With ``FILE_ACCEL_REDIRECT_PREFIX=/internal-files/`` the authenticated
+download endpoint only checks access and answers with ``X-Accel-Redirect``;
+nginx then serves ranges with ``sendfile``. Without a proxy the app serves
+both routes itself.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import re
+import time
+from email.utils import formatdate
+from pathlib import Path
+from urllib.parse import quote
+
+import aiofiles
+import aiofiles.os
+from fastapi import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.exceptions.http_exceptions import RangeNotSatisfiableException
+
+FILES_PATH = "/api/files/"
+PREVIEWS_PATH = "/api/previews/"
+URL_EXPIRY_STEP_SECONDS = 300
+
+_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+def _upload_relative(path: Path) -> str | None:
+    """``path`` relative to ``UPLOAD_DIR`` as a URL path, or None if it is outside it."""
+    try:
+        return path.resolve().relative_to(settings.upload_path.resolve()).as_posix()
+    except ValueError:
+        return None
+
+
+# ── Signed URLs ──────────────────────────────────────
+def check_signing_secret() -> None:
+    """Refuse to start without a dedicated ``FILE_URL_SECRET``; called from the app lifespan."""
+    if not settings.FILE_URL_SECRET:
+        raise RuntimeError("FILE_URL_SECRET is not set – it signs file and preview URLs")
+    if settings.FILE_URL_SECRET == settings.JWT_SECRET_KEY:
+        raise RuntimeError("FILE_URL_SECRET must differ from JWT_SECRET_KEY – nginx has to know it")
+
+
+def sign_path(path: str, expires: int) -> str:
+    """nginx ``secure_link_md5 "$secure_link_expires$uri <secret>"`` – base64url MD5 without padding."""
+    digest = hashlib.md5(f"{expires}{path} {settings.FILE_URL_SECRET}".encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def signed_url(file_path: str) -> str | None:
+    """Short-lived URL for a stored file, or None if it lives outside ``UPLOAD_DIR``."""
+    relative = _upload_relative(Path(file_path))
+    if relative is None:
+        return None
+    return _signed(FILES_PATH + relative, settings.FILE_URL_TTL_SECONDS)
+
+
+def signed_preview_url(sha256: str | None, page: int, size: str) -> str | None:
+    """URL of a page preview, valid for ``PREVIEW_URL_TTL_SECONDS``; None for unhashed legacy files."""
+    if sha256 is None:
+        return None
+    return _signed(f"{PREVIEWS_PATH}{sha256}/{page}/{size}", settings.PREVIEW_URL_TTL_SECONDS)
+
+
+def _signed(path: str, ttl: int) -> str:
+    """Valid for ``ttl`` plus at most ``URL_EXPIRY_STEP_SECONDS``: the expiry is rounded
+    up to that step, so repeated calls return the same URL for a while and browsers
+    can cache what it points to."""
+    step = min(ttl, URL_EXPIRY_STEP_SECONDS)
+    expires = -(-(int(time.time()) + ttl) // step) * step
+    return f"{path}?md5={sign_path(path, expires)}&expires={expires}"
+
+
+def verify_signature(path: str, md5: str, expires: int) -> bool:
+    return expires >= time.time() and hmac.compare_digest(sign_path(path, expires), md5)
+
+
+# ── Validators and ranges ────────────────────────────
+def etag_for(path: Path, stat: os.stat_result, tag: str | None = None) -> str:
+    """Strong ETag from a content identifier – ``tag``, or the digest a blob is named
+    after – and a weak size/mtime one otherwise."""
+    tag = tag or (path.stem if _SHA256.fullmatch(path.stem) else None)
+    if tag:
+        return f'"{tag}"'
+    return f'W/"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+
+
+def etag_matches(header: str, etag: str, weak: bool = True) -> bool:
+    """``If-None-Match`` (weak comparison) or ``If-Range`` (strong comparison) against ``etag``."""
+    if header.strip() == "*":
+        return weak
+    if not weak and etag.startswith("W/"):
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    if weak:
+        return etag.removeprefix("W/") in [tag.removeprefix("W/") for tag in candidates]
+    return etag in candidates
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """First and last byte of a single ``bytes=`` range, or None to send the whole file.
+
+    Multi-range and malformed headers are ignored, as RFC 9110 allows. A
+    well-formed range that starts past the end is a 416.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0 or size == 0:
+                raise RangeNotSatisfiableException(size)
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else None
+    except ValueError:
+        return None
+    if end is not None and start > end:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableException(size)
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+# ── Responses ────────────────────────────────────────
+class FileRangeResponse(Response):
+    """Streams a file, or one byte range of it.
+
+    Uses the server's ASGI zero-copy extension (``sendfile``) when it
+    advertises one; otherwise reads ``FILE_READ_CHUNK_KB`` at a time off the
+    event loop.
+    """
+
+    def __init__(
+        self, path: Path, size: int, byte_range: tuple[int, int] | None,
+        headers: dict[str, str], media_type: str | None, send_body: bool = True,
+    ):
+        super().__init__(headers=headers, media_type=media_type)
+        self.path = path
+        self.start, self.end = byte_range or (0, size - 1)
+        self.send_body = send_body
+        if byte_range:
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {self.start}-{self.end}/{size}"
+        self.headers["content-length"] = str(self.end - self.start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        count = self.end - self.start + 1
+        if not self.send_body or count <= 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if "http.response.zerocopy" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({"type": "http.response.zerocopy", "file": file, "offset": self.start, "count": count})
+            return
+
+        chunk_size = settings.FILE_READ_CHUNK_KB * 1024
+        async with aiofiles.open(self.path, "rb") as file:
+            await file.seek(self.start)
+            while count > 0 and (data := await file.read(min(chunk_size, count))):
+                count -= len(data)
+                await send({"type": "http.response.body", "body": data, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+
+async def serve_file(
+    request: Request,
+    path: Path,
+    media_type: str | None,
+    cache_control: str,
+    tag: str | None = None,
+    filename: str | None = None,
+    accel: bool = False,
+) -> Response:
+    """Answer a GET or HEAD for ``path`` with validators, ``If-None-Match`` and ``Range`` handling.
+
+    ``tag`` identifies the content for a strong ETag, e.g. its sha256.
+    ``accel`` hands the transfer to the proxy via ``X-Accel-Redirect`` when
+    ``FILE_ACCEL_REDIRECT_PREFIX`` is configured.
+    """
+    stat = await aiofiles.os.stat(path)
+    etag = etag_for(path, stat, tag)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+    if filename:
+        headers["Content-Disposition"] = f"inline; filename*=UTF-8''{quote(filename)}"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    if accel and settings.FILE_ACCEL_REDIRECT_PREFIX and (relative := _upload_relative(path)):
+        headers["X-Accel-Redirect"] = settings.FILE_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + relative
+        return Response(headers=headers, media_type=media_type)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if range_header and request.method == "GET":
+        if_range = request.headers.get("if-range")
+        if if_range is None or etag_matches(if_range, etag, weak=False):
+            byte_range = parse_range(range_header, stat.st_size)
+
+    return FileRangeResponse(
+        path, stat.st_size, byte_range, headers, media_type, send_body=request.method != "HEAD"
+    )
@@ -1,17 +1,35 @@
 """OCR text extraction utility."""
 
-import os
+import faulthandler
+import io
 import logging
+import signal
+import threading
+import time
 from pathlib import Path
 
-from app.core.database import async_session_factory
-from app.repositories.document_repo import DocumentRepository
+import numpy as np
+from PIL import Image, ImageFilter, ImageOps
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-def extract_text_from_file(file_path: str) -> str:
-    """Extract text from PDF or image file. Runs synchronously (called from background task)."""
+class OCRError(Exception):
+    """Picklable wrapper for extraction failures raised inside worker processes."""
+
+
+# Epoch deadline of the step running in this worker process, if any
+_deadline: float | None = None
+
+
+def extract_text_from_file(file_path: str, raise_errors: bool = False) -> str:
+    """Extract text from PDF or image file. Runs synchronously (called from an OCR worker).
+
+    With ``raise_errors`` failures are raised as ``OCRError`` so the caller can retry
+    the job; otherwise they are returned as an ``[OCR extraction failed: ...]`` marker.
+    """
     path = Path(file_path)
     ext = path.suffix.lower()
 
@@ -23,68 +41,270 @@ def extract_text_from_file(file_path: str) -> str:
         else:
             return ""
     except Exception as e:
+        if raise_errors:
+            if isinstance(e, OCRError):
+                raise
+            raise OCRError(f"{e.__class__.__name__}: {e}") from None
         logger.error(f"OCR extraction failed for {file_path}: {e}")
         return f"[OCR extraction failed: {str(e)}]"
 
 
+def run_in_worker(func, *args, deadline: float | None = None, exit_after: float | None = None):
+    """Run an extraction step in a worker process, re-raising failures as ``OCRError``.
+
+    Library exceptions don't always survive pickling back from a process pool.
+    A ``deadline`` (epoch seconds) interrupts the step once it passes – the
+    Tesseract subprocess is killed and Python code is stopped by an alarm – so
+    work abandoned by a timed-out job does not keep holding the process. A step
+    still running ``exit_after`` seconds past the deadline is stuck where the
+    alarm can't reach (native code); the process then exits, which the pool
+    reports as ``BrokenProcessPool``.
+    """
+    global _deadline
+    alarm = (
+        deadline is not None
+        and hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+    try:
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise OCRError("Timed out before the step started")
+            _deadline = deadline
+            if alarm:
+                signal.signal(signal.SIGALRM, _on_deadline)
+                signal.setitimer(signal.ITIMER_REAL, remaining)
+            if exit_after is not None:
+                # Runs on its own C thread, so it fires even while this one never returns to Python
+                faulthandler.dump_traceback_later(remaining + exit_after, exit=True)
+        return func(*args)
+    except OCRError:
+        raise
+    except Exception as e:
+        raise OCRError(f"{e.__class__.__name__}: {e}") from None
+    finally:
+        _deadline = None
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        if exit_after is not None:
+            faulthandler.cancel_dump_traceback_later()
+
+
+def _on_deadline(signum, frame):
+    raise OCRError("Timed out")
+
+
+def _tesseract_timeout() -> float:
+    """Seconds Tesseract may run before the step's deadline; 0 means no limit."""
+    if _deadline is None:
+        return 0
+    return max(_deadline - time.time(), 0.001)
+
+
 def _extract_from_pdf(file_path: str) -> str:
-    """Extract text from PDF using PyPDF2."""
+    """Extract text from PDF, OCR-ing only the pages that have no text layer."""
+    pages = pdf_page_texts(file_path)
+    for index, text in enumerate(pages):
+        if not text.strip():
+            pages[index] = ocr_pdf_page(file_path, index)
+    return join_pages(pages)
+
+
+def pdf_page_texts(file_path: str) -> list[str]:
+    """Return the text layer of every page; empty strings mark pages that need OCR."""
     from PyPDF2 import PdfReader
 
     reader = PdfReader(file_path)
-    text_parts = []
-    for page in reader.pages:
-        page_text = page.extract_text()
-        if page_text:
-            text_parts.append(page_text)
+    return [page.extract_text() or "" for page in reader.pages]
 
-    text = "\n\n".join(text_parts)
 
-    # If PyPDF2 found no text (scanned PDF), try OCR
-    if not text.strip():
+def ocr_pdf_page(file_path: str, page_index: int) -> str:
+    """Rasterize a single PDF page and OCR it. Safe to run in a worker process."""
+    try:
+        import pytesseract
+    except ImportError:
+        logger.warning("pytesseract not installed – skipping OCR")
+        return ""
+
+    images = _render_pdf_page(file_path, page_index)
+    return "\n".join(
+        _ocr_image(pytesseract, image, dpi=settings.OCR_PDF_DPI, source=f"{file_path} p{page_index + 1}")
+        for image in images
+    ).strip()
+
+
+def _render_pdf_page(file_path: str, page_index: int) -> list:
+    """Render a page with pdfium, or fall back to the page's embedded scan images."""
+    try:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(file_path)
         try:
-            return _extract_from_image(file_path)
-        except Exception:
-            return text
+            bitmap = pdf[page_index].render(scale=settings.OCR_PDF_DPI / 72)
+            return [bitmap.to_pil()]
+        finally:
+            pdf.close()
+    except ImportError:
+        from PyPDF2 import PdfReader
+
+        page = PdfReader(file_path).pages[page_index]
+        return [Image.open(io.BytesIO(image.data)) for image in page.images]
 
-    return text
+
+def join_pages(pages: list[str]) -> str:
+    """Reassemble per-page text in page order, tagging each page with its number."""
+    return "\n\n".join(
+        f"[Page {number}]\n{text.strip()}"
+        for number, text in enumerate(pages, start=1)
+        if text.strip()
+    )
 
 
 def _extract_from_image(file_path: str) -> str:
     """Extract text from image using pytesseract."""
     try:
         import pytesseract
-        from PIL import Image
 
-        image = Image.open(file_path)
-        text = pytesseract.image_to_string(image)
-        return text.strip()
+        return _ocr_image(pytesseract, Image.open(file_path), source=file_path)
     except ImportError:
         logger.warning("pytesseract not installed – skipping OCR")
         return "[OCR not available – pytesseract not installed]"
-    except Exception as e:
-        logger.error(f"pytesseract failed: {e}")
-        return f"[OCR failed: {str(e)}]"
 
 
-async def process_ocr_background(doc_id: str, file_path: str) -> None:
-    """Background task: extract text and update the document record."""
-    import uuid
-    import asyncio
+def _ocr_image(pytesseract, image: Image.Image, dpi: float | None = None, source: str = "") -> str:
+    image, dpi, timings = preprocess_image(image, dpi)
+    if timings:
+        logger.debug(f"OCR preprocessing {source}: " + ", ".join(f"{k} {v:.0f}ms" for k, v in timings.items()))
+    # Telling Tesseract the resolution spares it a guess that is often wrong for photos
+    config = f"--dpi {round(dpi)}" if dpi else ""
+    return pytesseract.image_to_string(image, config=config, timeout=_tesseract_timeout()).strip()
 
-    logger.info(f"Starting OCR for document {doc_id}")
 
-    # Run CPU-bound OCR in thread pool
-    loop = asyncio.get_event_loop()
-    text = await loop.run_in_executor(None, extract_text_from_file, file_path)
+# ── Preprocessing ────────────────────────────────────
+def preprocess_image(
+    image: Image.Image, dpi: float | None = None, stages: list[str] | None = None
+) -> tuple[Image.Image, float | None, dict[str, float]]:
+    """Run the ``OCR_PREPROCESS`` stages (or ``stages``) over ``image``.
 
-    # Update database
-    async with async_session_factory() as session:
-        try:
-            repo = DocumentRepository(session)
-            await repo.update_extracted_text(uuid.UUID(doc_id), text)
-            await session.commit()
-            logger.info(f"OCR complete for document {doc_id}: {len(text)} chars extracted")
-        except Exception as e:
-            logger.error(f"Failed to save OCR result for {doc_id}: {e}")
-            await session.rollback()
+    ``dpi`` is the known resolution, e.g. of a rendered PDF page; when None
+    it is estimated from the image. Returns (image, dpi, milliseconds per stage).
+    """
+    stages = settings.ocr_preprocess_stages if stages is None else stages
+    timings: dict[str, float] = {}
+    for name in stages:
+        stage = PREPROCESS_STAGES.get(name)
+        if stage is None:
+            raise ValueError(f"Unknown OCR preprocessing stage '{name}'. Known: {', '.join(PREPROCESS_STAGES)}")
+        started = time.perf_counter()
+        image, dpi = stage(image, dpi)
+        timings[name] = (time.perf_counter() - started) * 1000
+    return image, dpi, timings
+
+
+def _exif(image: Image.Image, dpi: float | None):
+    """Apply the EXIF orientation – phones store portrait pages as rotated landscape pixels."""
+    return ImageOps.exif_transpose(image), dpi
+
+
+def _grayscale(image: Image.Image, dpi: float | None):
+    return (image if image.mode == "L" else image.convert("L")), dpi
+
+
+def _downscale(image: Image.Image, dpi: float | None):
+    """Shrink to ``OCR_TARGET_DPI``; never enlarges.
+
+    Camera DPI metadata is usually a placeholder (72), so without a known
+    resolution the page is assumed to fill the frame along its long edge.
+    """
+    if dpi is None:
+        dpi = max(image.size) / settings.OCR_PAGE_INCHES
+    target = settings.OCR_TARGET_DPI
+    if dpi <= target:
+        return image, dpi
+    scale = target / dpi
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    # reducing_gap box-reduces first, so a large shrink costs little more than a small one
+    return image.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0), target
+
+
+def _deskew(image: Image.Image, dpi: float | None):
+    """Rotate text lines level, within ``OCR_DESKEW_MAX_ANGLE`` degrees."""
+    gray = image if image.mode == "L" else image.convert("L")
+    angle = estimate_skew(gray, settings.OCR_DESKEW_MAX_ANGLE)
+    if abs(angle) < 0.1:
+        return image, dpi
+    return gray.rotate(angle, resample=Image.Resampling.BILINEAR, expand=True, fillcolor=255), dpi
+
+
+def _binarize(image: Image.Image, dpi: float | None):
+    """Black text on white: flatten uneven lighting, then threshold with Otsu's method."""
+    gray = image if image.mode == "L" else image.convert("L")
+    # Ink strokes are thin, so a wide blur of a reduced copy is the page background:
+    # dividing by it evens out shadows and vignetting before the global threshold
+    factor = max(1, max(gray.size) // 512)
+    background = (
+        gray.reduce(factor)
+        .filter(ImageFilter.BoxBlur(16))
+        .resize(gray.size, Image.Resampling.BILINEAR)
+    )
+    pixels = np.asarray(gray).astype(np.uint16)
+    flat = np.minimum(pixels * 255 // np.maximum(np.asarray(background), 1), 255).astype(np.uint8)
+    flat = Image.fromarray(flat)
+    threshold = otsu_threshold(flat.histogram())
+    return flat.point([0] * (threshold + 1) + [255] * (255 - threshold)), dpi
+
+
+PREPROCESS_STAGES = {
+    "exif": _exif,
+    "grayscale": _grayscale,
+    "downscale": _downscale,
+    "deskew": _deskew,
+    "binarize": _binarize,
+}
+
+
+def otsu_threshold(histogram: list[int]) -> int:
+    """Grey level that best separates a 256-bin histogram into two classes.
+
+    A histogram with fewer than two grey levels – a blank page – has nothing
+    to separate, so it gets -1: no pixel is dark enough to count as ink.
+    """
+    hist = np.asarray(histogram, dtype=np.float64)
+    if np.count_nonzero(hist) < 2:
+        return -1
+    weight = np.cumsum(hist)
+    mass = np.cumsum(hist * np.arange(256))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mass[-1] * weight - mass * weight[-1]) ** 2 / (weight * (weight[-1] - weight))
+    return int(np.nanargmax(between))
+
+
+def estimate_skew(gray: Image.Image, max_angle: float) -> float:
+    """Counter-clockwise rotation, in degrees, that levels the text lines of ``gray``.
+
+    Projection profiles: rotated by the right angle, ink pixels pile up into
+    few rows, so the sum of squared row counts peaks. Every candidate angle is
+    scored at once on a reduced copy – a coarse pass, then a fine one.
+    """
+    small = gray.reduce(max(1, max(gray.size) // 1000))
+    ys, xs = np.nonzero(np.asarray(small) <= otsu_threshold(small.histogram()))
+    if len(ys) < 100:
+        return 0.0
+    step = max(1, len(ys) // 50_000)
+    ys, xs = ys[::step].astype(np.float64), xs[::step].astype(np.float64)
+
+    def best(angles: np.ndarray) -> float:
+        radians = np.deg2rad(angles)[:, None]
+        # Row of every ink pixel when the page is rotated by each angle: (angles × pixels)
+        rows = np.rint(ys * np.cos(radians) + xs * np.sin(radians)).astype(np.int64)
+        rows -= rows.min()
+        height = int(rows.max()) + 1
+        counts = np.bincount((rows + np.arange(len(angles))[:, None] * height).ravel(),
+                             minlength=len(angles) * height)
+        scores = (counts.reshape(len(angles), height).astype(np.float64) ** 2).sum(axis=1)
+        return float(angles[np.argmax(scores)])
+
+    # The profile is sharpest at the page's current skew; undoing it means rotating back
+    coarse = best(np.arange(-max_angle, max_angle + 0.25, 0.5))
+    return -best(np.arange(coarse - 0.5, coarse + 0.55, 0.1))
@@ -0,0 +1,42 @@
+"""Pagination helpers – opaque keyset cursors and page counts."""
+
+import base64
+import json
+import math
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+from app.exceptions.http_exceptions import BadRequestException
+
+# How the total is computed: exact (cached briefly), planner estimate, or skipped
+CountMode = Literal["exact", "estimate", "none"]
+
+
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last row on a page as a URL-safe token."""
+    payload = [v.isoformat() if isinstance(v, datetime) else str(v) if isinstance(v, UUID) else v
+               for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, *types: type) -> tuple:
+    """Decode a cursor produced by ``encode_cursor``, converting each value to ``types``."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if len(values) != len(types):
+            raise ValueError("cursor has the wrong shape")
+        return tuple(
+            datetime.fromisoformat(v) if t is datetime else t(v)
+            for v, t in zip(values, types)
+        )
+    except (ValueError, TypeError):
+        raise BadRequestException("Invalid pagination cursor")
+
+
+def page_count(total: int | None, size: int) -> int | None:
+    if total is None:
+        return None
+    return math.ceil(total / size) if total > 0 else 0
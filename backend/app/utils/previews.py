@@ -0,0 +1,87 @@
+"""Preview rendering – page thumbnails and previews. Synchronous; runs in preview worker processes."""
+
+import io
+import os
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+# Bounding box (longest edge, px) of each preview size
+PREVIEW_SIZES = {"thumb": 200, "small": 480, "large": 1200}
+
+# Rendered right after upload; everything else is rendered when first requested
+PREWARM_SIZES = ("thumb", "small")
+
+PREVIEW_MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+class PreviewError(Exception):
+    """Picklable failure raised from a preview worker process."""
+
+
+class PageOutOfRange(PreviewError):
+    """The requested page does not exist in the document."""
+
+
+def render_preview(source: str, dest: str, page: int, box: int, fmt: str, quality: int) -> int:
+    """Render page ``page`` (1-based) of ``source`` to fit a ``box``×``box`` square. Returns the file size.
+
+    PDF pages are rasterized at the scale the preview needs instead of at OCR
+    resolution. The image is written to a temporary sibling and renamed into
+    place, so readers never see a partial file.
+    """
+    try:
+        if source.lower().endswith(".pdf"):
+            image = _render_pdf(source, page, box)
+        else:
+            if page != 1:
+                raise PageOutOfRange(page)
+            image = _load_image(source, box)
+        image.thumbnail((box, box), Image.Resampling.LANCZOS)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        tmp = f"{dest}.{os.getpid()}.tmp"
+        Path(dest).parent.mkdir(parents=True, exist_ok=True)
+        options = {"method": 4} if fmt == "webp" else {"optimize": True}
+        image.save(tmp, format=fmt.upper(), quality=quality, **options)
+        os.replace(tmp, dest)
+        return os.path.getsize(dest)
+    except PreviewError:
+        raise
+    except Exception as e:
+        raise PreviewError(f"{e.__class__.__name__}: {e}") from None
+
+
+def _render_pdf(source: str, page: int, box: int) -> Image.Image:
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return _embedded_pdf_image(source, page)
+
+    pdf = pdfium.PdfDocument(source)
+    try:
+        if not 1 <= page <= len(pdf):
+            raise PageOutOfRange(page)
+        pdf_page = pdf[page - 1]
+        width, height = pdf_page.get_size()
+        return pdf_page.render(scale=box / max(width, height, 1)).to_pil()
+    finally:
+        pdf.close()
+
+
+def _embedded_pdf_image(source: str, page: int) -> Image.Image:
+    """Without pdfium, preview a scanned page by its first embedded image."""
+    from PyPDF2 import PdfReader
+
+    pages = PdfReader(source).pages
+    if not 1 <= page <= len(pages) or not pages[page - 1].images:
+        raise PageOutOfRange(page)
+    return Image.open(io.BytesIO(pages[page - 1].images[0].data))
+
+
+def _load_image(source: str, box: int) -> Image.Image:
+    image = Image.open(source)
+    # JPEG can decode straight to a reduced scale – far cheaper than a full decode for thumbnails
+    image.draft("RGB", (box, box))
+    return ImageOps.exif_transpose(image)
@@ -0,0 +1,198 @@
+"""Upload storage utility – streams uploaded files to disk."""
+
+import hashlib
+import os
+import uuid
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import AsyncIterable, BinaryIO
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+from app.core.config import settings
+
+
+class FileTooLargeError(Exception):
+    """Raised when an upload exceeds the allowed size while being streamed."""
+
+
+@dataclass
+class StagedFile:
+    """One file of a bulk upload after staging – ``error`` is set when it was rejected."""
+    name: str
+    ext: str = ""
+    path: Path | None = None
+    size: int = 0
+    sha256: str = ""
+    error: str | None = None
+    title: str | None = None
+
+
+async def stream_upload_to_disk(
+    file: UploadFile, dest: Path, max_bytes: int | None = None, chunk_size: int | None = None
+) -> tuple[int, str]:
+    """Stream an upload to ``dest`` in fixed-size chunks. Returns (size, sha256 hex).
+
+    The file is hashed in the same pass. ``max_bytes`` is only checked against
+    what has already been received – ``BodySizeLimitMiddleware`` is what stops an
+    oversized request early. Bytes go to a temporary sibling file that is only
+    renamed into place once complete, so a failed copy never leaves a partial ``dest``.
+    """
+    max_bytes = max_bytes or settings.max_file_size_bytes
+    chunk_size = chunk_size or settings.upload_chunk_size_bytes
+
+    # The parser already knows the size of a spooled part
+    if file.size is not None and file.size > max_bytes:
+        raise FileTooLargeError(file.size)
+
+    tmp_path = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(tmp_path, "wb") as out:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise FileTooLargeError(size)
+                digest.update(chunk)
+                await out.write(chunk)
+        await aiofiles.os.replace(tmp_path, dest)
+    except BaseException:
+        await discard(tmp_path)
+        raise
+
+    return size, digest.hexdigest()
+
+
+def staging_path(ext: str) -> Path:
+    """Temporary location for an upload whose digest is not known yet."""
+    path = settings.upload_path / ".incoming"
+    path.mkdir(parents=True, exist_ok=True)
+    return path / f"{uuid.uuid4()}{ext}"
+
+
+def part_path(upload_id: uuid.UUID) -> Path:
+    """Where a resumable upload's bytes accumulate until it is completed."""
+    path = settings.upload_path / ".incoming"
+    path.mkdir(parents=True, exist_ok=True)
+    return path / f"{upload_id}.part"
+
+
+async def write_at(
+    path: Path, offset: int, chunks: AsyncIterable[bytes], max_bytes: int, *digests
+) -> int:
+    """Write a streamed chunk into ``path`` at ``offset``, feeding each digest. Returns its length.
+
+    Bytes past ``offset`` left by an earlier, interrupted attempt are
+    overwritten and truncated, so a retried chunk simply replaces them.
+    """
+    written = 0
+    async with aiofiles.open(path, "r+b") as out:
+        await out.seek(offset)
+        async for data in chunks:
+            written += len(data)
+            if written > max_bytes:
+                raise FileTooLargeError(written)
+            for digest in digests:
+                digest.update(data)
+            await out.write(data)
+        await out.truncate()
+    return written
+
+
+def hash_prefix(path: Path, length: int, chunk_size: int | None = None):
+    """sha256 state over the first ``length`` bytes of ``path``. Blocking – run it in a thread."""
+    chunk_size = chunk_size or settings.upload_chunk_size_bytes
+    digest = hashlib.sha256()
+    with open(path, "rb") as src:
+        while length > 0 and (data := src.read(min(chunk_size, length))):
+            digest.update(data)
+            length -= len(data)
+    return digest
+
+
+def blob_path(sha256: str, ext: str) -> Path:
+    """Content-addressed location of a blob, fanned out by digest prefix."""
+    return settings.upload_path / sha256[:2] / f"{sha256}{ext}"
+
+
+async def promote_to_blob(staged: Path, dest: Path) -> None:
+    """Move a staged upload to its blob path, or drop it if the blob is already stored."""
+    if await aiofiles.os.path.exists(dest):
+        await aiofiles.os.remove(staged)
+        return
+    await aiofiles.os.makedirs(dest.parent, exist_ok=True)
+    await aiofiles.os.replace(staged, dest)
+
+
+async def discard(path: Path) -> None:
+    """Remove a staged file, ignoring it if it is already gone."""
+    if await aiofiles.os.path.exists(path):
+        await aiofiles.os.remove(path)
+
+
+def stage_zip_members(
+    archive_file: BinaryIO,
+    archive_name: str,
+    allowed_extensions: set[str],
+    max_members: int,
+    max_bytes: int | None = None,
+    chunk_size: int | None = None,
+) -> list[StagedFile]:
+    """Extract the members of a ZIP upload to staging, hashing and size-checking each.
+
+    Blocking – run it in a thread. Directories and macOS resource forks are
+    skipped; members with other extensions, over ``max_bytes`` or beyond
+    ``max_members`` come back rejected.
+    """
+    max_bytes = max_bytes or settings.max_file_size_bytes
+    chunk_size = chunk_size or settings.upload_chunk_size_bytes
+    try:
+        archive = zipfile.ZipFile(archive_file)
+    except zipfile.BadZipFile:
+        return [StagedFile(archive_name, error="Not a valid ZIP archive")]
+
+    staged: list[StagedFile] = []
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir() or info.filename.startswith("__MACOSX/"):
+                continue
+            name = f"{archive_name}/{info.filename}"
+            ext = PurePosixPath(info.filename).suffix.lower()
+            if len(staged) >= max_members:
+                staged.append(StagedFile(name, error="Too many files in this batch"))
+            elif ext not in allowed_extensions:
+                staged.append(StagedFile(name, error=f"File type '{ext}' not allowed"))
+            elif info.file_size > max_bytes:
+                staged.append(StagedFile(name, error=f"File too large. Maximum: {settings.MAX_FILE_SIZE_MB}MB"))
+            else:
+                staged.append(_extract_member(archive, info, name, ext, max_bytes, chunk_size))
+    return staged
+
+
+def _extract_member(
+    archive: zipfile.ZipFile, info: zipfile.ZipInfo, name: str, ext: str, max_bytes: int, chunk_size: int
+) -> StagedFile:
+    dest = staging_path(ext)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with archive.open(info) as src, open(dest, "wb") as out:
+            # The declared size is only a hint – enforce the limit on what actually inflates
+            while chunk := src.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise FileTooLargeError(size)
+                digest.update(chunk)
+                out.write(chunk)
+    except FileTooLargeError:
+        os.unlink(dest)
+        return StagedFile(name, error=f"File too large. Maximum: {settings.MAX_FILE_SIZE_MB}MB")
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError, RuntimeError) as e:
+        # Corrupt, encrypted or unsupported-compression members
+        os.unlink(dest)
+        return StagedFile(name, error=f"Could not extract: {e}")
+    return StagedFile(name, ext, dest, size, digest.hexdigest())
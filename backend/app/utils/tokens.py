@@ -0,0 +1,10 @@
+"""Token counting for prompt budgets."""
+
+
+def count_tokens(text: str) -> int:
+    """Estimated tokens in ``text`` – about 4 characters per token.
+
+    An estimate rather than the model's tokenizer, so budgets are the same on
+    every install and need no encoding download.
+    """
+    return max(1, len(text) // 4)
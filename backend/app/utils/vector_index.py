@@ -0,0 +1,190 @@
+"""In-process approximate nearest-neighbour index over int8 chunk embeddings."""
+
+import asyncio
+import threading
+from uuid import UUID
+
+import numpy as np
+
+# Rows dequantized per matrix product, bounding the float32 scratch memory
+_BLOCK = 65536
+
+
+class VectorIndex:
+    """Inverted-file (IVF) index over int8 vectors, searched with NumPy.
+
+    Below ``ivf_threshold`` live vectors every query is an exact scan. Above it,
+    vectors are clustered with spherical k-means into ~sqrt(n) lists and a query
+    only scores the ``nprobe`` lists whose centroids are closest. Vectors stay
+    int8 (one byte per dimension plus a float32 scale) and are dequantized a
+    block at a time while scoring.
+
+    Chunks are always replaced per document, so adding vectors for a document
+    drops whatever the index held for it before. Access is guarded by a lock
+    because searches run in worker threads.
+    """
+
+    def __init__(self, dim: int, nprobe: int = 8, ivf_threshold: int = 20000):
+        self.dim = dim
+        self.nprobe = nprobe
+        self.ivf_threshold = ivf_threshold
+        self.last_chunk_id = 0
+        self._lock = threading.Lock()
+        self._codes = np.empty((0, dim), dtype=np.int8)
+        self._scales = np.empty(0, dtype=np.float32)
+        self._chunk_ids = np.empty(0, dtype=np.int64)
+        self._doc_slots = np.empty(0, dtype=np.int32)
+        self._alive = np.empty(0, dtype=bool)
+        self._documents: list[UUID] = []
+        self._slots: dict[UUID, int] = {}
+        self._centroids: np.ndarray | None = None
+        self._lists = np.empty(0, dtype=np.int32)
+        self._trained_on = 0
+
+    def __len__(self) -> int:
+        return int(self._alive.sum())
+
+    def _slot(self, document_id: UUID) -> int:
+        slot = self._slots.get(document_id)
+        if slot is None:
+            slot = self._slots[document_id] = len(self._documents)
+            self._documents.append(document_id)
+        return slot
+
+    def add(
+        self, chunk_ids: list[int], document_ids: list[UUID], codes: np.ndarray, scales: np.ndarray
+    ) -> None:
+        if not chunk_ids:
+            return
+        with self._lock:
+            slots = np.array([self._slot(d) for d in document_ids], dtype=np.int32)
+            self._alive &= ~np.isin(self._doc_slots, np.unique(slots))
+
+            self._codes = np.concatenate([self._codes, codes])
+            self._scales = np.concatenate([self._scales, scales])
+            self._chunk_ids = np.concatenate([self._chunk_ids, np.asarray(chunk_ids, dtype=np.int64)])
+            self._doc_slots = np.concatenate([self._doc_slots, slots])
+            self._alive = np.concatenate([self._alive, np.ones(len(chunk_ids), dtype=bool)])
+            if self._centroids is not None:
+                self._lists = np.concatenate([self._lists, self._assign(codes, scales)])
+            self.last_chunk_id = max(self.last_chunk_id, int(max(chunk_ids)))
+
+            if len(self._alive) > 2 * max(len(self), 1024):
+                self._compact()
+            live = len(self)
+            if live >= self.ivf_threshold and live >= 2 * self._trained_on:
+                self._train()
+
+    def remove_document(self, document_id: UUID) -> None:
+        with self._lock:
+            slot = self._slots.get(document_id)
+            if slot is not None:
+                self._alive &= self._doc_slots != slot
+
+    def _compact(self) -> None:
+        keep = self._alive
+        self._codes, self._scales = self._codes[keep], self._scales[keep]
+        self._chunk_ids, self._doc_slots = self._chunk_ids[keep], self._doc_slots[keep]
+        if self._centroids is not None:
+            self._lists = self._lists[keep]
+        self._alive = np.ones(len(self._codes), dtype=bool)
+
+    def _dequantize(self, rows: np.ndarray | slice) -> np.ndarray:
+        return self._codes[rows].astype(np.float32) * self._scales[rows, None]
+
+    def _assign(self, codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        lists = np.empty(len(codes), dtype=np.int32)
+        for start in range(0, len(codes), _BLOCK):
+            block = codes[start:start + _BLOCK].astype(np.float32) * scales[start:start + _BLOCK, None]
+            lists[start:start + _BLOCK] = np.argmax(block @ self._centroids.T, axis=1)
+        return lists
+
+    def _train(self, iterations: int = 8, sample_size: int = 50000) -> None:
+        live = np.flatnonzero(self._alive)
+        nlist = max(1, int(np.sqrt(len(live))))
+        rng = np.random.default_rng(0)
+        sample = self._dequantize(rng.choice(live, min(sample_size, len(live)), replace=False))
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assignment == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        self._centroids = centroids
+        self._lists = self._assign(self._codes, self._scales)
+        self._trained_on = len(live)
+
+    def search(self, queries: np.ndarray, k: int) -> list[list[tuple[int, UUID, float]]]:
+        """Top ``k`` ``(chunk id, document id, cosine)`` hits for each row of ``queries``."""
+        with self._lock:
+            if not len(self):
+                return [[] for _ in queries]
+            if self._centroids is None:
+                candidates = [np.flatnonzero(self._alive)] * len(queries)
+            else:
+                # One product ranks every centroid for the whole batch
+                nprobe = min(self.nprobe, len(self._centroids))
+                probes = np.argpartition(-(queries @ self._centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+                candidates = [np.flatnonzero(self._alive & np.isin(self._lists, p)) for p in probes]
+
+            if self._centroids is None:
+                scores = np.concatenate([
+                    self._dequantize(slice(start, start + _BLOCK)) @ queries.T
+                    for start in range(0, len(self._codes), _BLOCK)
+                ])
+                per_query = [scores[candidates[0], q] for q in range(len(queries))]
+            else:
+                per_query = [self._dequantize(rows) @ query for rows, query in zip(candidates, queries)]
+
+            results = []
+            for rows, scores in zip(candidates, per_query):
+                if len(scores) > k:
+                    top = np.argpartition(-scores, k - 1)[:k]
+                else:
+                    top = np.arange(len(scores))
+                top = top[np.argsort(-scores[top])]
+                results.append([
+                    (int(self._chunk_ids[rows[i]]), self._documents[self._doc_slots[rows[i]]], float(scores[i]))
+                    for i in top
+                ])
+            return results
+
+
+class QueryBatcher:
+    """Coalesces concurrent searches into one batched ``VectorIndex.search`` call.
+
+    The first query of a batch waits ``window`` seconds for company, then the
+    whole batch is scored with a single set of matrix products in a thread.
+    """
+
+    def __init__(self, index: VectorIndex, window: float = 0.002, max_batch: int = 64):
+        self.index = index
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: list[tuple[np.ndarray, int, asyncio.Future]] = []
+        self._flusher: asyncio.Task | None = None
+
+    async def search(self, vector: np.ndarray, k: int) -> list[tuple[int, UUID, float]]:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((vector, k, future))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush())
+        return await future
+
+    async def _flush(self) -> None:
+        await asyncio.sleep(self.window)
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            queries = np.stack([vector for vector, _, _ in batch])
+            try:
+                hits = await asyncio.to_thread(self.index.search, queries, max(k for _, k, _ in batch))
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, k, future), result in zip(batch, hits):
+                if not future.done():
+                    future.set_result(result[:k])
@@ -0,0 +1,236 @@
+"""OCR worker pool – persistent jobs, bounded priority queue, process-based execution."""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.models.ocr_job import OCRJob, OCRJobStatus
+from app.repositories.document_repo import EXTRACTION_FAILED_PREFIX, DocumentRepository
+from app.repositories.ocr_job_repo import OCRJobRepository
+from app.services.retrieval_service import RetrievalService
+from app.utils.answer_cache import answer_cache
+from app.utils.ocr import (
+    extract_text_from_file, join_pages, ocr_pdf_page, pdf_page_texts, run_in_worker,
+)
+
+logger = logging.getLogger(__name__)
+
+# Lower value runs first
+PRIORITY_INTERACTIVE_SMALL = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_BULK = 2
+
+# How long past its deadline a step may keep running before its process exits
+TIMEOUT_GRACE_SECONDS = 10
+
+
+def job_priority(file_size: int, interactive: bool = True) -> int:
+    """Small, interactively uploaded documents jump ahead of large or bulk ones."""
+    if not interactive:
+        return PRIORITY_BULK
+    if file_size <= settings.OCR_SMALL_FILE_MB * 1024 * 1024:
+        return PRIORITY_INTERACTIVE_SMALL
+    return PRIORITY_INTERACTIVE
+
+
+class OCRWorkerPool:
+    """Runs OCR jobs in a process pool fed from a bounded in-memory priority queue.
+
+    Jobs are persisted in ``ocr_jobs`` before they are queued, so anything still
+    queued (or abandoned while running) is picked up again on the next start.
+    """
+
+    def __init__(self):
+        self._executor: ProcessPoolExecutor | None = None
+        self._queue: asyncio.PriorityQueue | None = None
+        self._consumers: list[asyncio.Task] = []
+        self._retries: set[asyncio.Task] = set()
+        self._seq = itertools.count()
+
+    # ── Lifecycle ────────────────────────────────────
+    async def start(self) -> None:
+        workers = settings.ocr_worker_count
+        self._executor = self._new_executor()
+        self._queue = asyncio.PriorityQueue(maxsize=settings.OCR_QUEUE_SIZE)
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(workers)]
+        self._retries.add(asyncio.create_task(self._recover()))
+        logger.info(f"OCR worker pool started with {workers} processes")
+
+    async def stop(self) -> None:
+        for task in [*self._consumers, *self._retries]:
+            task.cancel()
+        await asyncio.gather(*self._consumers, *self._retries, return_exceptions=True)
+        self._consumers.clear()
+        self._retries.clear()
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ── Queue ────────────────────────────────────────
+    @property
+    def saturated(self) -> bool:
+        return self._queue is not None and self._queue.full()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def submit(self, job_id: int, priority: int) -> None:
+        """Queue a persisted job. Waits for room if the queue filled up meanwhile."""
+        await self._queue.put((priority, next(self._seq), job_id))
+
+    async def submit_many(self, jobs: list[tuple[int, int]]) -> None:
+        """Queue a bulk upload's persisted ``(job_id, priority)`` jobs."""
+        for job_id, priority in jobs:
+            await self.submit(job_id, priority)
+
+    def _retry_later(self, job_id: int, priority: int, delay: float) -> None:
+        async def _delayed() -> None:
+            await asyncio.sleep(delay)
+            await self.submit(job_id, priority)
+
+        task = asyncio.create_task(_delayed())
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _recover(self) -> None:
+        stale_after = timedelta(seconds=settings.OCR_JOB_TIMEOUT_SECONDS)
+        async with async_session_factory() as session:
+            jobs = await OCRJobRepository(session).get_pending(stale_after)
+            await session.commit()
+        if jobs:
+            logger.info(f"Re-queuing {len(jobs)} pending OCR jobs")
+        for job in jobs:
+            await self.submit(job.id, job.priority)
+
+    # ── Execution ────────────────────────────────────
+    @staticmethod
+    def _new_executor() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=settings.ocr_worker_count,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    async def _consume(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"OCR job {job_id} crashed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: int) -> None:
+        async with async_session_factory() as session:
+            job = await OCRJobRepository(session).claim(job_id)
+            await session.commit()
+        if job is None:
+            return  # already taken by another worker process
+
+        logger.info(f"Starting OCR for document {job.document_id} (attempt {job.attempts})")
+        try:
+            text = await self._extract(job.file_path)
+        except Exception as e:
+            await self._handle_failure(job, e)
+            return
+
+        if not await save_ocr_result(job.document_id, text, job_id=job.id):
+            await self._handle_failure(job, RuntimeError("could not save OCR result"))
+
+    async def _extract(self, file_path: str) -> str:
+        """Run the extraction steps for one job, all bounded by a shared deadline.
+
+        Each step stops itself at the deadline inside its worker process. A step
+        that doesn't (stuck in native code) makes its process exit after the
+        grace period; the broken pool is then replaced so the job can be retried
+        and later jobs still run.
+        """
+        deadline = time.time() + settings.OCR_JOB_TIMEOUT_SECONDS
+        executor = self._executor
+        if file_path.lower().endswith(".pdf"):
+            work = self._extract_pdf(executor, file_path, deadline)
+        else:
+            work = self._in_pool(executor, deadline, extract_text_from_file, file_path, True)
+        try:
+            return await work
+        except BrokenProcessPool:
+            # A worker process died (OOM, or stuck past its deadline); steps of other jobs
+            # on the same pool fail too. The first of them to get here replaces it.
+            if self._executor is executor:
+                logger.error(f"OCR worker process died while processing {file_path}; restarting the pool")
+                self._replace_executor()
+            raise
+
+    async def _extract_pdf(self, executor: ProcessPoolExecutor, file_path: str, deadline: float) -> str:
+        """Fan the pages without a text layer out across the pool, then reassemble in order."""
+        pages = await self._in_pool(executor, deadline, pdf_page_texts, file_path)
+        missing = [index for index, text in enumerate(pages) if not text.strip()]
+        results = await asyncio.gather(
+            *(self._in_pool(executor, deadline, ocr_pdf_page, file_path, index) for index in missing)
+        )
+        for index, text in zip(missing, results):
+            pages[index] = text
+        return join_pages(pages)
+
+    @staticmethod
+    async def _in_pool(executor: ProcessPoolExecutor, deadline: float, func, *args):
+        return await asyncio.wrap_future(
+            executor.submit(run_in_worker, func, *args, deadline=deadline, exit_after=TIMEOUT_GRACE_SECONDS)
+        )
+
+    def _replace_executor(self) -> None:
+        executor, self._executor = self._executor, self._new_executor()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _handle_failure(self, job: OCRJob, error: Exception) -> None:
+        message = str(error) or error.__class__.__name__
+        async with async_session_factory() as session:
+            repo = OCRJobRepository(session)
+            if job.attempts < settings.OCR_MAX_ATTEMPTS:
+                delay = settings.OCR_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+                await repo.finish(job.id, OCRJobStatus.QUEUED, message)
+                await session.commit()
+                logger.warning(f"OCR job {job.id} failed ({message}); retrying in {delay:.0f}s")
+                self._retry_later(job.id, job.priority, delay)
+                return
+            await repo.finish(job.id, OCRJobStatus.FAILED, message)
+            await session.commit()
+        logger.error(f"OCR job {job.id} failed permanently: {message}")
+        # Only this document shows the failure; the next upload of the same bytes tries again
+        await save_ocr_result(job.document_id, f"{EXTRACTION_FAILED_PREFIX}: {message}]", share=False)
+
+
+async def save_ocr_result(
+    document_id: uuid.UUID, text: str, job_id: int | None = None, share: bool = True
+) -> bool:
+    """Store extracted text and, when given, mark the job done in the same transaction.
+
+    ``share=False`` keeps the text off the blob and duplicate documents.
+    """
+    async with async_session_factory() as session:
+        try:
+            duplicates = await DocumentRepository(session).update_extracted_text(document_id, text, share)
+            await RetrievalService(session).index_document(document_id, text, duplicates)
+            if job_id is not None:
+                await OCRJobRepository(session).finish(job_id, OCRJobStatus.DONE)
+            await session.commit()
+            # Other workers stop matching on their own: the content version changed
+            answer_cache.invalidate_document(document_id)
+            logger.info(f"OCR complete for document {document_id}: {len(text)} chars extracted")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save OCR result for {document_id}: {e}")
+            await session.rollback()
+            return False
+
+
+ocr_pool = OCRWorkerPool()
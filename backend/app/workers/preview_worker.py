@@ -0,0 +1,120 @@
+"""Preview worker pool – renders page previews in worker processes into the disk cache."""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from app.core.config import settings
+from app.utils.disk_cache import DiskLRUCache
+from app.utils.previews import PREVIEW_SIZES, PREWARM_SIZES, render_preview
+
+logger = logging.getLogger(__name__)
+
+
+def preview_key(sha256: str, page: int, size: str) -> str:
+    """Cache key – previews belong to the content, so documents sharing a blob share them."""
+    return f"{sha256[:2]}/{sha256}/{page}-{size}.{settings.PREVIEW_FORMAT}"
+
+
+class PreviewPool:
+    """Renders previews in a process pool, backed by a size-bounded disk cache.
+
+    New uploads queue their first-page previews on a bounded queue; that is
+    best effort, since any preview missing from the cache is rendered when it
+    is first requested. Concurrent requests for one preview share a render.
+    """
+
+    def __init__(self):
+        self.cache = DiskLRUCache(settings.preview_cache_path, settings.PREVIEW_CACHE_MAX_MB * 1024 * 1024)
+        self._executor: ProcessPoolExecutor | None = None
+        self._queue: asyncio.Queue | None = None
+        self._consumers: list[asyncio.Task] = []
+        self._pending: dict[str, asyncio.Future] = {}
+
+    # ── Lifecycle ────────────────────────────────────
+    async def start(self) -> None:
+        self._executor = self._new_executor()
+        self._queue = asyncio.Queue(maxsize=settings.PREVIEW_QUEUE_SIZE)
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(settings.PREVIEW_WORKERS)]
+        logger.info(f"Preview pool started with {settings.PREVIEW_WORKERS} processes")
+
+    async def stop(self) -> None:
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers.clear()
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ── Requests ─────────────────────────────────────
+    def schedule(self, sha256: str | None, file_path: str) -> None:
+        """Queue the first-page previews of a new upload, unless the queue is full."""
+        if self._queue is None or sha256 is None:
+            return
+        try:
+            self._queue.put_nowait((sha256, file_path))
+        except asyncio.QueueFull:
+            logger.debug(f"Preview queue full, {sha256[:12]} will render on demand")
+
+    def schedule_many(self, blobs: list[tuple[str, str]]) -> None:
+        for sha256, file_path in blobs:
+            self.schedule(sha256, file_path)
+
+    async def cached(self, sha256: str, page: int, size: str) -> Path | None:
+        return await asyncio.to_thread(self.cache.get, preview_key(sha256, page, size))
+
+    async def get(self, sha256: str, file_path: str, page: int, size: str) -> Path:
+        """The cached preview, rendered first if needed. Raises ``PreviewError`` / ``PageOutOfRange``."""
+        key = preview_key(sha256, page, size)
+        path = await asyncio.to_thread(self.cache.get, key)
+        if path is not None:
+            return path
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._render(key, file_path, page, size))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        # A cancelled request must not cancel the render other requests wait on
+        return await asyncio.shield(pending)
+
+    # ── Execution ────────────────────────────────────
+    @staticmethod
+    def _new_executor() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=settings.PREVIEW_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    async def _render(self, key: str, file_path: str, page: int, size: str) -> Path:
+        dest = self.cache.path(key)
+        loop = asyncio.get_running_loop()
+        try:
+            written = await loop.run_in_executor(
+                self._executor, render_preview, file_path, str(dest), page,
+                PREVIEW_SIZES[size], settings.PREVIEW_FORMAT, settings.PREVIEW_QUALITY,
+            )
+        except BrokenProcessPool:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+            raise
+        await asyncio.to_thread(self.cache.added, written)
+        return dest
+
+    async def _consume(self) -> None:
+        while True:
+            sha256, file_path = await self._queue.get()
+            try:
+                for size in PREWARM_SIZES:
+                    await self.get(sha256, file_path, 1, size)
+            except Exception as e:
+                logger.warning(f"Preview of {sha256[:12]} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+
+preview_pool = PreviewPool()
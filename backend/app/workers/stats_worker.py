@@ -0,0 +1,50 @@
+"""Stats reconciler – periodically corrects the incremental counters against real counts."""
+
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.services.stats_service import StatsService
+
+logger = logging.getLogger(__name__)
+
+
+class StatsReconciler:
+    """Background task started by the app lifespan.
+
+    Runs once at startup (which also seeds the counters on an existing
+    database) and then every ``STATS_RECONCILE_SECONDS``. With several app
+    workers, an advisory lock lets only one of them reconcile at a time.
+    """
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def reconcile(self) -> dict[str, int] | None:
+        async with async_session_factory() as session:
+            drift = await StatsService(session).reconcile()
+            await session.commit()
+        return drift
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                drift = await self.reconcile()
+                if drift and any(drift.values()):
+                    logger.info(f"Stats counters reconciled, drift: {drift}")
+            except Exception as e:
+                logger.error(f"Stats reconciliation failed: {e}")
+            await asyncio.sleep(settings.STATS_RECONCILE_SECONDS)
+
+
+stats_reconciler = StatsReconciler()
@@ -0,0 +1,77 @@
+"""Benchmark – keyword-only answers: paragraph scan versus the BM25 paragraph index.
+
+Uses the synthetic documents of ``qa_retrieval`` (random vocabulary with one
+"needle" paragraph) and, per size, compares the old fallback – lower-casing
+every paragraph for every keyword – with a lookup in the paragraph index,
+including snippet extraction. The index build is reported separately: term
+counting happens once at OCR completion, and rebuilding from the stored
+per-paragraph terms is what a cache miss costs. Also reports whether the
+needle is among the returned excerpts.
+
+Runs fully offline, no database needed.
+
+Usage (from ``backend/``):
+    python -m benchmarks.keyword_fallback --pages 10 100 300
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from app.core.config import settings
+from app.services.retrieval_service import _build_chunks, _build_paragraph_index
+from app.utils.bm25 import snippet
+from benchmarks.qa_retrieval import NEEDLE, QUESTION, VOCABULARY, _document, _ms
+
+
+def _scan(text: str, question: str) -> list[str]:
+    """The fallback as it was: substring match of every keyword in every paragraph."""
+    keywords = [w.lower() for w in question.split() if len(w) > 3]
+    paragraphs = text.split("\n\n")
+    return [p for p in paragraphs if any(k in p.lower() for k in keywords)][:settings.QA_FALLBACK_EXCERPTS]
+
+
+def _timed(fn, queries: list[str]) -> list[float]:
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        latencies.append(time.perf_counter() - started)
+    return sorted(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"{'pages':>6} {'chars':>10} {'paras':>7} {'rebuild':>11} {'scan p50':>11}"
+          f" {'index p50':>11} {'index p99':>11}  needle(index/scan)")
+    for pages in args.pages:
+        text, needle_page = _document(pages, rng)
+        chunks, _, paragraph_terms, _ = _build_chunks(text)
+
+        started = time.perf_counter()
+        index, units = _build_paragraph_index(chunks, paragraph_terms)
+        rebuild = time.perf_counter() - started
+
+        def lookup(query: str) -> list[str]:
+            return [snippet(units[i][0], query) for i, _ in index.top(query, settings.QA_FALLBACK_EXCERPTS)]
+
+        queries = [" ".join([QUESTION, *rng.choices(VOCABULARY, k=3)]) for _ in range(args.queries)]
+        scan = _timed(lambda q: _scan(text, q), queries[:max(1, args.queries // 10)])
+        indexed = _timed(lookup, queries)
+
+        found = any("warranty claim deadline" in s for s in lookup(QUESTION))
+        legacy = any(NEEDLE in p for p in _scan(text, QUESTION))
+        print(f"{pages:>6} {len(text):>10} {len(units):>7} {_ms(rebuild):>11} {_ms(statistics.median(scan)):>11}"
+              f" {_ms(statistics.median(indexed)):>11} {_ms(indexed[int(len(indexed) * 0.99) - 1]):>11}"
+              f"  {'yes' if found else 'NO'}/{'yes' if legacy else 'no'} (page {needle_page})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark – bytes read per document list page, text inline versus in document_contents.
+
+Seeds two scratch layouts in the configured database with the same synthetic
+documents (OCR-sized texts, a few very large ones): ``bench_docs_inline`` keeps
+the extracted text on the document row, as ``documents`` used to;
+``bench_docs`` + ``bench_doc_contents`` keep it in a side table, compressed
+above ``TEXT_COMPRESS_ABOVE_KB``. The list page query is then run against
+both, reporting the bytes received per page (sum of the decoded column
+values) and the latency. The storage footprint of the two text tables is
+printed as well. Scratch tables are dropped afterwards.
+
+Requires a reachable Postgres (DATABASE_URL). Usage (from ``backend/``):
+    python -m benchmarks.list_payload --docs 5000 --size 100
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.repositories.document_repo import content_values
+
+WORDS = (
+    "invoice contract payment agreement tenant landlord warranty delivery schedule "
+    "premium policy claim renewal termination clause liability signature notary "
+    "amount balance account statement receipt purchase order supplier customer"
+).split()
+
+COLUMNS = (
+    "id serial PRIMARY KEY, title varchar(500) NOT NULL, file_path varchar(1000) NOT NULL, "
+    "file_type varchar(20) NOT NULL, file_size integer NOT NULL, created_at timestamptz NOT NULL DEFAULT now()"
+)
+
+SETUP = [
+    f"CREATE TABLE bench_docs_inline ({COLUMNS}, extracted_text text)",
+    f"CREATE TABLE bench_docs ({COLUMNS})",
+    "CREATE TABLE bench_doc_contents (document_id integer PRIMARY KEY REFERENCES bench_docs(id) ON DELETE CASCADE,"
+    " body text, compressed bytea, char_count integer NOT NULL)",
+]
+TEARDOWN = "DROP TABLE IF EXISTS bench_doc_contents, bench_docs, bench_docs_inline"
+
+# What the ORM emits for a list page: every mapped column of the document row
+PAGES = {
+    "inline": "SELECT * FROM bench_docs_inline ORDER BY created_at DESC, id DESC LIMIT :size",
+    "side table": "SELECT * FROM bench_docs ORDER BY created_at DESC, id DESC LIMIT :size",
+}
+FOOTPRINT = """
+SELECT pg_size_pretty(pg_total_relation_size('bench_docs_inline')),
+       pg_size_pretty(pg_total_relation_size('bench_docs') + pg_total_relation_size('bench_doc_contents'))
+"""
+
+
+def _text(rng: random.Random) -> str:
+    # Mostly a few pages of OCR output, with the occasional several-hundred-page scan
+    words = rng.randint(100_000, 200_000) if rng.random() < 0.02 else rng.randint(500, 5000)
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _bytes(row) -> int:
+    return sum(len(v.encode() if isinstance(v, str) else v if isinstance(v, bytes) else str(v).encode())
+               for v in row if v is not None)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.execute(text(TEARDOWN))
+        for statement in SETUP:
+            await conn.execute(text(statement))
+        for i in range(args.docs):
+            row = {"title": f"Document {i}", "path": f"uploads/{i}.pdf", "size": rng.randint(10_000, 10_000_000)}
+            body = _text(rng)
+            await conn.execute(text(
+                "INSERT INTO bench_docs_inline (title, file_path, file_type, file_size, extracted_text)"
+                " VALUES (:title, :path, 'pdf', :size, :text)"
+            ), {**row, "text": body})
+            doc_id = (await conn.execute(text(
+                "INSERT INTO bench_docs (title, file_path, file_type, file_size)"
+                " VALUES (:title, :path, 'pdf', :size) RETURNING id"
+            ), row)).scalar_one()
+            await conn.execute(text(
+                "INSERT INTO bench_doc_contents (document_id, body, compressed, char_count)"
+                " VALUES (:id, :body, :compressed, :char_count)"
+            ), {"id": doc_id, **content_values(body)})
+        await conn.execute(text("ANALYZE bench_docs_inline"))
+        await conn.execute(text("ANALYZE bench_docs"))
+
+    try:
+        async with engine.connect() as conn:
+            inline_size, side_size = (await conn.execute(text(FOOTPRINT))).one()
+            print(f"storage: inline={inline_size}  side table (compressed above "
+                  f"{settings.TEXT_COMPRESS_ABOVE_KB}KB)={side_size}")
+            for layout, sql in PAGES.items():
+                timings, received = [], 0
+                for _ in range(args.runs):
+                    started = time.perf_counter()
+                    rows = (await conn.execute(text(sql), {"size": args.size})).all()
+                    timings.append((time.perf_counter() - started) * 1000)
+                    received = sum(_bytes(row) for row in rows)
+                print(f"{layout:<11} page of {args.size}: {received / 1024:10.1f} KB   "
+                      f"median={statistics.median(timings):7.1f}ms")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(TEARDOWN))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""Benchmark – CPU cost of turning a result page into list responses.
+
+Compares, per page of ``--size`` documents with a few tags each: the old path
+(``Document`` ORM entities with a ``tags`` collection, copied field by field
+into validated Pydantic models) against the read-model path (plain
+``summary_columns`` rows with tags as JSON, built with
+``DocumentResponse.from_row``). Both end with the JSON serialization FastAPI
+performs. The database round trip is not included.
+
+Runs fully offline, no database needed.
+
+Usage (from ``backend/``):
+    python -m benchmarks.list_serialization --size 100 --runs 200
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy.engine.result import result_tuple
+
+import app.main  # noqa: F401 – configures every mapper
+from app.models.document import Document, Tag
+from app.schemas.document import DocumentListResponse, DocumentResponse
+
+COLUMNS = ("id", "title", "file_type", "file_size", "is_deleted", "created_at", "updated_at", "uploaded_by", "sha256", "tags")
+
+
+def _orm_page(size: int) -> list[Document]:
+    now = datetime.now(timezone.utc)
+    tags = [Tag(id=i, name=f"tag{i}") for i in range(5)]
+    return [
+        Document(
+            id=uuid.uuid4(), title=f"Document {i}", file_path=f"uploads/{i}.pdf", file_type="pdf",
+            file_size=1000 + i, is_deleted=False, created_at=now, updated_at=now,
+            uploaded_by=uuid.uuid4(), sha256=uuid.uuid4().hex * 2, tags=tags[:3],
+        )
+        for i in range(size)
+    ]
+
+
+def _row_page(docs: list[Document]) -> list[tuple]:
+    # What the driver hands back for summary_columns: named tuples, tags decoded from JSON
+    make = result_tuple(COLUMNS)
+    return [
+        make([d.id, d.title, d.file_type, d.file_size, d.is_deleted, d.created_at, d.updated_at,
+              d.uploaded_by, d.sha256, [{"id": t.id, "name": t.name} for t in d.tags]])
+        for d in docs
+    ]
+
+
+def _orm_response(docs: list[Document]) -> str:
+    items = [
+        DocumentResponse(
+            id=str(d.id), title=d.title, file_type=d.file_type, file_size=d.file_size,
+            is_deleted=d.is_deleted, created_at=str(d.created_at), updated_at=str(d.updated_at),
+            uploaded_by=str(d.uploaded_by), tags=[{"id": t.id, "name": t.name} for t in d.tags],
+        )
+        for d in docs
+    ]
+    return DocumentListResponse(items=items, total=len(items), page=1, size=len(items), pages=1).model_dump_json()
+
+
+def _row_response(rows: list[tuple]) -> str:
+    items = [DocumentResponse.from_row(row) for row in rows]
+    return DocumentListResponse.model_construct(
+        items=items, total=len(items), page=1, size=len(items), pages=1, next_cursor=None
+    ).model_dump_json()
+
+
+def _timed(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    orm = _timed(lambda: _orm_response(_orm_page(args.size)), args.runs)
+    docs = _orm_page(args.size)
+    rows = _row_page(docs)
+    read_model = _timed(lambda: _row_response(rows), args.runs)
+    print(f"page of {args.size}: ORM entities + validation {orm:7.2f}ms   "
+          f"rows + from_row {read_model:7.2f}ms   speedup {orm / read_model:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
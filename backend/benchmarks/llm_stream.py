@@ -0,0 +1,119 @@
+"""Benchmark – LLM call latency: per-call client vs pooled client vs streaming.
+
+Starts the mock completions server from ``benchmarks.mock_llm`` in-process and
+issues the same question repeatedly three ways:
+
+* ``per-call``  – a fresh ``httpx.AsyncClient`` per question (the old ``_call_llm``)
+* ``pooled``    – the shared keep-alive ``LLMClient.complete``
+* ``streamed``  – ``LLMClient.stream``; time-to-first-token is when the first delta arrives
+
+Reports p50/p99 time-to-first-token (for non-streaming calls that is the whole
+answer) and total time.
+
+Usage (from ``backend/``):
+    python -m benchmarks.llm_stream --calls 50 --concurrency 5 --first-token-ms 300 --token-ms 20
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import time
+
+import httpx
+import uvicorn
+
+from app.core.config import settings
+from app.core.llm import LLMClient
+from benchmarks.mock_llm import create_app
+
+MESSAGES = [{"role": "user", "content": "When is the warranty claim deadline for the gearbox?"}]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _per_call() -> tuple[float, float]:
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=settings.LLM_BASE_URL, timeout=60.0) as client:
+        response = await client.post("/chat/completions", json=LLMClient._payload(MESSAGES, stream=False))
+        response.raise_for_status()
+        response.json()["choices"][0]["message"]["content"]
+    elapsed = time.perf_counter() - started
+    return elapsed, elapsed
+
+
+async def _pooled(client: LLMClient) -> tuple[float, float]:
+    started = time.perf_counter()
+    await client.complete(MESSAGES)
+    elapsed = time.perf_counter() - started
+    return elapsed, elapsed
+
+
+async def _streamed(client: LLMClient) -> tuple[float, float]:
+    started = time.perf_counter()
+    first = None
+    async for _ in client.stream(MESSAGES):
+        if first is None:
+            first = time.perf_counter() - started
+    return first, time.perf_counter() - started
+
+
+async def _run(call, calls: int, concurrency: int) -> list[tuple[float, float]]:
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with limit:
+            return await call()
+
+    return await asyncio.gather(*(one() for _ in range(calls)))
+
+
+def _ms(values: list[float], q: float) -> str:
+    values = sorted(values)
+    if q == 0.5:
+        return f"{statistics.median(values) * 1000:8.1f}ms"
+    return f"{values[min(len(values) - 1, int(len(values) * q))] * 1000:8.1f}ms"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=20)
+    parser.add_argument("--tokens", type=int, default=60)
+    args = parser.parse_args()
+
+    port = _free_port()
+    settings.LLM_BASE_URL = f"http://127.0.0.1:{port}/v1"
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(args.first_token_ms, args.token_ms, args.tokens),
+        host="127.0.0.1", port=port, log_level="warning",
+    ))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    client = LLMClient()
+    try:
+        print(f"{'mode':<10} {'ttft p50':>11} {'ttft p99':>11} {'total p50':>11} {'total p99':>11}")
+        for name, call in (
+            ("per-call", _per_call),
+            ("pooled", lambda: _pooled(client)),
+            ("streamed", lambda: _streamed(client)),
+        ):
+            results = await _run(call, args.calls, args.concurrency)
+            ttft, total = [r[0] for r in results], [r[1] for r in results]
+            print(f"{name:<10} {_ms(ttft, 0.5):>11} {_ms(ttft, 0.99):>11} {_ms(total, 0.5):>11} {_ms(total, 0.99):>11}")
+    finally:
+        await client.stop()
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
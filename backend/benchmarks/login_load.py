@@ -0,0 +1,76 @@
+"""Benchmark – /api/documents latency while a login storm is running.
+
+Runs against a live server. Measures /api/documents latency on its own, then
+again while ``--logins`` concurrent clients hammer /api/auth/login, and prints
+p50/p99 for both phases plus the login throughput. A throwaway user is
+registered first unless ``--email``/``--password`` are given.
+
+Usage (from ``backend/``, server on :8000):
+    python -m benchmarks.login_load --base-url http://localhost:8000 --logins 32
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+async def _probe(client: httpx.AsyncClient, token: str, duration: float) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get("/api/documents", headers={"Authorization": f"Bearer {token}"})
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def _login_storm(client: httpx.AsyncClient, creds: dict, stop: asyncio.Event, done: list) -> None:
+    while not stop.is_set():
+        response = await client.post("/api/auth/login", json=creds)
+        response.raise_for_status()
+        done.append(1)
+
+
+def _summary(name: str, latencies: list[float]) -> str:
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return f"{name:<14} n={len(latencies):5d}  p50={statistics.median(latencies):7.1f}ms  p99={p99:7.1f}ms"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=32, help="concurrent login clients")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.logins + 4)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        creds = {"email": args.email, "password": args.password}
+        if not args.email:
+            creds = {"email": f"bench-{uuid.uuid4().hex[:8]}@example.com", "password": "bench-password"}
+            (await client.post("/api/auth/register", json=creds)).raise_for_status()
+        token = (await client.post("/api/auth/login", json=creds)).json()["access_token"]
+
+        baseline = await _probe(client, token, args.duration)
+
+        stop, logins = asyncio.Event(), []
+        storm = [asyncio.create_task(_login_storm(client, creds, stop, logins)) for _ in range(args.logins)]
+        loaded = await _probe(client, token, args.duration)
+        stop.set()
+        await asyncio.gather(*storm)
+
+    print(_summary("idle", baseline))
+    print(_summary(f"{args.logins} logins", loaded))
+    print(f"login throughput {len(logins) / args.duration:.1f}/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
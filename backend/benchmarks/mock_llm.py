@@ -0,0 +1,71 @@
+"""Mock OpenAI-compatible chat completions server.
+
+Answers ``POST /v1/chat/completions`` with a canned reply, either all at once
+or as ``text/event-stream`` chunks, after a configurable "thinking" delay and
+with a fixed delay per token – enough to exercise the LLM client and the
+streaming QA endpoint without network access or an API key.
+
+Usage (from ``backend/``):
+    python -m benchmarks.mock_llm --port 9000 --first-token-ms 300 --token-ms 20
+    LLM_BASE_URL=http://localhost:9000/v1 OPENAI_API_KEY=mock uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import json
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+REPLY = (
+    "According to the document, the warranty claim deadline for the turbine gearbox "
+    "is fourteen business days from the date the fault is first observed. "
+)
+
+
+def create_app(first_token_ms: float = 300, token_ms: float = 20, tokens: int = 60) -> FastAPI:
+    app = FastAPI()
+    words = (REPLY.split() * (tokens // len(REPLY.split()) + 1))[:tokens]
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(first_token_ms / 1000)
+
+        if not body.get("stream"):
+            await asyncio.sleep(token_ms * (len(words) - 1) / 1000)
+            return {
+                "object": "chat.completion",
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)},
+                             "finish_reason": "stop"}],
+            }
+
+        async def events():
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(token_ms / 1000)
+                chunk = {"object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": {"content": ("" if i == 0 else " ") + word}}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=20)
+    parser.add_argument("--tokens", type=int, default=60)
+    args = parser.parse_args()
+    app = create_app(args.first_token_ms, args.token_ms, args.tokens)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark – page-parallel OCR throughput for scanned PDFs.
+
+Builds a synthetic scanned PDF (one raster image per page, no text layer) and
+OCRs it sequentially and then page-parallel across process pools of growing
+size. Reports pages/second overall and per core.
+
+Requires the tesseract binary. Usage (from ``backend/``):
+    python -m benchmarks.ocr_pages --pages 24 --max-workers 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.utils.ocr import ocr_pdf_page, pdf_page_texts
+
+LINE = "The quick brown fox jumps over the lazy dog. Invoice 4821 is due on 2024-07-31."
+
+
+def build_scanned_pdf(path: str, pages: int) -> None:
+    font = ImageFont.load_default(size=28)
+    images = []
+    for number in range(1, pages + 1):
+        image = Image.new("L", (2480, 3508), 255)  # A4 at 300 DPI
+        draw = ImageDraw.Draw(image)
+        draw.text((150, 150), f"Page {number}", font=font, fill=0)
+        for row in range(40):
+            draw.text((150, 260 + row * 70), LINE, font=font, fill=0)
+        images.append(image)
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=300)
+
+
+def run(path: str, pages: int, workers: int) -> float:
+    started = time.perf_counter()
+    if workers == 0:
+        for index in range(pages):
+            ocr_pdf_page(path, index)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(ocr_pdf_page, [path] * pages, range(pages)))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=24)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+    except Exception as e:
+        sys.exit(f"tesseract is required for this benchmark: {e}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scan.pdf")
+        build_scanned_pdf(path, args.pages)
+        needs_ocr = sum(1 for text in pdf_page_texts(path) if not text.strip())
+        print(f"{args.pages} pages, {needs_ocr} without a text layer")
+
+        elapsed = run(path, args.pages, 0)
+        print(f"sequential     {args.pages / elapsed:6.2f} pages/s   {args.pages / elapsed:6.2f} pages/s/core")
+        workers = 1
+        while workers <= args.max_workers:
+            elapsed = run(path, args.pages, workers)
+            rate = args.pages / elapsed
+            print(f"{workers:2d} processes   {rate:6.2f} pages/s   {rate / workers:6.2f} pages/s/core")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Benchmark – preview render throughput and disk-cache hit rate.
+
+Renders every page of a synthetic scanned PDF, and one large JPEG photo, at
+each preview size – sequentially and across process pools of growing size.
+It then replays a Zipf-skewed stream of preview requests over many documents
+against a size-bounded ``DiskLRUCache`` and reports the hit rate and the
+latency of hits versus misses.
+
+Usage (from ``backend/``):
+    python -m benchmarks.preview_render --pages 12 --requests 3000 --cache-mb 4
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.core.config import settings
+from app.utils.disk_cache import DiskLRUCache
+from app.utils.previews import PREVIEW_SIZES, render_preview
+from app.workers.preview_worker import preview_key
+
+LINE = "The quick brown fox jumps over the lazy dog. Invoice 4821 is due on 2024-07-31."
+
+
+def build_corpus(directory: str, pages: int) -> tuple[str, str]:
+    font = ImageFont.load_default(size=28)
+    images = []
+    for number in range(1, pages + 1):
+        image = Image.new("L", (2480, 3508), 255)  # A4 at 300 DPI
+        draw = ImageDraw.Draw(image)
+        draw.text((150, 150), f"Page {number}", font=font, fill=0)
+        for row in range(40):
+            draw.text((150, 260 + row * 70), LINE, font=font, fill=0)
+        images.append(image)
+    pdf = os.path.join(directory, "scan.pdf")
+    images[0].save(pdf, save_all=True, append_images=images[1:], resolution=300)
+
+    photo = os.path.join(directory, "photo.jpg")
+    gradient = Image.linear_gradient("L").resize((4032, 3024))
+    channels = (gradient, gradient.rotate(90), gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT))
+    Image.merge("RGB", channels).save(photo, quality=90)
+    return pdf, photo
+
+
+def render_all(jobs: list[tuple], workers: int) -> float:
+    started = time.perf_counter()
+    if workers == 0:
+        for job in jobs:
+            render_preview(*job)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(render_preview, *zip(*jobs)))
+    return time.perf_counter() - started
+
+
+def throughput(pdf: str, photo: str, pages: int, out: str, max_workers: int) -> None:
+    fmt, quality = settings.PREVIEW_FORMAT, settings.PREVIEW_QUALITY
+    print(f"Render throughput ({fmt}, quality {quality})")
+    for size, box in PREVIEW_SIZES.items():
+        jobs = [(pdf, f"{out}/{size}-{page}.{fmt}", page, box, fmt, quality) for page in range(1, pages + 1)]
+        elapsed = render_all(jobs, 0)
+        started = time.perf_counter()
+        render_preview(photo, f"{out}/photo-{size}.{fmt}", 1, box, fmt, quality)
+        photo_ms = (time.perf_counter() - started) * 1000
+        line = f"  {size:6s} {box:5d}px  sequential {pages / elapsed:7.1f} pages/s"
+        workers = 2
+        while workers <= max_workers:
+            rate = pages / render_all(jobs, workers)
+            line += f"  {workers}p {rate:7.1f}/s"
+            workers *= 2
+        print(f"{line}   4032x3024 JPEG {photo_ms:6.1f} ms")
+
+
+def cache_replay(pdf: str, pages: int, requests: int, docs: int, cache_mb: float, out: str, skew: float) -> None:
+    fmt, quality = settings.PREVIEW_FORMAT, settings.PREVIEW_QUALITY
+    cache = DiskLRUCache(Path(out) / "cache", int(cache_mb * 1024 * 1024))
+    shas = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(docs)]
+    # Thumbnails dominate (list pages); larger previews follow a few clicks
+    sizes = random.choices(list(PREVIEW_SIZES), weights=[80, 15, 5], k=requests)
+    weights = [1 / rank ** skew for rank in range(1, docs + 1)]
+    picks = random.choices(range(docs), weights=weights, k=requests)
+
+    hit_ms, miss_ms = [], []
+    for doc, size in zip(picks, sizes):
+        page = 1 if size == "thumb" else random.randint(1, pages)
+        key = preview_key(shas[doc], page, size)
+        started = time.perf_counter()
+        if cache.get(key) is None:
+            written = render_preview(pdf, str(cache.path(key)), page, PREVIEW_SIZES[size], fmt, quality)
+            cache.added(written)
+            miss_ms.append((time.perf_counter() - started) * 1000)
+        else:
+            hit_ms.append((time.perf_counter() - started) * 1000)
+
+    stats = cache.stats()
+    print(f"\nCache replay: {requests} requests over {docs} documents (Zipf s={skew}), {cache_mb:g} MB budget")
+    print(f"  hit rate  {stats['hit_rate']:6.1%}   evictions {stats['evictions']}   "
+          f"on disk {stats['bytes'] / 1024 / 1024:.1f} MB")
+    if hit_ms:
+        print(f"  hit   p50 {statistics.median(hit_ms):8.3f} ms")
+    if miss_ms:
+        print(f"  miss  p50 {statistics.median(miss_ms):8.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=12)
+    parser.add_argument("--max-workers", type=int, default=min(os.cpu_count() or 1, 8))
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--docs", type=int, default=400)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of document popularity")
+    parser.add_argument("--cache-mb", type=float, default=4)
+    args = parser.parse_args()
+    random.seed(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf, photo = build_corpus(tmp, args.pages)
+        throughput(pdf, photo, args.pages, tmp, args.max_workers)
+        cache_replay(pdf, args.pages, args.requests, args.docs, args.cache_mb, tmp, args.skew)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark – chunk retrieval latency against document size.
+
+Generates synthetic multi-page documents (OCR-style ``[Page N]`` sections of
+random vocabulary, with one "needle" paragraph planted on a random page) and
+measures, per size: chunking, term counting and embedding (done once, at OCR completion),
+rebuilding the BM25 index from stored term frequencies (a cache miss), and
+query latency on a warm index (the question plus a few common terms, so every
+query walks long posting lists). Also reports whether the needle's chunk made
+it into the budgeted context, versus the old "first 3 chunks" strategy.
+
+Runs fully offline, no database needed.
+
+Usage (from ``backend/``):
+    python -m benchmarks.qa_retrieval --pages 10 100 300 1000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from app.core.config import settings
+from app.services.retrieval_service import _build_chunks, select_within_budget
+from app.utils.bm25 import BM25Index
+from app.utils.ocr import join_pages
+
+NEEDLE = "The warranty claim deadline for the turbine gearbox is fourteen business days."
+QUESTION = "What is the deadline for a warranty claim on the gearbox?"
+VOCABULARY = [f"term{i}" for i in range(5000)]
+
+
+def _document(pages: int, rng: random.Random) -> tuple[str, int]:
+    needle_page = rng.randrange(pages)
+    texts = []
+    for p in range(pages):
+        paragraphs = [" ".join(rng.choices(VOCABULARY, k=rng.randint(40, 120))) for _ in range(6)]
+        if p == needle_page:
+            paragraphs.insert(rng.randrange(len(paragraphs)), NEEDLE)
+        texts.append("\n\n".join(paragraphs))
+    return join_pages(texts), needle_page + 1
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:8.2f}ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 300, 1000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"{'pages':>6} {'chars':>10} {'chunks':>7} {'index once':>11} {'rebuild':>11}"
+          f" {'query p50':>11} {'query p99':>11}  needle(bm25/first3)")
+    for pages in args.pages:
+        text, needle_page = _document(pages, rng)
+
+        started = time.perf_counter()
+        chunks, term_freqs, _, _ = _build_chunks(text)
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index = BM25Index(term_freqs)
+        rebuild = time.perf_counter() - started
+
+        latencies = []
+        for _ in range(args.queries):
+            query = " ".join([QUESTION, *rng.choices(VOCABULARY, k=3)])
+            started = time.perf_counter()
+            ranked = [chunks[i] for i, _ in index.top(query, settings.QA_TOP_K)] or chunks
+            select_within_budget(ranked, settings.QA_CONTEXT_TOKENS)
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+
+        ranked = [chunks[i] for i, _ in index.top(QUESTION, settings.QA_TOP_K)]
+        context = select_within_budget(ranked, settings.QA_CONTEXT_TOKENS)
+
+        found = any(NEEDLE in c.content for c in context)
+        legacy = any(NEEDLE in c.content for c in chunks[:3])
+        print(f"{pages:>6} {len(text):>10} {len(chunks):>7} {_ms(build):>11} {_ms(rebuild):>11}"
+              f" {_ms(statistics.median(latencies)):>11} {_ms(latencies[int(len(latencies) * 0.99) - 1]):>11}"
+              f"  {'yes' if found else 'NO'}/{'yes' if legacy else 'no'} (page {needle_page})")
+
+
+if __name__ == "__main__":
+    main()
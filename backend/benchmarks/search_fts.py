@@ -0,0 +1,135 @@
+"""Benchmark – ILIKE scan vs tsvector/GIN full-text search.
+
+Seeds a scratch table (``bench_search_documents``) in the configured database
+with synthetic documents, then times the old ``ILIKE '%q%'`` count + page
+queries against the ranked ``@@`` query used by ``DocumentRepository.search``.
+The scratch table is dropped afterwards.
+
+Requires a reachable Postgres (DATABASE_URL). Usage (from ``backend/``):
+    python -m benchmarks.search_fts --docs 200000 --queries 20
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+
+WORDS = (
+    "invoice contract payment agreement tenant landlord warranty delivery schedule "
+    "premium policy claim renewal termination clause liability signature notary "
+    "amount balance account statement receipt purchase order supplier customer"
+).split()
+
+SETUP = """
+CREATE TABLE bench_search_documents (
+    id serial PRIMARY KEY,
+    title varchar(500) NOT NULL,
+    extracted_text text,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    search_vector tsvector
+)
+"""
+
+ILIKE_COUNT = """
+SELECT count(*) FROM bench_search_documents
+WHERE title ILIKE :pattern OR extracted_text ILIKE :pattern
+"""
+ILIKE_PAGE = """
+SELECT id, title FROM bench_search_documents
+WHERE title ILIKE :pattern OR extracted_text ILIKE :pattern
+ORDER BY created_at DESC LIMIT 20
+"""
+FTS_COUNT = """
+SELECT count(*) FROM bench_search_documents
+WHERE search_vector @@ websearch_to_tsquery(CAST(:config AS regconfig), :q)
+"""
+FTS_PAGE = """
+WITH ranked AS (
+    SELECT id, created_at,
+           ts_rank(search_vector, websearch_to_tsquery(CAST(:config AS regconfig), :q)) AS rank
+    FROM bench_search_documents
+    WHERE search_vector @@ websearch_to_tsquery(CAST(:config AS regconfig), :q)
+    ORDER BY rank DESC, created_at DESC LIMIT 20
+)
+SELECT d.id, d.title, ranked.rank,
+       ts_headline(CAST(:config AS regconfig), coalesce(d.extracted_text, ''),
+                   websearch_to_tsquery(CAST(:config AS regconfig), :q))
+FROM bench_search_documents d JOIN ranked ON d.id = ranked.id
+ORDER BY ranked.rank DESC, ranked.created_at DESC
+"""
+
+
+def _document(rng: random.Random) -> dict:
+    body = " ".join(rng.choice(WORDS) for _ in range(rng.randint(200, 1200)))
+    title = " ".join(rng.choice(WORDS) for _ in range(4)).title()
+    return {"title": title, "text": body}
+
+
+async def _time(conn, statements: list[tuple[str, dict]], runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        for sql, params in statements:
+            await conn.execute(text(sql), params)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    engine = create_async_engine(settings.DATABASE_URL)
+    config = settings.SEARCH_LANGUAGE
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS bench_search_documents"))
+        await conn.execute(text(SETUP))
+        for start in range(0, args.docs, 5000):
+            batch = [_document(rng) for _ in range(min(5000, args.docs - start))]
+            await conn.execute(
+                text("INSERT INTO bench_search_documents (title, extracted_text) VALUES (:title, :text)"),
+                batch,
+            )
+        await conn.execute(text(
+            "UPDATE bench_search_documents SET search_vector = "
+            "setweight(to_tsvector(CAST(:config AS regconfig), title), 'A') || "
+            "setweight(to_tsvector(CAST(:config AS regconfig), coalesce(extracted_text, '')), 'B')"
+        ), {"config": config})
+        await conn.execute(text(
+            "CREATE INDEX ON bench_search_documents USING gin (search_vector)"
+        ))
+        await conn.execute(text("ANALYZE bench_search_documents"))
+
+    try:
+        async with engine.connect() as conn:
+            for term in ("warranty", "notary signature"):
+                ilike = await _time(conn, [
+                    (ILIKE_COUNT, {"pattern": f"%{term}%"}),
+                    (ILIKE_PAGE, {"pattern": f"%{term}%"}),
+                ], args.queries)
+                fts = await _time(conn, [
+                    (FTS_COUNT, {"config": config, "q": term}),
+                    (FTS_PAGE, {"config": config, "q": term}),
+                ], args.queries)
+                print(
+                    f"{term!r:<20} ILIKE median={statistics.median(ilike):8.1f}ms   "
+                    f"FTS median={statistics.median(fts):8.1f}ms   "
+                    f"speedup={statistics.median(ilike) / statistics.median(fts):6.1f}x"
+                )
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text("DROP TABLE IF EXISTS bench_search_documents"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""Benchmark – in-process vector index: exact scan vs IVF, single vs batched queries.
+
+Fills a ``VectorIndex`` with clustered random unit vectors (topics plus noise,
+the way chunk embeddings group by subject) quantized to int8 as stored in
+``document_chunks``, then reports build/clustering time, resident vector
+bytes, per-query latency for one-at-a-time and batched queries, and recall@k
+of the IVF index against an exact float32 scan.
+
+Runs fully offline, no database needed.
+
+Usage (from ``backend/``):
+    python -m benchmarks.semantic_search --vectors 10000 100000 --dim 256 --batch 32
+"""
+
+import argparse
+import time
+import uuid
+
+import numpy as np
+
+from app.utils.embeddings import quantize
+from app.utils.vector_index import VectorIndex
+
+
+def _unit(rng: np.random.Generator, n: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _clustered(rng: np.random.Generator, n: int, dim: int, topics: int = 256) -> np.ndarray:
+    centers = _unit(rng, topics, dim)
+    vectors = centers[rng.integers(topics, size=n)] + 0.6 * _unit(rng, n, dim)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _per_query_ms(index: VectorIndex, queries: np.ndarray, k: int, batch: int) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(queries), batch):
+        index.search(queries[start:start + batch], k)
+    return (time.perf_counter() - started) * 1000 / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=128)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=8)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    print(f"{'vectors':>8} {'index':>6} {'build':>9} {'MB':>7} {'1-by-1':>10} {'batched':>10} {'recall@k':>9}")
+    for n in args.vectors:
+        data = _clustered(rng, n, args.dim)
+        # Queries near stored vectors, like a question close to a passage
+        queries = data[rng.choice(n, args.queries)] + 0.3 * _unit(rng, args.queries, args.dim)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+        truth = np.argsort(-(queries @ data.T), axis=1)[:, :args.k]
+
+        codes, scales = quantize(data)
+        doc_ids = [uuid.uuid4() for _ in range(n)]
+        for name, threshold in (("exact", n + 1), ("ivf", 0)):
+            index = VectorIndex(args.dim, nprobe=args.nprobe, ivf_threshold=threshold)
+            started = time.perf_counter()
+            index.add(list(range(n)), doc_ids, codes, scales)
+            build = time.perf_counter() - started
+
+            single = _per_query_ms(index, queries, args.k, 1)
+            batched = _per_query_ms(index, queries, args.k, args.batch)
+            hits = index.search(queries, args.k)
+            recall = np.mean([
+                len({chunk_id for chunk_id, _, _ in found} & set(expected)) / args.k
+                for found, expected in zip(hits, truth.tolist())
+            ])
+            megabytes = (codes.nbytes + scales.nbytes) / 2**20
+            print(f"{n:>8} {name:>6} {build:>8.2f}s {megabytes:>7.1f} {single:>8.2f}ms {batched:>8.2f}ms {recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark – whole-file vs streamed uploads under concurrency.
+
+Simulates N concurrent multipart uploads (Starlette ``UploadFile`` backed by a
+spooled temp file, exactly as the multipart parser hands them to the route) and
+compares the legacy ``await file.read()`` + blocking ``write()`` path against
+``stream_upload_to_disk``. Reports Python peak memory, p50/p99 upload latency
+and the worst event-loop stall seen by a heartbeat task.
+
+Usage (from ``backend/``):
+    python -m benchmarks.upload_streaming --uploads 50 --size-mb 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from starlette.datastructures import UploadFile
+
+from app.utils.storage import stream_upload_to_disk
+
+
+def _make_upload(payload: bytes) -> UploadFile:
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(payload)
+    spooled.seek(0)
+    return UploadFile(spooled, size=len(payload), filename="scan.pdf")
+
+
+async def _legacy(file: UploadFile, dest: Path, max_bytes: int) -> None:
+    content = await file.read()
+    if len(content) > max_bytes:
+        raise ValueError("too large")
+    with open(dest, "wb") as f:
+        f.write(content)
+
+
+async def _streamed(file: UploadFile, dest: Path, max_bytes: int) -> None:
+    await stream_upload_to_disk(file, dest, max_bytes=max_bytes)
+
+
+async def _heartbeat(stop: asyncio.Event, stalls: list[float], interval: float = 0.005) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        stalls.append(loop.time() - start - interval)
+
+
+async def _run(name: str, handler, uploads: int, payload: bytes, workdir: Path) -> None:
+    files = [_make_upload(payload) for _ in range(uploads)]
+    latencies: list[float] = []
+    stalls: list[float] = []
+
+    async def one(i: int, f: UploadFile) -> None:
+        start = time.perf_counter()
+        await handler(f, workdir / f"{name}-{i}.bin", len(payload) + 1)
+        latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    beat = asyncio.create_task(_heartbeat(stop, stalls))
+    tracemalloc.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i, f) for i, f in enumerate(files)))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stop.set()
+    await beat
+
+    for f in files:
+        await f.close()
+    for p in workdir.glob(f"{name}-*"):
+        os.remove(p)
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{name:<9} total={elapsed:6.2f}s  peak_mem={peak / 1024 / 1024:8.1f}MB  "
+        f"p50={statistics.median(latencies) * 1000:7.1f}ms  p99={p99 * 1000:7.1f}ms  "
+        f"max_loop_stall={max(stalls, default=0) * 1000:6.1f}ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=50)
+    parser.add_argument("--size-mb", type=int, default=10)
+    args = parser.parse_args()
+
+    payload = os.urandom(args.size_mb * 1024 * 1024)
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        print(f"{args.uploads} concurrent uploads x {args.size_mb}MB")
+        await _run("legacy", _legacy, args.uploads, payload, workdir)
+        await _run("streamed", _streamed, args.uploads, payload, workdir)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
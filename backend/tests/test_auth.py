@@ -0,0 +1,79 @@
+"""Authentication: cached principals and password hashing off the event loop."""
+
+import asyncio
+import threading
+import time
+
+from app.core import security
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.principals import PRINCIPAL_CACHE_MAX_TTL_SECONDS, principal_cache
+from app.models.user import UserRole
+from app.repositories.user_repo import UserRepository
+from tests.utils import PASSWORD
+
+
+async def _set_role(email: str, role: UserRole) -> None:
+    async with async_session_factory() as session:
+        repo = UserRepository(session)
+        await repo.set_role((await repo.get_by_email(email)).id, role)
+        await session.commit()
+
+
+async def test_role_change_applies_to_the_next_request(client, user):
+    assert (await client.get("/api/admin/users", headers=user.headers)).status_code == 403
+
+    await _set_role(user.email, UserRole.ADMIN)
+    assert (await client.get("/api/admin/users", headers=user.headers)).status_code == 200
+
+    await _set_role(user.email, UserRole.USER)
+    assert (await client.get("/api/admin/users", headers=user.headers)).status_code == 403
+
+
+def test_principal_cache_ttl_is_bounded():
+    assert 0 < principal_cache.ttl <= PRINCIPAL_CACHE_MAX_TTL_SECONDS
+
+
+async def test_password_hashes_run_on_the_bounded_bcrypt_pool(monkeypatch):
+    running, peak, threads = 0, 0, set()
+    lock = threading.Lock()
+
+    def slow_hash(password: str) -> str:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+            threads.add(threading.current_thread().name)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return f"hashed {password}"
+
+    monkeypatch.setattr(security, "hash_password", slow_hash)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    beat = asyncio.create_task(ticker())
+    hashes = await asyncio.gather(
+        *(security.hash_password_async(str(i)) for i in range(settings.PASSWORD_HASH_WORKERS + 3))
+    )
+    beat.cancel()
+
+    assert hashes[0] == "hashed 0"
+    assert peak <= settings.PASSWORD_HASH_WORKERS
+    assert all(name.startswith("bcrypt") for name in threads)
+    # The loop kept serving other tasks while the hashes ran
+    assert ticks > 5
+
+
+async def test_login_checks_the_password(client, user):
+    wrong = await client.post("/api/auth/login", json={"email": user.email, "password": PASSWORD + "x"})
+    right = await client.post("/api/auth/login", json={"email": user.email, "password": PASSWORD})
+
+    assert wrong.status_code == 401
+    assert right.status_code == 200, right.text
@@ -0,0 +1,232 @@
+"""Document upload, update and listing through the API."""
+
+import asyncio
+import hashlib
+import os
+import uuid
+
+import httpx
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import async_session_factory, engine
+from app.repositories.document_repo import DocumentRepository
+from app.services.document_service import DocumentService
+from tests.utils import png_bytes, text_pdf, upload, wait_for_ocr
+
+
+def tag_names(document: dict) -> list[str]:
+    return sorted(tag["name"] for tag in document["tags"])
+
+
+async def test_upload_with_tags(client, user):
+    doc = await upload(client, user, tags="Invoice, 2024 ,invoice")
+    assert tag_names(doc) == ["2024", "invoice"]
+
+    detail = (await client.get(f"/api/documents/{doc['id']}", headers=user.headers)).json()
+    assert tag_names(detail) == ["2024", "invoice"]
+
+
+async def test_upload_reuses_existing_tags(client, user):
+    first = await upload(client, user, tags="contract, shared-tag")
+    second = await upload(client, user, tags="shared-tag, brand-new-tag")
+
+    first_ids = {tag["name"]: tag["id"] for tag in first["tags"]}
+    second_ids = {tag["name"]: tag["id"] for tag in second["tags"]}
+    assert second_ids["shared-tag"] == first_ids["shared-tag"]
+    assert tag_names(second) == ["brand-new-tag", "shared-tag"]
+
+
+async def test_concurrent_uploads_create_a_new_tag_once(client, user):
+    docs = await asyncio.gather(*(upload(client, user, tags="race-tag") for _ in range(5)))
+    assert len({doc["tags"][0]["id"] for doc in docs}) == 1
+
+
+async def test_update_tags(client, user):
+    doc = await upload(client, user, tags="draft")
+    response = await client.put(
+        f"/api/documents/{doc['id']}", json={"title": "Final", "tags": ["final", "signed"]}, headers=user.headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["title"] == "Final"
+    assert tag_names(response.json()) == ["final", "signed"]
+
+    listed = (await client.get("/api/documents", params={"tag": "signed"}, headers=user.headers)).json()
+    assert [item["id"] for item in listed["items"]] == [doc["id"]]
+
+
+async def test_bulk_upload_with_tags(client, user):
+    response = await client.post(
+        "/api/documents/bulk",
+        files=[("files", (f"page-{i}.png", png_bytes(), "image/png")) for i in range(3)],
+        data={"tags": "bulk-tag"},
+        headers=user.headers,
+    )
+    assert response.status_code == 201, response.text
+    for item in response.json()["files"]:
+        detail = (await client.get(f"/api/documents/{item['document_id']}", headers=user.headers)).json()
+        assert tag_names(detail) == ["bulk-tag"]
+
+
+async def test_renaming_a_document_refreshes_the_cached_count(client, user):
+    word = uuid.uuid4().hex
+    doc = await upload(client, user, title=f"draft {word}")
+    listing = {"title": word}
+    assert (await client.get("/api/documents", params=listing, headers=user.headers)).json()["total"] == 1
+
+    response = await client.put(f"/api/documents/{doc['id']}", json={"title": "final"}, headers=user.headers)
+    assert response.status_code == 200
+
+    assert (await client.get("/api/documents", params=listing, headers=user.headers)).json()["total"] == 0
+
+
+async def test_new_ocr_text_refreshes_the_cached_search_count(client, user):
+    word = f"zq{uuid.uuid4().hex[:12]}"
+    doc = await upload(client, user)
+    await wait_for_ocr(client, user, doc["id"])
+    assert (await client.get("/api/search", params={"q": word}, headers=user.headers)).json()["total"] == 0
+
+    async with async_session_factory() as db:
+        await DocumentRepository(db).update_extracted_text(uuid.UUID(doc["id"]), f"Reference {word}")
+        await db.commit()
+
+    assert (await client.get("/api/search", params={"q": word}, headers=user.headers)).json()["total"] == 1
+
+
+async def _blob(sha256: str):
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text("SELECT ref_count, file_path FROM blobs WHERE sha256 = :sha256"), {"sha256": sha256}
+        )
+        return result.one_or_none()
+
+
+async def test_deleting_the_last_reference_removes_the_blob_and_its_file(client, user):
+    content = text_pdf([f"Memo {uuid.uuid4()}"])
+    first = await upload(client, user, content=content, filename="memo.pdf")
+    second = await upload(client, user, content=content, filename="memo.pdf")
+    await wait_for_ocr(client, user, first["id"])
+    sha256 = hashlib.sha256(content).hexdigest()
+    blob = await _blob(sha256)
+    assert blob.ref_count == 2
+
+    response = await client.delete(f"/api/documents/{first['id']}", headers=user.headers)
+    assert response.status_code == 204
+    assert (await _blob(sha256)).ref_count == 1
+    assert os.path.exists(blob.file_path)
+
+    response = await client.delete(f"/api/documents/{second['id']}", headers=user.headers)
+    assert response.status_code == 204
+    assert await _blob(sha256) is None
+    assert not os.path.exists(blob.file_path)
+
+    # The same bytes again are a new blob: stored again and run through OCR again
+    again = await upload(client, user, content=content, filename="memo.pdf")
+    job = await wait_for_ocr(client, user, again["id"])
+    assert job["status"] == "DONE"
+    assert (await _blob(sha256)).ref_count == 1
+    assert os.path.exists(blob.file_path)
+
+
+async def test_duplicate_upload_reuses_the_text_of_an_earlier_copy(client, user):
+    content = text_pdf([f"Invoice {uuid.uuid4()}"])
+    first = await upload(client, user, content=content, filename="invoice.pdf")
+    await wait_for_ocr(client, user, first["id"])
+
+    second = await upload(client, user, content=content, filename="invoice.pdf")
+
+    detail = (await client.get(f"/api/documents/{second['id']}", headers=user.headers)).json()
+    original = (await client.get(f"/api/documents/{first['id']}", headers=user.headers)).json()
+    assert detail["extracted_text"] == original["extracted_text"]
+    response = await client.get(f"/api/documents/{second['id']}/ocr", headers=user.headers)
+    assert response.status_code == 404
+
+
+def _multipart(content: bytes) -> tuple[bytes, dict]:
+    request = httpx.Request("POST", "http://test/api/documents", files={"file": ("big.png", content, "image/png")})
+    return request.read(), {"content-type": request.headers["content-type"]}
+
+
+async def test_oversized_upload_is_rejected_from_its_content_length(client, user, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE_MB", 1)
+
+    async def never_called(*args, **kwargs):
+        raise AssertionError("the body was parsed")
+
+    monkeypatch.setattr(DocumentService, "upload", never_called)
+    body, headers = _multipart(b"x" * (2 * 1024 * 1024))
+
+    response = await client.post("/api/documents", content=body, headers={**headers, **user.headers})
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Upload too large. Maximum: 1MB"
+
+
+async def test_oversized_chunked_upload_stops_as_bytes_arrive(client, user, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE_MB", 1)
+    body, headers = _multipart(b"x" * (4 * 1024 * 1024))
+    sent = 0
+
+    async def chunked():
+        nonlocal sent
+        for start in range(0, len(body), 64 * 1024):
+            sent += 1
+            yield body[start:start + 64 * 1024]
+
+    response = await client.post("/api/documents", content=chunked(), headers={**headers, **user.headers})
+    assert response.status_code == 413
+    assert sent < len(body) // (64 * 1024) // 2
+
+
+async def _walk(client, account, path: str, **params) -> list[str]:
+    """Ids of every page reached by following ``next_cursor``."""
+    ids, cursor = [], None
+    while True:
+        response = await client.get(
+            path, params={**params, **({"cursor": cursor} if cursor else {})}, headers=account.headers
+        )
+        assert response.status_code == 200, response.text
+        body = response.json()
+        ids += [item["id"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+async def test_cursor_pages_list_every_document_once_in_order(client, user):
+    prefix = uuid.uuid4().hex[:8]
+    for i in range(5):
+        await upload(client, user, title=f"{prefix} {i}")
+
+    paged = await _walk(client, user, "/api/documents", title=prefix, size=2)
+
+    response = await client.get("/api/documents", params={"title": prefix, "size": 100}, headers=user.headers)
+    assert paged == [item["id"] for item in response.json()["items"]]
+    assert len(paged) == 5
+
+
+async def test_invalid_cursor_is_rejected(client, user):
+    response = await client.get("/api/documents", params={"cursor": "not-a-cursor"}, headers=user.headers)
+
+    assert response.status_code == 400
+
+
+async def test_list_rows_carry_every_tag_under_a_tag_filter(client, user):
+    tag = f"filter-{uuid.uuid4().hex[:8]}"
+    doc = await upload(client, user, title="Tagged", tags=f"{tag}, zz-other, aa-other")
+
+    response = await client.get("/api/documents", params={"tag": tag}, headers=user.headers)
+
+    assert response.status_code == 200, response.text
+    [item] = response.json()["items"]
+    assert item["id"] == doc["id"]
+    assert [t["name"] for t in item["tags"]] == ["aa-other", tag, "zz-other"]
+    # The same fields the upload response built from the entity
+    assert {**item, "tags": None, "updated_at": None} == {**doc, "tags": None, "updated_at": None}
+
+
+async def test_listing_builds_rows_without_loading_entities(client, user):
+    await upload(client, user)
+    async with async_session_factory() as db:
+        rows, _, _ = await DocumentService(db).list_documents(size=5)
+        assert rows
+        assert len(db.identity_map) == 0
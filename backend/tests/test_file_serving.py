@@ -0,0 +1,55 @@
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from app.core.config import settings
+from app.utils import file_serving
+from app.utils.file_serving import (
+    URL_EXPIRY_STEP_SECONDS, check_signing_secret, signed_preview_url, verify_signature,
+)
+
+SHA256 = "ab" * 32
+
+
+def _expires(url: str) -> int:
+    return int(parse_qs(urlsplit(url).query)["expires"][0])
+
+
+def test_preview_url_expires_within_ttl_plus_one_step(monkeypatch):
+    now = 1_700_000_123
+    monkeypatch.setattr(file_serving.time, "time", lambda: now)
+
+    expires = _expires(signed_preview_url(SHA256, 1, "thumb"))
+
+    assert now + settings.PREVIEW_URL_TTL_SECONDS <= expires
+    assert expires < now + settings.PREVIEW_URL_TTL_SECONDS + URL_EXPIRY_STEP_SECONDS
+    assert settings.PREVIEW_URL_TTL_SECONDS <= 24 * 3600
+
+
+def test_preview_url_is_stable_within_a_step(monkeypatch):
+    now = 1_700_000_100  # a multiple of the step
+    monkeypatch.setattr(file_serving.time, "time", lambda: now + 1)
+    first = signed_preview_url(SHA256, 1, "large")
+    monkeypatch.setattr(file_serving.time, "time", lambda: now + URL_EXPIRY_STEP_SECONDS)
+    second = signed_preview_url(SHA256, 1, "large")
+
+    assert first == second
+    query = parse_qs(urlsplit(first).query)
+    assert verify_signature(urlsplit(first).path, query["md5"][0], _expires(first))
+
+
+@pytest.mark.parametrize("secret", ["", "same-as-jwt"])
+def test_startup_requires_a_dedicated_url_secret(monkeypatch, secret):
+    monkeypatch.setattr(settings, "JWT_SECRET_KEY", "same-as-jwt")
+    monkeypatch.setattr(settings, "FILE_URL_SECRET", secret)
+
+    with pytest.raises(RuntimeError, match="FILE_URL_SECRET"):
+        check_signing_secret()
+
+
+def test_signatures_do_not_depend_on_the_jwt_key(monkeypatch):
+    path = f"/api/previews/{SHA256}/1/thumb"
+    signature = file_serving.sign_path(path, 1_700_000_000)
+    monkeypatch.setattr(settings, "JWT_SECRET_KEY", "rotated")
+
+    assert file_serving.sign_path(path, 1_700_000_000) == signature
@@ -0,0 +1,51 @@
+"""The pooled LLM client: completions and streamed deltas."""
+
+import json
+
+import httpx
+
+from app.core.llm import LLMClient
+
+
+def _client(handler) -> LLMClient:
+    client = LLMClient()
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://llm.test")
+    return client
+
+
+def _event(content: str) -> str:
+    return "data: " + json.dumps({"choices": [{"delta": {"content": content}}]})
+
+
+async def test_stream_yields_deltas_until_done():
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        body = "\n\n".join([
+            ": keep-alive",
+            _event("The total "),
+            "data: " + json.dumps({"choices": [{"delta": {"role": "assistant"}}]}),
+            _event("is 42 EUR."),
+            "data: [DONE]",
+            _event("never sent"),
+        ])
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    client = _client(handler)
+    try:
+        assert [delta async for delta in client.stream([])] == ["The total ", "is 42 EUR."]
+    finally:
+        await client.stop()
+
+
+async def test_calls_share_one_http_client():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"choices": [{"message": {"content": "Acme Corp."}}]})
+
+    client = _client(handler)
+    try:
+        http = await client._http()
+        assert await client.complete([]) == "Acme Corp."
+        assert await client.complete([]) == "Acme Corp."
+        assert await client._http() is http
+    finally:
+        await client.stop()
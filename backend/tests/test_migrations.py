@@ -0,0 +1,66 @@
+"""Alembic migrations: a pre-Alembic database upgrades to exactly the models' schema."""
+
+import uuid
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import Connection, text
+
+from app.core.database import ALEMBIC_INI, Base, engine
+
+LEGACY_TEXT = "Quarterly report, legacy column"
+
+
+def _migrate(conn: Connection, direction: str, revision: str) -> None:
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["connection"] = conn
+    getattr(command, direction)(config, revision)
+
+
+def _insert_legacy_document(conn: Connection) -> uuid.UUID:
+    user_id, doc_id = uuid.uuid4(), uuid.uuid4()
+    conn.execute(
+        text(
+            "INSERT INTO users (id, email, password_hash, role, created_at, updated_at)"
+            " VALUES (:id, 'legacy@example.com', 'x', 'USER', now(), now())"
+        ),
+        {"id": user_id},
+    )
+    conn.execute(
+        text(
+            "INSERT INTO documents (id, title, file_path, file_type, file_size, extracted_text, is_deleted,"
+            " uploaded_by, created_at, updated_at)"
+            " VALUES (:id, 'Report', 'uploads/report.pdf', 'pdf', 1024, :text, false, :user_id, now(), now())"
+        ),
+        {"id": doc_id, "text": LEGACY_TEXT, "user_id": user_id},
+    )
+    return doc_id
+
+
+async def test_baseline_database_upgrades_to_the_models_and_back(app):
+    async with engine.connect() as conn:
+        # Everything happens in a scratch schema inside one transaction that is rolled back
+        await conn.execute(text("CREATE SCHEMA migration_test"))
+        await conn.execute(text("SET LOCAL search_path TO migration_test"))
+        await conn.run_sync(_migrate, "upgrade", "0001")
+        doc_id = await conn.run_sync(_insert_legacy_document)
+
+        await conn.run_sync(_migrate, "upgrade", "head")
+
+        diff = await conn.run_sync(lambda c: compare_metadata(MigrationContext.configure(c), Base.metadata))
+        assert diff == []
+        body = await conn.scalar(
+            text("SELECT body FROM document_contents WHERE document_id = :id"), {"id": doc_id}
+        )
+        assert body == LEGACY_TEXT
+        found = await conn.scalar(
+            text("SELECT id FROM documents WHERE search_vector @@ websearch_to_tsquery('english', 'quarterly report')")
+        )
+        assert found == doc_id
+
+        await conn.run_sync(_migrate, "downgrade", "0001")
+        restored = await conn.scalar(text("SELECT extracted_text FROM documents WHERE id = :id"), {"id": doc_id})
+        assert restored == LEGACY_TEXT
+        await conn.rollback()
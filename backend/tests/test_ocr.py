@@ -0,0 +1,96 @@
+import signal
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from app.core.config import settings
+from app.utils.ocr import PREPROCESS_STAGES, otsu_threshold, preprocess_image
+from app.workers import ocr_worker
+from app.workers.ocr_worker import OCRWorkerPool
+
+
+@pytest.mark.parametrize("colour", ["white", "black", (200, 190, 170)])
+def test_blank_page_passes_through_preprocessing(colour):
+    image, dpi, _ = preprocess_image(Image.new("RGB", (2550, 3300), colour), 300, list(PREPROCESS_STAGES))
+
+    assert dpi == 300
+    assert np.asarray(image).min() == 255
+
+
+def test_otsu_threshold_of_a_single_grey_level():
+    assert otsu_threshold([0] * 255 + [100]) == -1
+    assert otsu_threshold([0] * 256) == -1
+
+
+def test_otsu_threshold_separates_ink_from_paper():
+    histogram = [0] * 256
+    histogram[30], histogram[220] = 50, 950
+
+    assert 30 <= otsu_threshold(histogram) < 220
+
+
+def test_page_with_text_keeps_its_ink():
+    image = Image.new("L", (1275, 1650), 235)
+    draw = ImageDraw.Draw(image)
+    for y in range(100, 1500, 60):
+        draw.rectangle((100, y, 1100, y + 12), fill=20)
+
+    binary, _, _ = preprocess_image(image, 150, ["binarize"])
+
+    assert (np.asarray(binary) == 0).mean() > 0.1
+
+
+def _echo(file_path, raise_errors):
+    return file_path
+
+
+def _hang_where_the_alarm_cannot_reach(file_path, raise_errors):
+    # Like native code that never returns to the interpreter: the deadline alarm stays pending
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+    time.sleep(60)
+
+
+async def test_step_stuck_past_its_deadline_ends_its_process_and_the_pool_is_replaced(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_JOB_TIMEOUT_SECONDS", 5)
+    monkeypatch.setattr(ocr_worker, "TIMEOUT_GRACE_SECONDS", 1)
+    monkeypatch.setattr(ocr_worker, "extract_text_from_file", _echo)
+    pool = OCRWorkerPool()
+    pool._executor = first = pool._new_executor()
+    try:
+        assert await pool._extract("warm-up.png") == "warm-up.png"
+
+        monkeypatch.setattr(ocr_worker, "extract_text_from_file", _hang_where_the_alarm_cannot_reach)
+        started = time.monotonic()
+        with pytest.raises(BrokenProcessPool):
+            await pool._extract("stuck.png")
+        assert time.monotonic() - started < 10
+        assert pool._executor is not first
+
+        monkeypatch.setattr(ocr_worker, "extract_text_from_file", _echo)
+        assert await pool._extract("next.png") == "next.png"
+    finally:
+        pool._executor.shutdown(cancel_futures=True)
+
+
+def _text_layer(file_path):
+    return ["", "Typed cover letter", "  "]
+
+
+def _ocr_page(file_path, page_index):
+    return f"Scanned page {page_index + 1}"
+
+
+async def test_pdf_pages_without_a_text_layer_are_ocred_and_kept_in_order(monkeypatch):
+    monkeypatch.setattr(ocr_worker, "pdf_page_texts", _text_layer)
+    monkeypatch.setattr(ocr_worker, "ocr_pdf_page", _ocr_page)
+    pool = OCRWorkerPool()
+    pool._executor = pool._new_executor()
+    try:
+        text = await pool._extract("scan.pdf")
+    finally:
+        pool._executor.shutdown(cancel_futures=True)
+
+    assert text == "[Page 1]\nScanned page 1\n\n[Page 2]\nTyped cover letter\n\n[Page 3]\nScanned page 3"
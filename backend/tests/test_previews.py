@@ -0,0 +1,47 @@
+"""Page previews: rendering and the cached preview endpoint."""
+
+import pytest
+from PIL import Image
+
+from app.utils.previews import PREVIEW_SIZES, PageOutOfRange, render_preview
+from tests.utils import text_pdf, upload
+
+
+def test_image_preview_fits_its_box(tmp_path):
+    source, dest = tmp_path / "scan.png", tmp_path / "previews" / "thumb.webp"
+    Image.new("RGB", (1000, 500), "white").save(source)
+
+    written = render_preview(str(source), str(dest), 1, PREVIEW_SIZES["thumb"], "webp", 80)
+
+    assert written == dest.stat().st_size
+    assert Image.open(dest).size == (200, 100)
+    assert [p.name for p in dest.parent.iterdir()] == ["thumb.webp"]
+
+
+def test_pdf_page_preview_and_missing_page(tmp_path):
+    source = tmp_path / "letter.pdf"
+    source.write_bytes(text_pdf(["Dear customer,"]))
+
+    render_preview(str(source), str(tmp_path / "page1.jpeg"), 1, PREVIEW_SIZES["small"], "jpeg", 80)
+
+    assert max(Image.open(tmp_path / "page1.jpeg").size) == PREVIEW_SIZES["small"]
+    with pytest.raises(PageOutOfRange):
+        render_preview(str(source), str(tmp_path / "page2.jpeg"), 2, PREVIEW_SIZES["small"], "jpeg", 80)
+
+
+async def test_preview_endpoint_serves_a_cacheable_image(client, user):
+    doc = await upload(client, user)
+    path = f"/api/documents/{doc['id']}/preview"
+
+    response = await client.get(path, params={"size": "thumb"}, headers=user.headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("image/")
+    assert "immutable" in response.headers["cache-control"]
+
+    again = await client.get(
+        path, params={"size": "thumb"}, headers={**user.headers, "If-None-Match": response.headers["etag"]}
+    )
+    assert again.status_code == 304
+
+    assert (await client.get(path, params={"page": 2}, headers=user.headers)).status_code == 404
+    assert (await client.get(path, params={"size": "huge"}, headers=user.headers)).status_code == 404
@@ -0,0 +1,261 @@
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.llm import llm_client
+from app.models.document import Document, DocumentContent
+from app.models.qa import QAMessage, QASession
+from app.repositories.document_repo import DocumentRepository
+from app.repositories.qa_repo import QARepository
+from app.services.context_builder import (
+    MESSAGE_OVERHEAD_TOKENS,
+    ContextBuilder,
+    Conversation,
+    check_question,
+    is_follow_up,
+)
+from app.services.qa_service import QAService, content_version
+from app.services.retrieval_service import select_within_budget
+from app.utils.answer_cache import CachedAnswer, answer_cache, normalize_question
+from app.utils.bm25 import Chunk
+from app.utils.tokens import count_tokens
+from app.exceptions.http_exceptions import BadRequestException
+from tests.utils import upload, wait_for_ocr
+
+
+def _document(sha256: str | None, body: str, title: str = "Memo") -> Document:
+    return Document(
+        id=uuid.uuid4(),
+        title=title,
+        sha256=sha256,
+        updated_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        content=DocumentContent(body=body, char_count=len(body)),
+    )
+
+
+async def test_same_length_ocr_text_gets_a_new_content_version(client, user):
+    doc = await upload(client, user)
+    await wait_for_ocr(client, user, doc["id"])
+    versions = []
+    for text in ("Total: 100 EUR", "Total: 900 EUR"):
+        async with async_session_factory() as db:
+            await DocumentRepository(db).update_extracted_text(uuid.UUID(doc["id"]), text)
+            await db.commit()
+        async with async_session_factory() as db:
+            versions.append(content_version(await DocumentRepository(db).get_by_id(uuid.UUID(doc["id"]))))
+
+    assert versions[0] != versions[1]
+
+
+def _conversation(*contents: str, summary: str | None = None) -> Conversation:
+    turns = [
+        QAMessage(id=i, role="user" if i % 2 == 0 else "assistant", content=content)
+        for i, content in enumerate(contents)
+    ]
+    return Conversation(1, turns, summary)
+
+
+@pytest.mark.parametrize("question", ["Why?", "And who signed it?", "What about the second one?", "It was late?"])
+def test_short_questions_leaning_on_the_conversation_are_follow_ups(question):
+    assert is_follow_up(question, _conversation("Who sent the invoice?", "Acme Corp."))
+
+
+@pytest.mark.parametrize("question", [
+    "What is the total amount of the invoice?",
+    "Who signed the contract?",
+    "What does this document say about the payment terms and the late fees?",
+    "Is there more than one signature on the last page?",
+])
+def test_self_contained_questions_are_not_follow_ups(question):
+    assert not is_follow_up(question, _conversation("Who sent the invoice?", "Acme Corp."))
+
+
+def test_nothing_is_a_follow_up_without_a_conversation():
+    assert not is_follow_up("And who signed it?", Conversation())
+
+
+class _Retrieval:
+    def __init__(self, chunks: list[Chunk]):
+        self.chunks = chunks
+
+    async def retrieve(self, doc, question, token_budget=None):
+        return select_within_budget(self.chunks, token_budget)
+
+
+def _prompt_tokens(messages: list[dict]) -> int:
+    return sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+async def test_prompt_stays_within_budget_for_long_input():
+    chunks = [
+        Chunk(position=i, content=text, page=i + 1, token_count=count_tokens(text))
+        for i, text in enumerate(f"Paragraph {i} " + "lorem ipsum dolor " * 80 for i in range(20))
+    ]
+    builder = ContextBuilder(qa_repo=None, retrieval=_Retrieval(chunks))
+    conversation = _conversation(*(f"Turn {i} " + "words " * 300 for i in range(8)), summary="line\n" * 300)
+    question = "Summarise the clause about " + "indemnities and " * 250 + "liability?"
+    check_question(question)
+
+    messages = await builder.build(_document("cd" * 32, "text"), question, conversation)
+
+    assert _prompt_tokens(messages) <= settings.QA_PROMPT_TOKENS
+    assert messages[-1]["content"].endswith(question)
+    assert "[Page 1]" in messages[-1]["content"]
+
+
+async def test_prompt_keeps_recent_turns_and_summary_when_they_fit():
+    chunks = [Chunk(position=0, content="The total is 42 EUR.", page=1, token_count=6)]
+    builder = ContextBuilder(qa_repo=None, retrieval=_Retrieval(chunks))
+    conversation = _conversation("Who sent it?", "Acme Corp.", summary="User: What is this?")
+
+    messages = await builder.build(_document("cd" * 32, "text"), "What is the total?", conversation)
+
+    assert "User: What is this?" in messages[0]["content"]
+    assert [m["content"] for m in messages[1:-1]] == ["Who sent it?", "Acme Corp."]
+
+
+def test_question_too_long_for_the_prompt_is_rejected():
+    with pytest.raises(BadRequestException):
+        check_question("word " * settings.QA_PROMPT_TOKENS)
+
+
+async def test_ask_rejects_a_question_too_long_for_the_prompt(client, user):
+    response = await client.post(
+        f"/api/qa/{uuid.uuid4()}", json={"question": "word " * settings.QA_PROMPT_TOKENS}, headers=user.headers
+    )
+
+    assert response.status_code == 400
+
+
+class _History:
+    def __init__(self, session: QASession, messages: list[QAMessage]):
+        self.session = session
+        self.messages = messages
+
+    async def get_latest_session(self, user_id, document_id):
+        return self.session
+
+    async def get_messages(self, session_id, limit):
+        return sorted(self.messages, key=lambda m: m.id, reverse=True)[:limit]
+
+
+async def test_conversation_returns_the_extended_summary_without_touching_the_session(monkeypatch):
+    monkeypatch.setattr(settings, "QA_HISTORY_MESSAGES", 4)
+    session = QASession(id=1)
+    messages = [
+        QAMessage(id=i, role="user" if i % 2 else "assistant", content=f"Message {i}.") for i in range(1, 7)
+    ]
+    builder = ContextBuilder(qa_repo=_History(session, messages), retrieval=None)
+
+    conversation = await builder.conversation(uuid.uuid4(), uuid.uuid4())
+
+    assert [m.id for m in conversation.turns] == [5, 6]
+    assert conversation.summary == "User: Message 3.\nAssistant: Message 4."
+    assert conversation.summary_until_id == 4
+    assert session.summary is None and session.summary_until_id is None
+
+
+async def _answerable(client, user, text: str) -> dict:
+    doc = await upload(client, user)
+    await wait_for_ocr(client, user, doc["id"])
+    async with async_session_factory() as db:
+        await DocumentRepository(db).update_extracted_text(uuid.UUID(doc["id"]), text)
+        await db.commit()
+    return doc
+
+
+@pytest.mark.parametrize("path", ["", "/stream"])
+async def test_asking_saves_the_summary_of_turns_leaving_the_window(client, user, monkeypatch, path):
+    doc = await _answerable(client, user, "The total is 42 EUR.")
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "QA_HISTORY_MESSAGES", 4)
+
+    async def complete(self, messages):
+        return "It is 42 EUR."
+
+    async def stream(messages):
+        yield "It is 42 EUR."
+
+    monkeypatch.setattr(QAService, "_call_llm", complete)
+    monkeypatch.setattr(llm_client, "stream", stream)
+
+    for question in ("What is the total amount?", "Who issued the invoice?", "When is the payment due?"):
+        response = await client.post(f"/api/qa/{doc['id']}{path}", json={"question": question}, headers=user.headers)
+        assert response.status_code == 200, response.text
+
+    async with async_session_factory() as db:
+        session = await db.scalar(select(QASession).where(QASession.document_id == uuid.UUID(doc["id"])))
+        first_turn = await QARepository(db).get_messages(session.id, limit=6)
+    assert session.summary == "User: What is the total amount?\nAssistant: It is 42 EUR."
+    assert session.summary_until_id == first_turn[-2].id
+
+
+def _unit(*values: float) -> np.ndarray:
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_question_normalization_ignores_case_punctuation_and_spacing():
+    assert normalize_question("  What is the TOTAL,  amount? ") == "what is the total amount"
+
+
+def test_answer_cache_matches_near_duplicates_of_the_same_document_version():
+    doc_id = uuid.uuid4()
+    answer_cache.store(doc_id, "v1", "what is the total", CachedAnswer("42 EUR", _unit(1, 0, 0), 1.5))
+
+    assert answer_cache.lookup(doc_id, "v1", "what is the total", _unit(0, 1, 0)).answer == "42 EUR"
+    assert answer_cache.lookup(doc_id, "v1", "how much is the total", _unit(1, 0.05, 0)).answer == "42 EUR"
+    assert answer_cache.lookup(doc_id, "v1", "who signed it", _unit(0, 1, 0)) is None
+    assert answer_cache.lookup(doc_id, "v2", "what is the total", _unit(1, 0, 0)) is None
+    assert answer_cache.lookup(uuid.uuid4(), "v1", "what is the total", _unit(1, 0, 0)) is None
+
+
+async def test_repeated_question_is_answered_from_the_cache(client, user, monkeypatch):
+    doc = await _answerable(client, user, "The total is 42 EUR.")
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    calls = []
+
+    async def complete(self, messages):
+        calls.append(messages)
+        return "It is 42 EUR."
+
+    monkeypatch.setattr(QAService, "_call_llm", complete)
+
+    answers = []
+    for question in ("What is the total amount?", "what is the total amount"):
+        response = await client.post(f"/api/qa/{doc['id']}", json={"question": question}, headers=user.headers)
+        assert response.status_code == 200, response.text
+        answers.append(response.json())
+
+    assert [a["cached"] for a in answers] == [False, True]
+    assert answers[1]["answer"] == "It is 42 EUR."
+    assert len(calls) == 1
+
+
+async def test_each_answer_returns_only_its_turn_and_history_pages_back(client, user):
+    doc = await _answerable(client, user, "The total is 42 EUR. Acme Corp. issued the invoice.")
+    turns = []
+    for question in ("What is the total?", "Who issued the invoice?", "When is it due?"):
+        response = await client.post(f"/api/qa/{doc['id']}", json={"question": question}, headers=user.headers)
+        assert response.status_code == 200, response.text
+        turns.append(response.json())
+
+    assert [t["messages"][0]["content"] for t in turns] == [
+        "What is the total?", "Who issued the invoice?", "When is it due?"
+    ]
+    assert all(len(t["messages"]) == 2 for t in turns)
+    assert turns[0]["history_cursor"] is None
+
+    earlier, cursor = [], turns[-1]["history_cursor"]
+    while cursor:
+        page = (await client.get(
+            f"/api/qa/{doc['id']}/history", params={"cursor": cursor, "size": 3}, headers=user.headers
+        )).json()
+        earlier = page["messages"] + earlier
+        cursor = page["next_cursor"]
+    assert earlier == turns[0]["messages"] + turns[1]["messages"]
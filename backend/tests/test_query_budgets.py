@@ -0,0 +1,233 @@
+"""Query-count and latency budgets per endpoint.
+
+Every endpoint is called as a user who owns many documents, tags and Q&A
+turns. A relationship that starts loading implicitly again shows up as
+queries – and time – that grow with that data, so the query budgets are tight
+upper bounds: raise one only together with the change that needs it.
+"""
+
+import os
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import httpx
+import pytest
+
+from tests.utils import Account, PASSWORD, png_bytes, register, text_pdf, upload, wait_for_ocr
+
+OWNED_DOCUMENTS = 40
+QA_TURNS = 6
+RUNS = 3  # latency is the median of this many calls
+# Multiplies every latency budget, for slow machines
+LATENCY_SCALE = float(os.environ.get("TEST_LATENCY_SCALE", "1"))
+
+Prepare = Callable[[httpx.AsyncClient, "World"], Awaitable[tuple[dict, dict]]]
+
+
+@dataclass
+class World:
+    """A heavy user and the ids and URLs the endpoint paths are formatted with."""
+    account: Account
+    values: dict[str, str]
+
+
+@dataclass
+class Budget:
+    method: str
+    path: str  # formatted with World.values and the values from ``prepare``
+    queries: int
+    latency_ms: int
+    status: int = 200
+    admin: bool = False
+    request: dict = field(default_factory=dict)
+    # Fresh state per call for endpoints that consume it: returns (path values, request kwargs)
+    prepare: Prepare | None = None
+
+
+async def query_count(client: httpx.AsyncClient, account: Account, path: str) -> int:
+    response = await client.get(path, headers=account.headers)
+    assert response.status_code == 200, response.text
+    return int(response.headers["X-DB-Queries"])
+
+
+# ── Per-call state ───────────────────────────────────
+async def _new_email(client, world):
+    return {}, {"json": {"email": f"new-{uuid.uuid4().hex[:12]}@example.com", "password": PASSWORD}}
+
+
+async def _new_file(client, world):
+    return {}, {"files": {"file": ("scan.png", png_bytes(), "image/png")}, "data": {"tags": "invoice, 2024"}}
+
+
+async def _new_files(client, world):
+    return {}, {"files": [("files", (f"page-{i}.png", png_bytes(), "image/png")) for i in range(5)]}
+
+
+async def _new_upload_session(client, world):
+    response = await client.post(
+        "/api/documents/uploads", json={"filename": "large.png", "size": 1024}, headers=world.account.headers
+    )
+    return {"upload": response.json()["id"]}, {}
+
+
+async def _new_chunk(client, world):
+    content = png_bytes()
+    response = await client.post(
+        "/api/documents/uploads", json={"filename": "large.png", "size": len(content)}, headers=world.account.headers
+    )
+    return {"upload": response.json()["id"]}, {"content": content}
+
+
+async def _new_upload_with_content(client, world):
+    content = png_bytes()
+    response = await client.post(
+        "/api/documents/uploads", json={"filename": "large.png", "size": len(content)}, headers=world.account.headers
+    )
+    upload_id = response.json()["id"]
+    await client.put(
+        f"/api/documents/uploads/{upload_id}", params={"offset": 0}, content=content, headers=world.account.headers
+    )
+    return {"upload": upload_id}, {}
+
+
+async def _new_document(client, world):
+    return {"victim": (await upload(client, world.account))["id"]}, {}
+
+
+BUDGETS = [
+    # Auth
+    Budget("POST", "/api/auth/register", 4, 500, status=201, prepare=_new_email),
+    Budget("POST", "/api/auth/login", 1, 500, request={"json": {"email": "{email}", "password": PASSWORD}}),
+    Budget("POST", "/api/auth/refresh", 1, 200, request={"json": {"refresh_token": "{refresh_token}"}}),
+    Budget("GET", "/api/auth/me", 1, 200),
+    # Uploads
+    Budget("POST", "/api/documents", 7, 500, status=201, prepare=_new_file),
+    Budget("POST", "/api/documents/bulk", 7, 1000, status=201, prepare=_new_files),
+    Budget("GET", "/api/documents/batches/{batch}", 3, 200),
+    Budget("POST", "/api/documents/uploads", 2, 200, status=201,
+           request={"json": {"filename": "large.pdf", "size": 10_000_000}}),
+    Budget("GET", "/api/documents/uploads/{upload}", 1, 200, prepare=_new_upload_session),
+    Budget("PUT", "/api/documents/uploads/{upload}?offset=0", 2, 300, prepare=_new_chunk),
+    Budget("POST", "/api/documents/uploads/{upload}/complete", 9, 500, status=201,
+           prepare=_new_upload_with_content),
+    Budget("DELETE", "/api/documents/uploads/{upload}", 2, 200, status=204, prepare=_new_upload_session),
+    # Documents
+    Budget("GET", "/api/documents", 2, 300),
+    Budget("GET", "/api/documents?tag=invoice&count=estimate", 2, 300),
+    Budget("GET", "/api/documents/{doc}", 4, 300),
+    Budget("GET", "/api/documents/{doc}/file", 3, 300),
+    Budget("GET", "/api/documents/{doc}/preview", 3, 2000),
+    Budget("GET", "/api/documents/{doc}/ocr", 4, 200),
+    Budget("PUT", "/api/documents/{doc}", 9, 300, request={"json": {"title": "Renamed", "tags": ["a", "b"]}}),
+    Budget("DELETE", "/api/documents/{victim}", 8, 300, status=204, prepare=_new_document),
+    Budget("GET", "{file_url}", 0, 200),
+    Budget("GET", "{preview_url}", 1, 2000),
+    # Search
+    Budget("GET", "/api/search?q=quarterly+report", 2, 300),
+    Budget("GET", "/api/search?q=quarterly+report&mode=semantic", 4, 500),
+    Budget("GET", "/api/search?q=quarterly+report&mode=hybrid", 5, 500),
+    # Q&A
+    Budget("POST", "/api/qa/{doc}", 7, 500, request={"json": {"question": "What was the revenue?"}}),
+    Budget("POST", "/api/qa/{doc}/stream", 6, 500, request={"json": {"question": "Who signed it?"}}),
+    Budget("GET", "/api/qa/{doc}/history", 2, 300),
+    # Admin
+    Budget("GET", "/api/admin/users", 2, 300, admin=True),
+    Budget("GET", "/api/admin/stats", 3, 200, admin=True),
+    Budget("GET", "/api/admin/stats/series?interval=hour&days=2", 1, 200, admin=True),
+    Budget("GET", "/api/admin/caches", 0, 200, admin=True),
+    Budget("DELETE", "/api/admin/documents/{victim}", 8, 300, status=204, admin=True, prepare=_new_document),
+    # Health
+    Budget("GET", "/health", 0, 50),
+]
+
+
+@pytest.fixture(scope="module")
+async def world(client) -> World:
+    account = await register(client)
+    response = await client.post(
+        "/api/documents/bulk",
+        files=[("files", (f"page-{i}.png", png_bytes(), "image/png")) for i in range(OWNED_DOCUMENTS)],
+        data={"tags": "invoice, archive, 2024"},
+        headers=account.headers,
+    )
+    assert response.status_code == 201, response.text
+    batch = response.json()["id"]
+
+    lines = ["Quarterly report for the board.", "Revenue grew twelve percent.", "Signed by the treasurer."]
+    doc = await upload(client, account, title="Quarterly report", tags="invoice, report",
+                       content=text_pdf(lines), filename="report.pdf")
+    assert (await wait_for_ocr(client, account, doc["id"]))["status"] == "DONE"
+    for turn in range(QA_TURNS):
+        response = await client.post(
+            f"/api/qa/{doc['id']}", json={"question": f"Question number {turn}?"}, headers=account.headers
+        )
+        assert response.status_code == 200, response.text
+
+    detail = (await client.get(f"/api/documents/{doc['id']}", headers=account.headers)).json()
+    values = {
+        "email": account.email,
+        "refresh_token": account.refresh_token,
+        "batch": batch,
+        "doc": doc["id"],
+        "file_url": detail["file_url"],
+        "preview_url": detail["preview_url"],
+    }
+    return World(account, values)
+
+
+def _format(value, values: dict):
+    if isinstance(value, str):
+        return value.format(**values)
+    if isinstance(value, dict):
+        return {k: _format(v, values) for k, v in value.items()}
+    return value
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=lambda b: f"{b.method} {b.path}")
+async def test_endpoint_budget(client, world, admin, budget: Budget):
+    counts, seconds = [], []
+    for _ in range(RUNS):
+        values, request = dict(world.values), _format(budget.request, world.values)
+        if budget.prepare:
+            extra_values, extra_request = await budget.prepare(client, world)
+            values.update(extra_values)
+            request.update(extra_request)
+        headers = admin.headers if budget.admin else world.account.headers
+        started = time.perf_counter()
+        response = await client.request(budget.method, budget.path.format(**values), headers=headers, **request)
+        seconds.append(time.perf_counter() - started)
+        assert response.status_code == budget.status, response.text
+        counts.append(int(response.headers["X-DB-Queries"]))
+
+    latency_ms = statistics.median(seconds) * 1000
+    assert max(counts) <= budget.queries, f"{max(counts)} queries, budget {budget.queries}"
+    assert latency_ms <= budget.latency_ms * LATENCY_SCALE, f"{latency_ms:.0f}ms, budget {budget.latency_ms}ms"
+
+
+async def test_query_counts_do_not_grow_with_owned_rows(client):
+    """The same reads cost the same queries before and after the user owns many more rows."""
+    account = await register(client)
+    doc = await upload(client, account, content=text_pdf(["A short memo."]), filename="memo.pdf")
+    await wait_for_ocr(client, account, doc["id"])
+    await client.post(f"/api/qa/{doc['id']}", json={"question": "What is it?"}, headers=account.headers)
+    paths = [
+        "/api/auth/me",
+        "/api/documents",
+        f"/api/documents/{doc['id']}",
+        f"/api/qa/{doc['id']}/history",
+    ]
+    before = [await query_count(client, account, path) for path in paths]
+
+    response = await client.post(
+        "/api/documents/bulk",
+        files=[("files", (f"more-{i}.png", png_bytes(), "image/png")) for i in range(OWNED_DOCUMENTS)],
+        headers=account.headers,
+    )
+    assert response.status_code == 201, response.text
+    for turn in range(QA_TURNS):
+        await client.post(f"/api/qa/{doc['id']}", json={"question": f"And {turn}?"}, headers=account.headers)
+
+    assert [await query_count(client, account, path) for path in paths] == before
@@ -0,0 +1,111 @@
+"""Chunk-level retrieval and BM25 keyword answers for document Q&A."""
+
+import math
+import uuid
+
+import pytest
+
+from app.core.database import async_session_factory
+from app.repositories.document_repo import DocumentRepository
+from app.services.retrieval_service import RetrievalService, select_within_budget
+from app.utils.bm25 import BM25Index, Chunk, chunk_text, snippet, term_frequencies, tokenize
+from app.workers.ocr_worker import save_ocr_result
+from tests.utils import upload, wait_for_ocr
+
+
+def test_chunks_follow_page_markers_and_stay_under_the_size_limit():
+    text = "[Page 1]\nIntro paragraph.\n\nSecond paragraph.\n\n[Page 2]\n" + "word " * 400
+
+    chunks = chunk_text(text, max_chars=500)
+
+    assert chunks[0].page == 1
+    assert chunks[0].content == "Intro paragraph.\n\nSecond paragraph."
+    assert len(chunks) > 2
+    assert all(c.page == 2 and len(c.content) <= 500 for c in chunks[1:])
+    assert [c.position for c in chunks] == list(range(len(chunks)))
+
+
+def test_budget_takes_the_best_chunks_that_fit_in_document_order():
+    chunks = [Chunk(i, f"Chunk {i}", token_count=tokens) for i, tokens in enumerate([50, 30, 40])]
+    ranked = [chunks[2], chunks[0], chunks[1]]
+
+    assert select_within_budget(ranked, 75) == [chunks[1], chunks[2]]
+    # The best chunk is kept even when it alone is over the budget
+    assert select_within_budget(ranked, 10) == [chunks[2]]
+
+
+async def test_question_retrieves_the_chunk_that_answers_it(client, user):
+    doc_id = uuid.UUID((await upload(client, user))["id"])
+    pages = [f"Section {n} covers delivery schedules and invoicing for region {n}." for n in range(1, 31)]
+    pages[16] = "The warranty on the pump lasts 36 months from installation."
+    text = "\n\n".join(f"[Page {n}]\n{body}" for n, body in enumerate(pages, start=1))
+    async with async_session_factory() as db:
+        await DocumentRepository(db).update_extracted_text(doc_id, text)
+        await RetrievalService(db).index_document(doc_id, text)
+        await db.commit()
+
+    async with async_session_factory() as db:
+        doc = await DocumentRepository(db).get_by_id(doc_id, with_text=True)
+        chunks = await RetrievalService(db).retrieve(doc, "How long does the pump warranty last?", k=2)
+
+    assert 17 in [c.page for c in chunks]
+    assert len(chunks) <= 2
+
+
+def _reference_bm25(docs: list[list[str]], query: str, k1: float = 1.5, b: float = 0.75) -> list[float]:
+    average = sum(map(len, docs)) / len(docs)
+    scores = []
+    for doc in docs:
+        score = 0.0
+        for term in set(tokenize(query)):
+            df = sum(term in d for d in docs)
+            freq = doc.count(term)
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            score += idf * freq * (k1 + 1) / (freq + k1 * (1 - b + b * len(doc) / average))
+        scores.append(score)
+    return scores
+
+
+def test_bm25_scores_match_the_okapi_formula():
+    texts = [
+        "The invoice total is 42 EUR, payable within 30 days.",
+        "Late payment of the invoice incurs a fee of 5 EUR per week.",
+        "The contract was signed by Acme Corp. and Globex.",
+    ]
+    index = BM25Index([term_frequencies(t) for t in texts])
+    query = "invoice payment fee"
+
+    expected = _reference_bm25([tokenize(t) for t in texts], query)
+    scores = index.scores(query)
+
+    assert set(scores) == {0, 1}
+    for unit, score in scores.items():
+        assert score == pytest.approx(expected[unit], rel=1e-5)
+    assert [unit for unit, _ in index.top(query, 1)] == [1]
+    assert index.top("unrelated words", 3) == []
+
+
+def test_snippet_centres_on_the_sentence_matching_the_query():
+    text = "Deliveries arrive on Mondays. " * 10 + "The warranty lasts 36 months. " + "Returns are free. " * 10
+
+    excerpt = snippet(text, "how long is the warranty", max_chars=80)
+
+    assert "The warranty lasts 36 months." in excerpt
+    assert len(excerpt.strip("…")) <= 80
+    assert excerpt.startswith("…") and excerpt.endswith("…")
+
+
+async def test_offline_answer_quotes_the_best_matching_paragraph(client, user):
+    doc = await upload(client, user)
+    await wait_for_ocr(client, user, doc["id"])
+    text = "[Page 1]\nDeliveries arrive on Mondays.\n\n[Page 2]\nThe warranty on the pump lasts 36 months."
+    assert await save_ocr_result(uuid.UUID(doc["id"]), text, share=False)
+
+    response = await client.post(
+        f"/api/qa/{doc['id']}", json={"question": "How long is the pump warranty?"}, headers=user.headers
+    )
+
+    assert response.status_code == 200, response.text
+    answer = response.json()["answer"]
+    assert "[Page 2] The warranty on the pump lasts 36 months." in answer
+    assert "Mondays" not in answer
@@ -0,0 +1,58 @@
+"""Search: keyset paging and semantic index synchronisation."""
+
+import uuid
+
+from app.core.database import async_session_factory
+from app.services.retrieval_service import RetrievalService
+from app.services.search_service import SearchService, missing_ranges
+from tests.utils import text_pdf, upload, wait_for_ocr
+
+
+def test_missing_ranges():
+    assert missing_ranges(1, 10, [1, 2, 5, 9]) == [(3, 4), (6, 8), (10, 10)]
+    assert missing_ranges(5, 8, [1, 2, 6, 20]) == [(5, 5), (7, 8)]
+    assert missing_ranges(3, 3, [3]) == []
+    assert missing_ranges(4, 3, []) == []
+
+
+async def test_search_cursor_pages_through_equally_ranked_results(client, user):
+    word = f"zeta{uuid.uuid4().hex[:8]}"
+    for i in range(5):
+        content = text_pdf([f"{word} appears here", f"copy {i}"])
+        doc = await upload(client, user, title=f"Note {i}", content=content, filename="note.pdf")
+        await wait_for_ocr(client, user, doc["id"])
+
+    ids, cursor = [], None
+    while True:
+        params = {"q": word, "size": 2, **({"cursor": cursor} if cursor else {})}
+        body = (await client.get("/api/search", params=params, headers=user.headers)).json()
+        ids += [item["id"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    single = (await client.get("/api/search", params={"q": word, "size": 100}, headers=user.headers)).json()
+    assert ids == [item["id"] for item in single["items"]]
+    assert len(set(ids)) == 5
+
+
+async def semantic_hits(query: str) -> set[uuid.UUID]:
+    async with async_session_factory() as session:
+        return set(await SearchService(session).semantic_matches(query, 50))
+
+
+async def test_chunks_committed_out_of_id_order_are_indexed(client, user):
+    early = uuid.UUID((await upload(client, user))["id"])
+    late = uuid.UUID((await upload(client, user))["id"])
+    await semantic_hits("warm up the index")
+
+    # The first transaction takes the lower chunk ids but commits last
+    async with async_session_factory() as slow, async_session_factory() as fast:
+        await RetrievalService(slow).index_document(early, "Pelican migration along the northern coast.")
+        await RetrievalService(fast).index_document(late, "Volcanic basalt columns near the harbour.")
+        await fast.commit()
+        assert late in await semantic_hits("basalt columns")
+        assert early not in await semantic_hits("pelican migration")
+        await slow.commit()
+
+    assert early in await semantic_hits("pelican migration")
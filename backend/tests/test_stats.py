@@ -0,0 +1,58 @@
+"""Stats counters: reconciliation corrects drift without losing concurrent increments."""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.core.database import async_session_factory, engine
+from app.repositories.stats_repo import StatsRepository
+from app.services.stats_service import StatsService
+from tests.utils import upload
+
+
+async def _reconcile() -> dict[str, int] | None:
+    async with async_session_factory() as session:
+        drift = await StatsService(session).reconcile()
+        await session.commit()
+    return drift
+
+
+async def test_reconcile_adds_drift_to_shard_zero_and_keeps_the_other_shards(client, user):
+    await upload(client, user)
+    await _reconcile()
+    shard_value = text("SELECT value FROM stat_counters WHERE name = 'documents' AND shard = 5")
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO stat_counters (name, shard, value) VALUES ('documents', 5, 3) "
+            "ON CONFLICT (name, shard) DO UPDATE SET value = stat_counters.value + 3"
+        ))
+        before = (await conn.execute(shard_value)).scalar_one()
+
+    drift = await _reconcile()
+
+    assert drift["documents"] == -3
+    assert (await _reconcile()) == {name: 0 for name in drift}
+    async with engine.connect() as conn:
+        assert (await conn.execute(shard_value)).scalar_one() == before
+
+
+async def test_increment_committed_during_reconciliation_is_kept(client, user):
+    await _reconcile()
+    async with async_session_factory() as session:
+        repo = StatsRepository(session)
+        assert await repo.try_lock_reconcile()
+        drift = await repo.counter_drift()
+        since = datetime.now(timezone.utc) - timedelta(hours=1)
+        buckets = await repo.bucket_drift(since)
+
+        # An upload commits its document and increments between the read and the correction
+        await upload(client, user)
+
+        await repo.apply_counter_drift(drift)
+        await repo.apply_bucket_drift(buckets)
+        await session.commit()
+
+    async with async_session_factory() as session:
+        repo = StatsRepository(session)
+        assert set((await repo.counter_drift()).values()) == {0}
+        assert await repo.bucket_drift(since) == []
@@ -0,0 +1,96 @@
+"""Resumable uploads: chunks stream in without holding a transaction."""
+
+import asyncio
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine
+from tests.utils import png_bytes
+
+
+async def _create(client, account, size: int) -> str:
+    response = await client.post(
+        "/api/documents/uploads", json={"filename": "large.png", "size": size}, headers=account.headers
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _put(client, account, upload_id: str, offset: int, content):
+    return client.put(
+        f"/api/documents/uploads/{upload_id}", params={"offset": offset}, content=content, headers=account.headers
+    )
+
+
+async def test_session_row_is_not_locked_while_a_chunk_streams_in(client, user):
+    content = png_bytes()
+    half = len(content) // 2
+    upload_id = await _create(client, user, len(content))
+    streaming, resume = asyncio.Event(), asyncio.Event()
+
+    async def slow_body():
+        yield content[:half]
+        streaming.set()
+        await resume.wait()
+        yield content[half:]
+
+    writer = asyncio.create_task(_put(client, user, upload_id, 0, slow_body()))
+    await asyncio.wait_for(streaming.wait(), 5)
+    await asyncio.sleep(0.05)
+
+    async with engine.connect() as conn:
+        await conn.execute(
+            text("SELECT 1 FROM upload_sessions WHERE id = :id FOR UPDATE NOWAIT"), {"id": upload_id}
+        )
+        await conn.rollback()
+    competing = await _put(client, user, upload_id, 0, content)
+    assert competing.status_code == 409
+    assert "writing" in competing.json()["detail"]
+
+    resume.set()
+    response = await writer
+    assert response.status_code == 200, response.text
+    assert response.json()["offset"] == len(content)
+
+    response = await client.post(f"/api/documents/uploads/{upload_id}/complete", headers=user.headers)
+    assert response.status_code == 201, response.text
+
+
+async def test_chunk_outliving_its_lease_is_rejected_and_can_be_resent(client, user, monkeypatch):
+    content = png_bytes()
+    upload_id = await _create(client, user, len(content))
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_LEASE_SECONDS", 0.2)
+
+    async def stalled_body():
+        yield content[:10]
+        await asyncio.sleep(0.3)
+        yield content[10:]
+
+    response = await _put(client, user, upload_id, 0, stalled_body())
+    assert response.status_code == 409
+
+    response = await _put(client, user, upload_id, 0, content)
+    assert response.status_code == 200, response.text
+    assert response.json()["offset"] == len(content)
+
+
+async def test_abandoned_lease_is_taken_over(client, user):
+    content = png_bytes()
+    upload_id = await _create(client, user, len(content))
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("UPDATE upload_sessions SET writing_until = now() - interval '1 second' WHERE id = :id"),
+            {"id": upload_id},
+        )
+
+    response = await _put(client, user, upload_id, 0, content)
+    assert response.status_code == 200, response.text
+
+
+async def test_chunk_at_the_wrong_offset_is_rejected(client, user):
+    upload_id = await _create(client, user, 1024)
+
+    response = await _put(client, user, upload_id, 512, b"x" * 512)
+    assert response.status_code == 409
+    assert "offset 0" in response.json()["detail"]
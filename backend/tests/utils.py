@@ -0,0 +1,98 @@
+"""Helpers shared by the test modules."""
+
+import asyncio
+import io
+import uuid
+from dataclasses import dataclass
+
+import httpx
+from PIL import Image, ImageDraw
+
+PASSWORD = "correct horse battery"
+
+
+@dataclass
+class Account:
+    email: str
+    headers: dict[str, str]
+    refresh_token: str
+
+
+async def register(client: httpx.AsyncClient, admin: bool = False) -> Account:
+    """A new user, promoted to admin before its first authenticated request."""
+    email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+    response = await client.post("/api/auth/register", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 201, response.text
+    if admin:
+        from app.core.database import async_session_factory
+        from app.models.user import UserRole
+        from app.repositories.user_repo import UserRepository
+
+        async with async_session_factory() as session:
+            repo = UserRepository(session)
+            await repo.set_role((await repo.get_by_email(email)).id, UserRole.ADMIN)
+            await session.commit()
+    tokens = response.json()
+    return Account(email, {"Authorization": f"Bearer {tokens['access_token']}"}, tokens["refresh_token"])
+
+
+def png_bytes(label: str = "") -> bytes:
+    """A small PNG; different labels give different bytes (and so different blobs)."""
+    image = Image.new("RGB", (120, 60), "white")
+    ImageDraw.Draw(image).text((5, 20), label or uuid.uuid4().hex, fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def text_pdf(lines: list[str]) -> bytes:
+    """A one-page PDF with a text layer, so OCR finishes without Tesseract."""
+    escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines]
+    stream = "BT /F1 11 Tf 72 740 Td 14 TL " + " ".join(f"({line}) Tj T*" for line in escaped) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf, offsets = "%PDF-1.4\n", []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return pdf.encode("latin-1")
+
+
+async def upload(
+    client: httpx.AsyncClient,
+    account: Account,
+    title: str = "",
+    tags: str = "",
+    content: bytes | None = None,
+    filename: str = "scan.png",
+) -> dict:
+    response = await client.post(
+        "/api/documents",
+        files={"file": (filename, content or png_bytes(), "application/octet-stream")},
+        data={"title": title, "tags": tags},
+        headers=account.headers,
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def wait_for_ocr(client: httpx.AsyncClient, account: Account, document_id: str) -> dict:
+    """The document's latest OCR job once it has finished (done or failed)."""
+    for _ in range(200):
+        job = (await client.get(f"/api/documents/{document_id}/ocr", headers=account.headers)).json()
+        if job["status"] in ("DONE", "FAILED"):
+            # A failed job's marker is saved just after the job is marked finished
+            await asyncio.sleep(0.2)
+            return job
+        await asyncio.sleep(0.1)
+    raise AssertionError(f"OCR of {document_id} did not finish: {job}")
@@ -40,6 +40,8 @@ export const searchApi = {
 export const qaApi = {
     ask: (documentId: string, question: string) =>
         api.post(`/qa/${documentId}`, { question }),
+    history: (documentId: string, params?: { cursor?: string; size?: number }) =>
+        api.get(`/qa/${documentId}/history`, { params }),
 }
 
 // ── Admin ─────────────────────────────────────────
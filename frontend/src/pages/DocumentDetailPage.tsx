@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { documentsApi, qaApi } from '../api/endpoints'
@@ -28,6 +28,17 @@ export default function DocumentDetailPage() {
 
     const doc = data?.data
 
+    // Latest page of the previous conversation; new turns are appended as they arrive
+    const { data: history } = useQuery({
+        queryKey: ['qa-history', id],
+        queryFn: () => qaApi.history(id!),
+        enabled: !!id,
+    })
+
+    useEffect(() => {
+        if (history) setQaMessages(history.data.messages || [])
+    }, [history])
+
     const deleteMutation = useMutation({
         mutationFn: () => documentsApi.delete(id!),
         onSuccess: () => {
@@ -49,7 +60,8 @@ export default function DocumentDetailPage() {
     const askMutation = useMutation({
         mutationFn: (q: string) => qaApi.ask(id!, q),
         onSuccess: (res) => {
-            setQaMessages(res.data.messages || [])
+            // The response carries only the new turn
+            setQaMessages((prev) => [...prev, ...(res.data.messages || [])])
             setQuestion('')
         },
         onError: (err: any) => {
@@ -97,17 +109,27 @@ export default function DocumentDetailPage() {
                         <div className="p-4">
                             {isImage ? (
                                 <img
-                                    src={`/${doc.file_path}`}
+                                    src={doc.preview_url || doc.file_url}
                                     alt={doc.title}
                                     className="w-full max-h-[500px] object-contain rounded-xl"
                                 />
                             ) : (
                                 <div className="bg-surface-900/50 rounded-xl p-8 flex items-center justify-center min-h-[300px]">
                                     <div className="text-center">
-                                        <HiOutlineDocumentText className="w-16 h-16 text-surface-200/20 mx-auto mb-3" />
-                                        <p className="text-surface-200/40">PDF preview</p>
+                                        {doc.preview_url ? (
+                                            <img
+                                                src={doc.preview_url}
+                                                alt={doc.title}
+                                                className="max-h-[500px] mx-auto object-contain rounded-lg"
+                                            />
+                                        ) : (
+                                            <>
+                                                <HiOutlineDocumentText className="w-16 h-16 text-surface-200/20 mx-auto mb-3" />
+                                                <p className="text-surface-200/40">PDF preview</p>
+                                            </>
+                                        )}
                                         <a
-                                            href={`/${doc.file_path}`}
+                                            href={doc.file_url}
                                             target="_blank"
                                             rel="noopener noreferrer"
                                             className="inline-block mt-3 px-4 py-2 btn-gradient text-white text-sm rounded-lg"
@@ -83,10 +83,19 @@ export default function DocumentsPage() {
                             className="glass rounded-2xl p-5 hover-glow group"
                         >
                             <div className="flex items-start gap-3 mb-3">
-                                <div className="w-11 h-11 rounded-xl bg-brand-500/10 flex items-center justify-center flex-shrink-0">
-                                    <span className="text-xs font-bold text-brand-400 uppercase">
-                                        {doc.file_type}
-                                    </span>
+                                <div className="w-11 h-11 rounded-xl bg-brand-500/10 flex items-center justify-center flex-shrink-0 overflow-hidden">
+                                    {doc.thumbnail_url ? (
+                                        <img
+                                            src={doc.thumbnail_url}
+                                            alt=""
+                                            loading="lazy"
+                                            className="w-full h-full object-cover"
+                                        />
+                                    ) : (
+                                        <span className="text-xs font-bold text-brand-400 uppercase">
+                                            {doc.file_type}
+                                        </span>
+                                    )}
                                 </div>
                                 <div className="flex-1 min-w-0">
                                     <p className="text-white font-medium truncate group-hover:text-brand-300 transition-colors">
@@ -17,10 +17,6 @@ export default defineConfig({
                 target: 'http://localhost:8000',
                 changeOrigin: true,
             },
-            '/uploads': {
-                target: 'http://localhost:8000',
-                changeOrigin: true,
-            },
         },
     },
 })